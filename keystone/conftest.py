@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep tests out of the user's cache: every test gets its own cache directory."""
+    monkeypatch.setenv("KEYSTONE_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
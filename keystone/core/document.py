@@ -0,0 +1,164 @@
+"""
+Render-ready intermediate representation of a cheatsheet.
+
+build_document resolves everything the templates used to re-derive from the
+merged layout dicts: the title fallback chain, icon lookup with the ``grid``
+fallback, chord splitting and default labels. All text is HTML-escaped, so
+templates only have to place it into markup. A Document does not depend on
+the theme and can be rendered by several templates and themes.
+"""
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+from ..utils.icon_sprite import resolve_icon_name
+
+# A chord such as "Ctrl+Shift+P", as its escaped key labels
+Chord = Tuple[str, ...]
+
+
+@dataclass
+class Keybind:
+    """A single keybind with escaped text and parsed chords."""
+
+    action: str
+    description: str
+    chords: Tuple[Chord, ...]
+
+
+@dataclass
+class Category:
+    """A category with its resolved icon and keybinds."""
+
+    name: str
+    icon: Optional[str]
+    keybinds: List[Keybind]
+    index: int = 0
+    source: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def color_variant(self, theme: Dict[str, Any]) -> str:
+        """
+        Get the theme color variant for this category.
+
+        Colors are assigned cyclically by category position.
+
+        Args:
+            theme: Theme configuration
+
+        Returns:
+            Key into the theme's ``color_variants``
+        """
+        color_keys = list(theme["color_variants"].keys())
+        return color_keys[self.index % len(color_keys)]
+
+
+@dataclass
+class Document:
+    """A complete cheatsheet ready to be serialized by a template."""
+
+    title: str
+    version: Optional[str]
+    categories: List[Category]
+    source: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def used_icons(self) -> List[Optional[str]]:
+        """Resolved icon name of every category, in order."""
+        return [category.icon for category in self.categories]
+
+
+def parse_chords(keys: Union[str, Sequence[str], None]) -> Tuple[Chord, ...]:
+    """
+    Split keybind keys into chords of escaped key labels.
+
+    Args:
+        keys: Chord string such as ``"Ctrl+S"`` or a list of alternative chords
+
+    Returns:
+        One tuple of key labels per chord
+    """
+    if not keys:
+        return ()
+    if isinstance(keys, str):
+        keys = [keys]
+    return tuple(tuple(escape(key.strip(), quote=False) for key in chord.split('+')) for chord in keys)
+
+
+def build_keybind(keybind: Dict[str, Any]) -> Keybind:
+    """
+    Build a Keybind from a keybind dictionary.
+
+    Args:
+        keybind: Keybind dictionary with action, keys and optional description
+
+    Returns:
+        Render-ready keybind
+    """
+    return Keybind(
+        action=escape(str(keybind.get("action", "Unknown Action")), quote=False),
+        description=escape(str(keybind.get("description", "") or ""), quote=False),
+        chords=parse_chords(keybind.get("keys", [])),
+    )
+
+
+def build_category(category: Dict[str, Any], icons: Dict[str, str], index: int = 0) -> Category:
+    """
+    Build a Category from a category dictionary.
+
+    Args:
+        category: Category dictionary with name, icon_name and keybinds
+        icons: Icon name to SVG string mapping
+        index: Position of the category in the document
+
+    Returns:
+        Render-ready category
+    """
+    return Category(
+        name=escape(str(category.get("name", "Unknown Category")), quote=False),
+        icon=resolve_icon_name(category.get("icon_name"), icons),
+        keybinds=[build_keybind(keybind) for keybind in category.get("keybinds", [])],
+        index=index,
+        source=category,
+    )
+
+
+def build_document(data: Dict[str, Any], icons: Dict[str, str]) -> Document:
+    """
+    Build the intermediate representation of a cheatsheet.
+
+    Args:
+        data: Merged keybind data containing tool info and categories
+        icons: Icon name to SVG string mapping
+
+    Returns:
+        Render-ready document
+    """
+    version = data.get("version")
+    return Document(
+        title=escape(str(data.get("title", data.get("tool", "Keystone"))), quote=False),
+        version=escape(str(version), quote=False) if version else None,
+        categories=[build_category(category, icons, i) for i, category in enumerate(data.get("categories", []))],
+        source=data,
+    )
+
+
+def as_document(data: Union[Dict[str, Any], Document], icons: Dict[str, str]) -> Document:
+    """Return ``data`` as a Document, building it from a dictionary if needed."""
+    return data if isinstance(data, Document) else build_document(data, icons)
+
+
+def as_category(category: Union[Dict[str, Any], Category], icons: Dict[str, str], index: int = 0) -> Category:
+    """Return ``category`` as a Category, building it from a dictionary if needed."""
+    return category if isinstance(category, Category) else build_category(category, icons, index)
+
+
+def as_keybinds(keybinds: Sequence[Union[Dict[str, Any], Keybind]]) -> List[Keybind]:
+    """Return ``keybinds`` as Keybinds, building them from dictionaries if needed."""
+    return [keybind if isinstance(keybind, Keybind) else build_keybind(keybind) for keybind in keybinds]
+
+
+def as_chords(keys: Union[str, Sequence[str], Sequence[Chord], None]) -> Tuple[Chord, ...]:
+    """Return ``keys`` as parsed chords, parsing raw key strings if needed."""
+    if keys and not isinstance(keys, str) and all(isinstance(chord, tuple) for chord in keys):
+        return tuple(cast(Sequence[Chord], keys))
+    return parse_chords(cast(Union[str, Sequence[str], None], keys))
@@ -0,0 +1,165 @@
+"""
+Render scheduler for category fragments.
+
+Templates hand every category fragment (a skill-tree card, or the rows of one
+reference-card category) to render_fragments. Cached fragments are reused;
+the rest are rendered in-process for ordinary sheets, or, above a size
+threshold, split into chunks of consecutive categories and rendered in a
+process pool. Each worker receives the theme, the used icons and the
+template's render function once (through the pool initializer), and the
+fragments are yielded back in document order.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .document import Category
+from ..utils.fragment_cache import FragmentCache
+
+# Keybinds to render before a process pool pays off; smaller sheets stay single-process
+PARALLEL_THRESHOLD = 2000
+
+# Chunks per worker, so uneven categories still balance across the pool
+CHUNKS_PER_WORKER = 4
+
+# Renders one fragment: (category, theme, icons, row_offset) -> HTML
+FragmentRenderer = Callable[[Category, Dict[str, Any], Dict[str, str], Optional[int]], str]
+
+
+class FragmentTask(NamedTuple):
+    """One category fragment to render."""
+
+    category: Category
+    # Inputs besides the category and theme that the fragment depends on (cache key)
+    variant: Tuple[Any, ...] = ()
+    # Search row id of the category's first keybind, if rows are numbered
+    row_offset: Optional[int] = None
+
+
+# Per-process state set by the pool initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(render: FragmentRenderer, theme: Dict[str, Any], icons: Dict[str, str]) -> None:
+    _worker_state.update(render=render, theme=theme, icons=icons)
+
+
+def _render_chunk(tasks: List[Tuple[Category, Optional[int]]]) -> List[str]:
+    render, theme, icons = _worker_state["render"], _worker_state["theme"], _worker_state["icons"]
+    return [render(category, theme, icons, row_offset) for category, row_offset in tasks]
+
+
+def _balanced_chunks(items: Sequence[Any], weights: Sequence[int], chunk_count: int) -> List[List[Any]]:
+    total = sum(weights)
+    target = max(1, -(-total // max(1, chunk_count)))
+    chunks: List[List[Any]] = []
+    current: List[Any] = []
+    weight = 0
+    for item, item_weight in zip(items, weights):
+        current.append(item)
+        weight += item_weight
+        if weight >= target:
+            chunks.append(current)
+            current, weight = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_tasks(tasks: Sequence[FragmentTask], chunk_count: int) -> List[List[FragmentTask]]:
+    """
+    Split tasks into consecutive chunks of roughly equal keybind counts.
+
+    Args:
+        tasks: Tasks in document order
+        chunk_count: Desired number of chunks
+
+    Returns:
+        Non-empty chunks that concatenate back to ``tasks``
+    """
+    return _balanced_chunks(tasks, [max(1, len(task.category.keybinds)) for task in tasks], chunk_count)
+
+
+def chunk_categories(categories: Sequence[Category], chunk_count: int) -> List[List[Category]]:
+    """
+    Split categories into consecutive chunks of roughly equal keybind counts.
+
+    Args:
+        categories: Categories in document order
+        chunk_count: Desired number of chunks
+
+    Returns:
+        Non-empty chunks that concatenate back to ``categories``
+    """
+    return _balanced_chunks(categories, [max(1, len(category.keybinds)) for category in categories], chunk_count)
+
+
+def render_fragments(template: str, render: FragmentRenderer, tasks: Sequence[FragmentTask],
+                     theme: Dict[str, Any], icons: Dict[str, str],
+                     fragment_cache: Optional[FragmentCache] = None, workers: Optional[int] = None,
+                     threshold: Optional[int] = None) -> Iterator[str]:
+    """
+    Render category fragments in document order, in parallel for large sheets.
+
+    Args:
+        template: Template name (part of the cache key)
+        render: Module-level function rendering one fragment, so it can be
+            sent to worker processes
+        tasks: Fragments to render, in document order
+        theme: Theme configuration
+        icons: Icon name to SVG string mapping
+        fragment_cache: Optional cache for rendered fragments
+        workers: Maximum worker processes. None or 1 renders in-process.
+        threshold: Minimum number of keybinds to render before a pool is used
+            (defaults to PARALLEL_THRESHOLD)
+
+    Yields:
+        Fragment HTML for each task, in order
+    """
+    keys: Dict[int, str] = {}
+    cached: Dict[int, str] = {}
+    if fragment_cache is not None:
+        for index, task in enumerate(tasks):
+            keys[index] = fragment_cache.fragment_key(template, task.category.source, theme, task.variant)
+            fragment = fragment_cache.get(keys[index])
+            if fragment is not None:
+                cached[index] = fragment
+
+    missing = [index for index in range(len(tasks)) if index not in cached]
+    workers = min(workers or 1, os.cpu_count() or 1)
+    if threshold is None:
+        threshold = PARALLEL_THRESHOLD
+    missing_keybinds = sum(len(tasks[index].category.keybinds) for index in missing)
+
+    def store(index: int, fragment: str) -> str:
+        if fragment_cache is not None:
+            fragment_cache.put(keys[index], fragment)
+        return fragment
+
+    if workers <= 1 or len(missing) < 2 or missing_keybinds < threshold:
+        for index, task in enumerate(tasks):
+            if index in cached:
+                yield cached[index]
+            else:
+                yield store(index, render(task.category, theme, icons, task.row_offset))
+        return
+
+    # Workers only need the icons the categories reference
+    used_icons = {task.category.icon for task in tasks if task.category.icon is not None}
+    worker_icons = {name: icons[name] for name in used_icons}
+    chunks = chunk_tasks([tasks[index] for index in missing], workers * CHUNKS_PER_WORKER)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(render, theme, worker_icons)) as executor:
+        results = executor.map(
+            _render_chunk, [[(task.category, task.row_offset) for task in chunk] for chunk in chunks]
+        )
+        rendered = (fragment for chunk in results for fragment in chunk)
+        missing_iter = iter(missing)
+        next_missing = next(missing_iter, None)
+        for index in range(len(tasks)):
+            if index == next_missing:
+                yield store(index, next(rendered))
+                next_missing = next(missing_iter, None)
+            else:
+                yield cached[index]
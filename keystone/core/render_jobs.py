@@ -0,0 +1,378 @@
+"""
+Render one parsed layout with one or more theme/template combinations.
+
+The layout is parsed, merged and turned into a Document once; each theme is
+loaded once. Every theme/template combination then becomes a RenderJob that
+only serializes and writes output, so the whole matrix can be rendered in
+parallel worker processes. Within a job, and across jobs rendered one after
+another, PDFs render on a separate stage while the next HTML is written.
+"""
+import os
+import sys
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from .document import Document
+from .fragment_scheduler import chunk_categories
+from .template_registry import TemplateSpec, discover_templates, load_template, template_options
+from ..utils.fragment_cache import FragmentCache
+from ..utils.output import write_chunks, write_precompressed
+from ..utils.pdf_chunks import PDF_CHUNK_KEYBINDS, can_render_in_chunks, render_pdf_chunks
+from ..utils.pdf_generator import generate_pdf
+from ..utils.pdf_size import PdfOptions, format_size_report, pdf_size_report
+from ..utils.pdf_supervisor import PdfGenerationError
+
+# Jobs whose PDF may wait for the PDF stage of run_render_pipeline
+PIPELINE_DEPTH = 2
+
+
+@dataclass
+class RenderJob:
+    """One theme/template combination to render and write."""
+
+    theme_name: str
+    template_name: str
+    theme: Dict[str, Any]
+    html_output: Optional[Path] = None
+    pdf_output: Optional[Path] = None
+    # Whole-document passes (e.g. class deduplication) applied before writing;
+    # must be module-level functions so jobs can be sent to worker processes
+    postprocessors: Tuple[Callable[[str], str], ...] = ()
+    # Also write .gz/.br copies of the HTML output for static servers
+    precompress: bool = False
+    # Embed the client-side search box and index (templates that support it)
+    search: bool = False
+    # Never access the network for remote URLs while rendering the PDF
+    offline: bool = False
+    # Render large PDFs as category chunks in parallel and merge the pages
+    parallel_pdf: bool = False
+    # Reorder cards in the PDF so they fill the page columns
+    pack_cards: bool = False
+    # Font subsetting, compression, image and CSS pruning options of the PDF
+    pdf_options: PdfOptions = PdfOptions()
+    # Seconds and megabytes a PDF render may use; None for no limit
+    pdf_timeout: Optional[float] = None
+    pdf_memory_limit_mb: Optional[int] = None
+    # Discovered template (see run_render_jobs); looked up by template_name if None
+    template: Optional[TemplateSpec] = None
+
+
+def parse_name_list(value: str, available: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Parse a comma-separated list of names, or ``all``.
+
+    Args:
+        value: Command-line value such as ``"default,dark"`` or ``"all"``
+        available: Known names. Required for ``all``; if given, unknown names
+            are rejected.
+
+    Returns:
+        Names in the given order, without duplicates
+
+    Raises:
+        ValueError: If a name is unknown (message in argparse's "invalid choice" form)
+    """
+    if value.strip() == "all" and available is not None:
+        return list(available)
+
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    if not names:
+        raise ValueError("expected at least one name")
+    if available is not None:
+        for name in names:
+            if name not in available:
+                choices = ", ".join(repr(choice) for choice in available)
+                raise ValueError(f"invalid choice: {name!r} (choose from {choices})")
+    return names
+
+
+def output_suffix(theme_name: str, template_name: str, theme_names: Sequence[str],
+                  template_names: Sequence[str]) -> str:
+    """
+    Get the output file suffix for one combination of the render matrix.
+
+    Only dimensions with more than one value are included, so a single
+    theme and template keep the plain output name.
+
+    Args:
+        theme_name: Theme of this combination
+        template_name: Template of this combination
+        theme_names: All requested themes
+        template_names: All requested templates
+
+    Returns:
+        Suffix such as ``"_dark_reference_card"`` (empty for a single combination)
+    """
+    parts = []
+    if len(theme_names) > 1:
+        parts.append(theme_name)
+    if len(template_names) > 1:
+        parts.append(template_name)
+    return "".join(f"_{part}" for part in parts)
+
+
+def _error_message(job: RenderJob, error: Exception) -> str:
+    if isinstance(error, PdfGenerationError):
+        return f"PDF generation failed for {job.theme_name}/{job.template_name}: {error}"
+    return str(error)
+
+
+def _render_pdf(job: RenderJob, output_path: Path, pdf_source: Union[str, List[str]], base_url: Optional[str],
+                stylesheets: Sequence[str], use_cache: bool, workers: Optional[int]) -> List[str]:
+    """PDF stage of a job: render the prepared document (or its chunks) and report the result."""
+    messages = []
+    if isinstance(pdf_source, list):
+        pages = render_pdf_chunks(pdf_source, output_path, base_url=base_url, offline=job.offline,
+                                  max_workers=workers, use_cache=use_cache, options=job.pdf_options,
+                                  timeout=job.pdf_timeout, memory_limit_mb=job.pdf_memory_limit_mb,
+                                  stylesheets=stylesheets)
+        if pages:
+            messages.append(f"Merged {len(pdf_source)} PDF chunks ({pages} pages)")
+    else:
+        generate_pdf(pdf_source, output_path, base_url=base_url, offline=job.offline, stylesheets=stylesheets,
+                     use_cache=use_cache, options=job.pdf_options, timeout=job.pdf_timeout,
+                     memory_limit_mb=job.pdf_memory_limit_mb)
+    messages.append(f"Generated PDF: {output_path.absolute()}")
+    messages.append(format_size_report(pdf_size_report(output_path)))
+    return messages
+
+
+def _start_render_job(job: RenderJob, document: Document, icons: Dict[str, str],
+                      asset_dir: Optional[Union[str, Path]], use_cache: bool, workers: Optional[int],
+                      pdf_stage: Executor, log: Callable[[str], None]) -> Tuple[Optional[Future], Optional[str]]:
+    """
+    Render the documents of a job, hand its PDF to the PDF stage and write its HTML.
+
+    The HTML is written while the PDF renders.
+
+    Returns:
+        Tuple of (future of the PDF stage's messages or None, error message or None)
+    """
+    pdf_future = None
+    try:
+        template_module = job.template.load() if job.template is not None else load_template(job.template_name)
+        generate_html = template_module.generate_html
+        iter_html = getattr(template_module, "iter_html", None)
+        data = document if getattr(template_module, "ACCEPTS_DOCUMENT", False) else document.source
+        fragment_cache = FragmentCache() if use_cache else None
+        options = {"asset_dir": asset_dir, "fragment_cache": fragment_cache, "search": job.search,
+                   "workers": workers, "pack": job.pack_cards}
+
+        def render(media: str, source: Any = data) -> str:
+            html = generate_html(source, job.theme, icons, **template_options(generate_html, media=media, **options))
+            for postprocess in job.postprocessors:
+                html = postprocess(html)
+            return html
+
+        # Templates accepting a ``media`` option render a separate static document for the PDF
+        separate_print = "media" in template_options(generate_html, media="print")
+        # Its stylesheet goes to the PDF renderer, which parses it once per process, instead of into every document
+        print_stylesheet = getattr(template_module, "print_stylesheet", None)
+        pdf_stylesheets: List[str] = []
+        if (separate_print and print_stylesheet is not None
+                and "inline_print_styles" in template_options(generate_html, inline_print_styles=False)):
+            options["inline_print_styles"] = False
+            pdf_stylesheets = [css for css in [print_stylesheet(job.theme)] if css]
+
+        html_content = None
+        if (job.html_output is not None and (iter_html is None or job.postprocessors)
+                or job.pdf_output is not None and not separate_print):
+            html_content = render("screen")
+
+        if job.pdf_output is not None:
+            log(f"Generating PDF: {job.pdf_output}")
+            base_url = str(asset_dir) if asset_dir else None
+            media = "print" if separate_print else "screen"
+            keybind_count = sum(len(category.keybinds) for category in document.categories)
+            html_chunks: List[str] = []
+            if job.parallel_pdf and data is document and keybind_count > PDF_CHUNK_KEYBINDS:
+                # Groups of categories become independent documents rendered side by side
+                category_chunks = chunk_categories(document.categories, -(-keybind_count // PDF_CHUNK_KEYBINDS))
+                html_chunks = [render(media, replace(document, categories=chunk)) for chunk in category_chunks]
+            if len(html_chunks) > 1 and can_render_in_chunks(html_chunks[0]):
+                pdf_source: Union[str, List[str]] = html_chunks
+            else:
+                pdf_source = render(media) if separate_print or html_content is None else html_content
+            pdf_future = pdf_stage.submit(_render_pdf, job, job.pdf_output, pdf_source, base_url, pdf_stylesheets,
+                                          use_cache, workers)
+
+        if job.html_output is not None:
+            html_path = Path(job.html_output)
+            try:
+                if html_content is not None:
+                    write_chunks([html_content], html_path)
+                elif iter_html is not None:
+                    # Only HTML is needed: stream it to disk instead of building one large string
+                    write_chunks(iter_html(data, job.theme, icons, **template_options(iter_html, **options)), html_path)
+                compressed_paths = write_precompressed(html_path) if job.precompress else []
+            except PermissionError:
+                return pdf_future, f"Permission denied when writing to '{html_path}'"
+            except OSError as e:
+                return pdf_future, f"Could not write to '{html_path}': {e}"
+            log(f"Generated HTML: {html_path.absolute()}")
+            for compressed_path in compressed_paths:
+                log(f"Generated precompressed HTML: {compressed_path.absolute()}")
+    except Exception as e:
+        return pdf_future, _error_message(job, e)
+
+    return pdf_future, None
+
+
+def _finish_render_job(job: RenderJob, pdf_future: Optional[Future], error: Optional[str],
+                       log: Callable[[str], None]) -> Optional[str]:
+    """Wait for the PDF stage of a job and log its messages; returns the job's first error."""
+    if pdf_future is None:
+        return error
+    try:
+        pdf_messages = pdf_future.result()
+    except Exception as e:
+        return error or _error_message(job, e)
+    for message in pdf_messages:
+        log(message)
+    return error
+
+
+def run_render_job(job: RenderJob, document: Document, icons: Dict[str, str],
+                   asset_dir: Optional[Union[str, Path]] = None, use_cache: bool = True,
+                   echo: bool = True, workers: Optional[int] = None) -> Tuple[List[str], Optional[str]]:
+    """
+    Render and write the outputs of one job.
+
+    The PDF renders on a background thread while the HTML is written (the
+    render itself happens in a supervised worker process when the job has
+    PDF limits, see utils.pdf_supervisor).
+
+    Args:
+        job: Theme/template combination and its output paths
+        document: Parsed document (its source dict is passed to templates that
+            do not accept a Document)
+        icons: Icon name to SVG string mapping
+        asset_dir: Directory for sidecar font files
+        use_cache: Whether to reuse cached category fragments and up-to-date PDFs
+        echo: Print progress as it happens instead of only returning it
+        workers: Worker processes for the categories of large sheets (see
+            core.fragment_scheduler) and for chunked PDFs. If None, in-process.
+
+    Returns:
+        Tuple of (progress messages, error message or None)
+    """
+    messages: List[str] = []
+
+    def log(message: str) -> None:
+        messages.append(message)
+        if echo:
+            print(message)
+
+    with ThreadPoolExecutor(max_workers=1) as pdf_stage:
+        pdf_future, error = _start_render_job(job, document, icons, asset_dir, use_cache, workers, pdf_stage, log)
+        error = _finish_render_job(job, pdf_future, error, log)
+    return messages, error
+
+
+def run_render_pipeline(jobs: Sequence[RenderJob], document: Document, icons: Dict[str, str],
+                        asset_dir: Optional[Union[str, Path]] = None, use_cache: bool = True,
+                        workers: Optional[int] = None) -> List[Tuple[List[str], Optional[str]]]:
+    """
+    Render jobs one after another, overlapping each job's PDF with the next jobs' HTML.
+
+    Documents are rendered and HTML written on the calling thread, while a
+    PDF stage thread renders the PDFs in job order. At most PIPELINE_DEPTH
+    jobs wait for the PDF stage, which bounds the documents held in memory.
+    Each job's progress is printed in one block, in job order, once its PDF
+    is done.
+
+    Args:
+        jobs: Jobs to render
+        document: Parsed document shared by all jobs
+        icons: Icon name to SVG string mapping
+        asset_dir: Directory for sidecar font files
+        use_cache: Whether to reuse cached category fragments and up-to-date PDFs
+        workers: Worker processes for the categories of large sheets and for
+            chunked PDFs. If None, in-process.
+
+    Returns:
+        Tuple of (progress messages, error message or None) per job, in job order
+    """
+    results: List[Tuple[List[str], Optional[str]]] = []
+    pending: Deque[Tuple[RenderJob, List[str], Optional[Future], Optional[str]]] = deque()
+
+    def finish() -> None:
+        job, messages, pdf_future, error = pending.popleft()
+        error = _finish_render_job(job, pdf_future, error, messages.append)
+        for message in messages:
+            print(message)
+        results.append((messages, error))
+
+    with ThreadPoolExecutor(max_workers=1) as pdf_stage:
+        for job in jobs:
+            messages: List[str] = []
+            pdf_future, error = _start_render_job(job, document, icons, asset_dir, use_cache, workers, pdf_stage,
+                                                  messages.append)
+            pending.append((job, messages, pdf_future, error))
+            # Report finished jobs as soon as possible; block once the PDF stage falls too far behind
+            while pending and (len(pending) > PIPELINE_DEPTH or pending[0][2] is None or pending[0][2].done()):
+                finish()
+        while pending:
+            finish()
+    return results
+
+
+def run_render_jobs(jobs: Sequence[RenderJob], document: Document, icons: Dict[str, str],
+                    asset_dir: Optional[Union[str, Path]] = None, use_cache: bool = True,
+                    max_workers: Optional[int] = None) -> bool:
+    """
+    Render a list of jobs, in parallel worker processes when there are several.
+
+    Progress is printed in job order regardless of completion order. A
+    single job uses the workers for its categories and PDF chunks instead
+    (large sheets only). Without several workers, jobs run through
+    run_render_pipeline. Templates are discovered once for all jobs that
+    do not carry their template yet.
+
+    Args:
+        jobs: Jobs to render
+        document: Parsed document shared by all jobs
+        icons: Icon name to SVG string mapping
+        asset_dir: Directory for sidecar font files
+        use_cache: Whether to reuse cached category fragments and up-to-date PDFs
+        max_workers: Maximum worker processes (defaults to the CPU count)
+
+    Returns:
+        True if every job succeeded
+    """
+    if any(job.template is None for job in jobs):
+        # One discovery for the whole matrix; unknown names fail in their job
+        templates = discover_templates()
+        jobs = [job if job.template is not None else replace(job, template=templates.get(job.template_name))
+                for job in jobs]
+
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        job_workers = max_workers or os.cpu_count()
+        if len(jobs) == 1:
+            results = [run_render_job(jobs[0], document, icons, asset_dir, use_cache, workers=job_workers)]
+        else:
+            results = run_render_pipeline(jobs, document, icons, asset_dir, use_cache, workers=job_workers)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_render_job, job, document, icons, asset_dir, use_cache, False)
+                for job in jobs
+            ]
+            results = []
+            for future in futures:
+                messages, error = future.result()
+                for message in messages:
+                    print(message)
+                results.append((messages, error))
+
+    succeeded = True
+    for job, (_, error) in zip(jobs, results):
+        if error is not None:
+            label = f" ({job.theme_name}, {job.template_name})" if len(jobs) > 1 else ""
+            print(f"Error{label}: {error}", file=sys.stderr)
+            succeeded = False
+    return succeeded
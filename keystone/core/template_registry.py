@@ -0,0 +1,204 @@
+"""
+Registry of available cheatsheet templates.
+
+Templates are discovered from three places, in increasing priority:
+
+1. Modules in the ``keystone/templates`` package
+2. ``keystone.templates`` entry points of installed distributions
+3. ``*.py`` files in the user template directories (``KEYSTONE_TEMPLATE_PATH``
+   and ``$XDG_CONFIG_HOME/keystone/templates``)
+
+Discovery only reads lightweight metadata (file names, module docstrings and
+entry point names); a template module is imported when it is selected.
+"""
+import ast
+import importlib
+import importlib.util
+import inspect
+import os
+from functools import partial
+from importlib.metadata import entry_points
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+
+ENTRY_POINT_GROUP = "keystone.templates"
+
+DEFAULT_TEMPLATE = "skill_tree"
+
+
+class TemplateSpec:
+    """Metadata for a discovered template, with lazy loading of its module."""
+
+    def __init__(self, name: str, description: str, source: str, loader: Callable[[], Any]):
+        """
+        Describe a template without importing it.
+
+        Args:
+            name: Template name used with ``--template``
+            description: One-line description
+            source: Where the template was found ("package", "user" or "entry point")
+            loader: Callable importing and returning the template module
+        """
+        self.name = name
+        self.description = description
+        self.source = source
+        self._loader = loader
+        self._module: Optional[ModuleType] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Modules cannot be pickled: a worker process imports the template again
+        return {**self.__dict__, "_module": None}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the template module has been imported."""
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """
+        Import the template module (once).
+
+        Returns:
+            Template module providing ``generate_html``
+
+        Raises:
+            ImportError: If the module cannot be imported
+            AttributeError: If the module has no generate_html function
+        """
+        if self._module is None:
+            module = self._loader()
+            if not callable(getattr(module, "generate_html", None)):
+                raise AttributeError(f"Template '{self.name}' does not have a generate_html function.")
+            self._module = module
+        return self._module
+
+
+def _file_metadata(path: Path) -> Optional[str]:
+    """Return a one-line description from the module docstring, or None if the file is not a template."""
+    try:
+        tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return None
+    defines_generate_html = any(
+        isinstance(node, ast.FunctionDef) and node.name == "generate_html" for node in tree.body
+    )
+    if not defines_generate_html:
+        return None
+    docstring = (ast.get_docstring(tree) or "").strip()
+    if not docstring:
+        return "No description available"
+    # "Skill Tree template: cards in a grid" -> "Cards in a grid"
+    summary = docstring.splitlines()[0].split(": ", 1)[-1]
+    return summary[:1].upper() + summary[1:]
+
+
+def _load_file(name: str, path: Path) -> ModuleType:
+    """Import a template module from a file outside the package."""
+    spec = importlib.util.spec_from_file_location(f"keystone_user_templates.{name}", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load template from {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def user_template_dirs() -> List[Path]:
+    """
+    Get the user template directories in priority order.
+
+    Returns:
+        Directories from ``KEYSTONE_TEMPLATE_PATH`` followed by
+        ``$XDG_CONFIG_HOME/keystone/templates`` (defaulting to ``~/.config``)
+    """
+    dirs = [Path(entry) for entry in os.environ.get("KEYSTONE_TEMPLATE_PATH", "").split(os.pathsep) if entry]
+    config_home = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    dirs.append(Path(config_home) / "keystone" / "templates")
+    return dirs
+
+
+def discover_templates() -> Dict[str, TemplateSpec]:
+    """
+    Discover available templates without importing them.
+
+    Returns:
+        Template name to TemplateSpec mapping, default template first and the
+        rest in alphabetical order
+    """
+    templates: Dict[str, TemplateSpec] = {}
+
+    for path in sorted(TEMPLATES_DIR.glob("*.py")):
+        if path.stem.startswith("_"):
+            continue
+        description = _file_metadata(path)
+        if description is not None:
+            templates[path.stem] = TemplateSpec(
+                path.stem, description, "package",
+                partial(importlib.import_module, f"keystone.templates.{path.stem}"),
+            )
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        templates[entry_point.name] = TemplateSpec(
+            entry_point.name, f"Provided by {entry_point.value}", "entry point", entry_point.load,
+        )
+
+    # Earlier user directories take precedence over later ones
+    for directory in reversed(user_template_dirs()):
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.glob("*.py")):
+            if path.stem.startswith("_"):
+                continue
+            description = _file_metadata(path)
+            if description is not None:
+                templates[path.stem] = TemplateSpec(
+                    path.stem, description, "user",
+                    partial(_load_file, path.stem, path),
+                )
+
+    ordered = sorted(templates, key=lambda name: (name != DEFAULT_TEMPLATE, name))
+    return {name: templates[name] for name in ordered}
+
+
+def load_template(name: str, templates: Optional[Dict[str, TemplateSpec]] = None) -> ModuleType:
+    """
+    Import the module of a registered template.
+
+    Args:
+        name: Template name
+        templates: Result of discover_templates (discovered if None)
+
+    Returns:
+        Template module providing ``generate_html``
+
+    Raises:
+        ImportError: If no template with that name exists or it fails to import
+        AttributeError: If the module has no generate_html function
+    """
+    templates = discover_templates() if templates is None else templates
+    if name not in templates:
+        available = ", ".join(templates)
+        raise ImportError(f"Template '{name}' not found. Available templates: {available}")
+    return templates[name].load()
+
+
+def template_options(function: Callable[..., Any], **options: Any) -> Dict[str, Any]:
+    """
+    Filter keyword options down to the ones a template function accepts.
+
+    Third-party templates may only implement ``generate_html(data, theme, icons)``,
+    so optional features such as sidecar fonts are passed only when supported.
+
+    Args:
+        function: Template function (e.g. generate_html or iter_html)
+        **options: Candidate keyword arguments
+
+    Returns:
+        Keyword arguments accepted by ``function``
+    """
+    parameters = inspect.signature(function).parameters
+    if any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()):
+        return options
+    return {key: value for key, value in options.items() if key in parameters}
@@ -0,0 +1,75 @@
+from keystone.core.document import Category, as_category, as_chords, build_document, parse_chords
+
+ICONS = {"terminal": "<svg>t</svg>", "grid": "<svg>g</svg>"}
+
+
+def test_title_fallback_chain():
+    """Test title, then tool, then the default title."""
+    assert build_document({"title": "T", "tool": "X"}, ICONS).title == "T"
+    assert build_document({"tool": "X"}, ICONS).title == "X"
+    assert build_document({}, ICONS).title == "Keystone"
+
+
+def test_text_is_escaped():
+    """Test that all text from the data is HTML-escaped."""
+    document = build_document({
+        "title": "<b>Tool</b>",
+        "version": "1 & 2",
+        "categories": [{
+            "name": "Copy & Paste",
+            "keybinds": [{"action": "<Paste>", "keys": "Ctrl+<", "description": "a & b"}],
+        }],
+    }, ICONS)
+    assert document.title == "&lt;b&gt;Tool&lt;/b&gt;"
+    assert document.version == "1 &amp; 2"
+    category = document.categories[0]
+    assert category.name == "Copy &amp; Paste"
+    assert category.keybinds[0].action == "&lt;Paste&gt;"
+    assert category.keybinds[0].description == "a &amp; b"
+    assert category.keybinds[0].chords == (("Ctrl", "&lt;"),)
+
+
+def test_defaults():
+    """Test default labels for missing fields."""
+    document = build_document({"categories": [{"keybinds": [{}]}]}, ICONS)
+    category = document.categories[0]
+    assert category.name == "Unknown Category"
+    assert category.keybinds[0].action == "Unknown Action"
+    assert category.keybinds[0].description == ""
+    assert category.keybinds[0].chords == ()
+    assert document.version is None
+
+
+def test_icons_resolved_with_grid_fallback():
+    """Test that missing or unknown icons fall back to grid."""
+    document = build_document({"categories": [
+        {"name": "A", "icon_name": "terminal"},
+        {"name": "B", "icon_name": "missing"},
+        {"name": "C"},
+    ]}, ICONS)
+    assert document.used_icons == ["terminal", "grid", "grid"]
+    assert build_document({"categories": [{"name": "A"}]}, {}).used_icons == [None]
+
+
+def test_parse_chords():
+    """Test splitting chord strings and lists of alternatives."""
+    assert parse_chords("Ctrl + S") == (("Ctrl", "S"),)
+    assert parse_chords(["Ctrl+K", "Esc"]) == (("Ctrl", "K"), ("Esc",))
+    assert parse_chords([]) == ()
+    assert parse_chords(None) == ()
+    assert as_chords((("Ctrl", "K"),)) == (("Ctrl", "K"),)
+    assert as_chords(["Ctrl+K"]) == (("Ctrl", "K"),)
+
+
+def test_color_variants_cycle():
+    """Test that colors are assigned cyclically by category position."""
+    theme = {"color_variants": {"blue": {}, "green": {}}}
+    document = build_document({"categories": [{"name": str(i)} for i in range(3)]}, ICONS)
+    assert [category.color_variant(theme) for category in document.categories] == ["blue", "green", "blue"]
+
+
+def test_as_category_is_idempotent():
+    """Test that built categories pass through unchanged."""
+    category = as_category({"name": "A"}, ICONS)
+    assert isinstance(category, Category)
+    assert as_category(category, ICONS) is category
@@ -0,0 +1,76 @@
+import pytest
+
+from keystone.core import fragment_scheduler
+from keystone.core.document import build_document
+from keystone.core.fragment_scheduler import FragmentTask, chunk_categories, chunk_tasks, render_fragments
+from keystone.templates import reference_card, skill_tree
+from keystone.utils.fragment_cache import FragmentCache
+from keystone.utils.theme_loader import load_icons, load_theme
+
+LARGE_DATA = {
+    "title": "Large",
+    "categories": [
+        {
+            "name": f"Category {c}",
+            "icon": "terminal" if c % 2 else None,
+            "keybinds": [{"action": f"Action {c}.{k}", "keys": [f"Ctrl+{k}"]} for k in range(c % 7)],
+        }
+        for c in range(30)
+    ],
+}
+
+
+def test_chunk_tasks_keeps_order():
+    """Test that chunks are consecutive, non-empty and balanced by keybind count."""
+    document = build_document(LARGE_DATA, load_icons())
+    tasks = [FragmentTask(category) for category in document.categories]
+    chunks = chunk_tasks(tasks, 4)
+    assert [task for chunk in chunks for task in chunk] == tasks
+    assert all(chunks)
+    assert 3 <= len(chunks) <= 5
+
+
+def test_chunk_categories_keeps_order():
+    """Test that category chunks concatenate back to the document's categories."""
+    document = build_document(LARGE_DATA, load_icons())
+    chunks = chunk_categories(document.categories, 3)
+    assert [category for chunk in chunks for category in chunk] == list(document.categories)
+    assert 2 <= len(chunks) <= 4
+
+
+@pytest.mark.parametrize("template", [skill_tree, reference_card])
+@pytest.mark.parametrize("search", [False, True])
+def test_parallel_rendering_matches_serial(template, search, monkeypatch):
+    """Test that rendering in a process pool gives byte-identical output."""
+    monkeypatch.setattr(fragment_scheduler, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    icons = load_icons()
+    theme = load_theme("default")
+    document = build_document(LARGE_DATA, icons)
+    serial = template.generate_html(document, theme, icons, search=search)
+    parallel = template.generate_html(document, theme, icons, search=search, workers=2)
+    assert parallel == serial
+
+
+def test_render_fragments_parallel_with_cache(tmp_path, monkeypatch):
+    """Test that the pool only renders cache misses and fills the cache."""
+    monkeypatch.setattr("os.cpu_count", lambda: 2)
+    icons = load_icons()
+    theme = load_theme("default")
+    document = build_document(LARGE_DATA, icons)
+    tasks = [FragmentTask(category, (category.icon,)) for category in document.categories]
+    serial = list(render_fragments("reference_card", reference_card.generate_category_rows, tasks, theme, icons))
+
+    cache = FragmentCache(tmp_path)
+    # Warm part of the cache so the pool renders the gaps in between
+    list(render_fragments("reference_card", reference_card.generate_category_rows, tasks[::3], theme, icons,
+                          fragment_cache=cache))
+    parallel = list(render_fragments("reference_card", reference_card.generate_category_rows, tasks, theme, icons,
+                                     fragment_cache=cache, workers=2, threshold=0))
+    assert parallel == serial
+    assert cache.hits == len(tasks[::3])
+
+    cached = list(render_fragments("reference_card", reference_card.generate_category_rows, tasks, theme, icons,
+                                   fragment_cache=cache, workers=2, threshold=0))
+    assert cached == serial
+    assert cache.misses == len(tasks)
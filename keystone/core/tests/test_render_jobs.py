@@ -0,0 +1,249 @@
+import os
+import time
+
+import pytest
+
+from keystone.core.document import build_document
+from keystone.core import render_jobs, template_registry
+from keystone.core.render_jobs import (RenderJob, output_suffix, parse_name_list, run_render_job, run_render_jobs,
+                                       run_render_pipeline)
+from keystone.templates import reference_card, skill_tree
+from keystone.utils import pdf_supervisor
+from keystone.utils.print_sheet import PRINT_STYLES
+from keystone.utils.pdf_supervisor import PdfTimeoutError
+from keystone.utils.tests.fake_renderers import WritingRenderer
+from keystone.utils.theme_loader import load_icons, load_theme
+
+EMPTY_REPORT = ("total", "fonts", "content", "images", "other")
+
+SAMPLE_DATA = {
+    "title": "Fan-out",
+    "categories": [{"name": "Files", "keybinds": [{"action": "Save", "keys": ["Ctrl+S"]}]}],
+}
+
+
+def test_parse_name_list():
+    """Test comma-separated lists, deduplication and 'all'."""
+    available = ["skill_tree", "reference_card"]
+    assert parse_name_list("reference_card") == ["reference_card"]
+    assert parse_name_list(" a, b ,a") == ["a", "b"]
+    assert parse_name_list("all", available) == available
+    with pytest.raises(ValueError, match="invalid choice: 'nope' \\(choose from 'skill_tree', 'reference_card'\\)"):
+        parse_name_list("skill_tree,nope", available)
+    with pytest.raises(ValueError):
+        parse_name_list(",")
+
+
+def test_output_suffix_only_varying_dimensions():
+    """Test that only dimensions with several values are added to output names."""
+    assert output_suffix("dark", "skill_tree", ["dark"], ["skill_tree"]) == ""
+    assert output_suffix("dark", "skill_tree", ["default", "dark"], ["skill_tree"]) == "_dark"
+    assert output_suffix("dark", "skill_tree", ["dark"], ["skill_tree", "reference_card"]) == "_skill_tree"
+    assert output_suffix("dark", "skill_tree", ["default", "dark"], ["skill_tree", "reference_card"]) == "_dark_skill_tree"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_render_jobs(tmp_path, capsys, max_workers):
+    """Test rendering a matrix sequentially and in worker processes."""
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    jobs = [
+        RenderJob(theme_name, template_name, load_theme(theme_name),
+                  html_output=tmp_path / f"{theme_name}_{template_name}.html")
+        for theme_name in ("default", "dark")
+        for template_name in ("skill_tree", "reference_card")
+    ]
+
+    assert run_render_jobs(jobs, document, icons, use_cache=False, max_workers=max_workers)
+
+    for job in jobs:
+        assert "Fan-out" in job.html_output.read_text()
+    # Progress is reported in job order
+    generated = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Generated HTML")]
+    assert generated == [f"Generated HTML: {job.html_output.absolute()}" for job in jobs]
+
+
+def test_run_render_jobs_discover_templates_once(tmp_path, monkeypatch):
+    """Test that the templates of a matrix are discovered once, not per job."""
+    calls = []
+
+    def discover_templates():
+        calls.append(True)
+        return template_registry.discover_templates()
+
+    monkeypatch.setattr(render_jobs, "discover_templates", discover_templates)
+    monkeypatch.setattr(render_jobs, "load_template", None)
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    jobs = [RenderJob(theme_name, "skill_tree", load_theme(theme_name), html_output=tmp_path / f"{theme_name}.html")
+            for theme_name in ("default", "dark", "minimal")]
+
+    assert run_render_jobs(jobs, document, icons, use_cache=False, max_workers=1)
+    assert len(calls) == 1
+
+
+def test_run_render_jobs_reports_errors(tmp_path, capsys):
+    """Test that a failing job is reported and fails the run."""
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    jobs = [RenderJob("default", "skill_tree", load_theme("default"), html_output=blocker / "out.html")]
+
+    assert not run_render_jobs(jobs, document, icons, use_cache=False)
+    assert "Error:" in capsys.readouterr().err
+
+
+def test_run_render_jobs_continue_after_pdf_failure(tmp_path, capsys, monkeypatch):
+    """Test that a PDF that fails to render is reported without stopping the other targets."""
+    def generate_pdf(html, output, timeout=None, **kwargs):
+        assert timeout == 5
+        raise PdfTimeoutError("PDF rendering timed out after 5s")
+
+    monkeypatch.setattr(render_jobs, "generate_pdf", generate_pdf)
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    jobs = [
+        RenderJob("default", "skill_tree", load_theme("default"), pdf_output=tmp_path / "out.pdf", pdf_timeout=5),
+        RenderJob("default", "reference_card", load_theme("default"), html_output=tmp_path / "out.html"),
+    ]
+
+    assert not run_render_jobs(jobs, document, icons, use_cache=False, max_workers=1)
+    assert (tmp_path / "out.html").exists()
+    assert "PDF generation failed for default/skill_tree: PDF rendering timed out after 5s" in capsys.readouterr().err
+
+
+def test_run_render_pipeline_overlaps_pdf_and_html(tmp_path, capsys, monkeypatch):
+    """Test that a PDF renders while the next job's HTML is written, with progress in job order."""
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    templates = ["skill_tree", "reference_card", "virtual_table"]
+    jobs = [RenderJob("default", template, load_theme("default"), html_output=tmp_path / f"{template}.html",
+                      pdf_output=tmp_path / f"{template}.pdf") for template in templates]
+
+    def generate_pdf(html, output, **kwargs):
+        if output == jobs[0].pdf_output:
+            # The first PDF only finishes once the next job's HTML has been written
+            deadline = time.monotonic() + 10
+            while not jobs[1].html_output.exists():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        output.write_text(html)
+
+    monkeypatch.setattr(render_jobs, "generate_pdf", generate_pdf)
+    monkeypatch.setattr(render_jobs, "pdf_size_report", lambda path: dict.fromkeys(EMPTY_REPORT, 0))
+
+    results = run_render_pipeline(jobs, document, icons, use_cache=False)
+
+    assert [error for _, error in results] == [None] * len(jobs)
+    assert all(job.pdf_output.exists() for job in jobs)
+    generated = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Generated")]
+    assert generated == [f"Generated {kind}: {path.absolute()}"
+                         for job in jobs for kind, path in (("HTML", job.html_output), ("PDF", job.pdf_output))]
+
+
+def test_run_render_pipeline_supervised_pdfs(tmp_path, capsys, monkeypatch):
+    """Test that the pipeline's PDF stage renders supervised PDFs without forking the build process."""
+    def no_fork():
+        raise AssertionError("the build process must not fork while the PDF stage thread runs")
+
+    monkeypatch.setattr(os, "fork", no_fork)
+    monkeypatch.setenv("KEYSTONE_PDF_SOCKET", str(tmp_path / "no-server.sock"))
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", WritingRenderer)
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    jobs = [RenderJob("default", template, load_theme("default"), html_output=tmp_path / f"{template}.html",
+                      pdf_output=tmp_path / f"{template}.pdf", pdf_timeout=30)
+            for template in ["skill_tree", "reference_card"]]
+
+    results = run_render_pipeline(jobs, document, icons, use_cache=False)
+
+    assert [error for _, error in results] == [None, None]
+    # The fake renderer writes the document it was given, i.e. the print rendering
+    assert all("<!DOCTYPE html>" in job.pdf_output.read_text() for job in jobs)
+    assert "Generated PDF" in capsys.readouterr().out
+
+
+def test_run_render_jobs_postprocessors(tmp_path):
+    """Test that postprocessors run on the whole document before it is written."""
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    jobs = [RenderJob("default", "skill_tree", load_theme("default"), html_output=tmp_path / "out.html",
+                      postprocessors=(str.upper,))]
+
+    assert run_render_jobs(jobs, document, icons, use_cache=False)
+    assert "FAN-OUT" in (tmp_path / "out.html").read_text()
+
+
+def test_run_render_job_uses_print_media_for_pdf(tmp_path, monkeypatch):
+    """Test that templates with a media option get a static rendering for the PDF."""
+    rendered = {}
+    monkeypatch.setattr(render_jobs, "pdf_size_report", lambda path: dict.fromkeys(EMPTY_REPORT, 0))
+    monkeypatch.setattr(render_jobs, "generate_pdf", lambda html, output, base_url=None, offline=False, **kwargs: rendered.setdefault(output, html))
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    job = RenderJob("default", "virtual_table", load_theme("default"),
+                    html_output=tmp_path / "out.html", pdf_output=tmp_path / "out.pdf")
+
+    messages, error = run_render_job(job, document, icons, use_cache=False, echo=False)
+
+    assert error is None
+    assert "keystone-data" in (tmp_path / "out.html").read_text()
+    assert "<table" in rendered[tmp_path / "out.pdf"]
+    assert "<script" not in rendered[tmp_path / "out.pdf"]
+
+
+def test_run_render_jobs_pass_print_stylesheets(tmp_path, monkeypatch):
+    """Test that print stylesheets go to the PDF renderer instead of into every document."""
+    rendered = {}
+    monkeypatch.setattr(render_jobs, "pdf_size_report", lambda path: dict.fromkeys(EMPTY_REPORT, 0))
+    monkeypatch.setattr(render_jobs, "generate_pdf",
+                        lambda html, output, stylesheets=(), **kwargs: rendered.setdefault(output, (html, stylesheets)))
+    icons = load_icons()
+    document = build_document(SAMPLE_DATA, icons)
+    theme = load_theme("default")
+    jobs = [RenderJob("default", template, theme, html_output=None, pdf_output=tmp_path / f"{template}.pdf")
+            for template in ("skill_tree", "reference_card", "virtual_table")]
+
+    assert run_render_jobs(jobs, document, icons, use_cache=False, max_workers=1)
+
+    skill_tree_html, skill_tree_styles = rendered[tmp_path / "skill_tree.pdf"]
+    assert skill_tree_styles == [skill_tree.print_stylesheet(theme)]
+    assert PRINT_STYLES not in skill_tree_html and PRINT_STYLES in skill_tree_styles[0]
+    assert rendered[tmp_path / "reference_card.pdf"][1] == [reference_card.print_stylesheet(theme)]
+    # The virtual table's static version is themed: the theme's print styles are its stylesheet
+    virtual_table_html, virtual_table_styles = rendered[tmp_path / "virtual_table.pdf"]
+    assert virtual_table_styles == [theme["print_styles"]]
+    assert theme["print_styles"] not in virtual_table_html
+
+
+def test_run_render_job_parallel_pdf_chunks(tmp_path, monkeypatch):
+    """Test that large sheets are split into category chunks for the PDF."""
+    chunks, limits = {}, {}
+    monkeypatch.setattr(render_jobs, "PDF_CHUNK_KEYBINDS", 2)
+    monkeypatch.setattr(render_jobs, "can_render_in_chunks", lambda html: True)
+    monkeypatch.setattr(render_jobs, "pdf_size_report", lambda path: dict.fromkeys(EMPTY_REPORT, 0))
+
+    def render_pdf_chunks(html_chunks, output, timeout=None, memory_limit_mb=None, **kwargs):
+        chunks[output] = html_chunks
+        limits.update(timeout=timeout, memory=memory_limit_mb)
+        return 0
+
+    monkeypatch.setattr(render_jobs, "render_pdf_chunks", render_pdf_chunks)
+    icons = load_icons()
+    data = {"title": "Chunked", "categories": [
+        {"name": f"Group {index}", "keybinds": [{"action": f"Action {index}", "keys": ["Ctrl+S"]}] * 2}
+        for index in range(3)
+    ]}
+    job = RenderJob("default", "reference_card", load_theme("default"), html_output=None,
+                    pdf_output=tmp_path / "out.pdf", parallel_pdf=True, pdf_timeout=60, pdf_memory_limit_mb=512)
+
+    messages, error = run_render_job(job, build_document(data, icons), icons, use_cache=False, echo=False)
+
+    assert error is None
+    html_chunks = chunks[tmp_path / "out.pdf"]
+    assert len(html_chunks) == 3
+    assert ["Group 0" in html for html in html_chunks] == [True, False, False]
+    assert all(f"Group {index}" in html for index, html in enumerate(html_chunks))
+    # Every chunk render gets the job's limits
+    assert limits == {"timeout": 60, "memory": 512}
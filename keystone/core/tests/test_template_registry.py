@@ -0,0 +1,115 @@
+import pickle
+import sys
+
+import pytest
+
+from keystone.core import template_registry
+from keystone.core.template_registry import discover_templates, load_template, template_options
+
+USER_TEMPLATE = '''"""
+Minimal template: a bare list of category names.
+"""
+
+
+def generate_html(data, theme, icons):
+    return "<ul>" + "".join(f"<li>{c['name']}</li>" for c in data.get("categories", [])) + "</ul>"
+'''
+
+
+@pytest.fixture
+def user_dir(tmp_path, monkeypatch):
+    """Point the user template directories at an empty temporary directory."""
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    monkeypatch.setenv("KEYSTONE_TEMPLATE_PATH", str(template_dir))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    return template_dir
+
+
+def test_builtin_templates_default_first(user_dir):
+    """Test that builtin templates are discovered with the default first."""
+    templates = discover_templates()
+    assert list(templates)[:2] == ["skill_tree", "reference_card"]
+    assert templates["skill_tree"].source == "package"
+    assert templates["skill_tree"].description.startswith("Categories")
+
+
+def test_discovery_does_not_import(user_dir):
+    """Test that discovery reads metadata without importing template modules."""
+    (user_dir / "minimal.py").write_text(USER_TEMPLATE)
+    templates = discover_templates()
+    assert not any(spec.loaded for spec in templates.values())
+    assert "keystone_user_templates.minimal" not in sys.modules
+
+
+def test_user_template(user_dir):
+    """Test discovering and loading a template from the user directory."""
+    (user_dir / "minimal.py").write_text(USER_TEMPLATE)
+    (user_dir / "_helpers.py").write_text("def generate_html(data, theme, icons): return ''\n")
+    (user_dir / "notes.py").write_text("x = 1\n")
+
+    templates = discover_templates()
+    assert templates["minimal"].source == "user"
+    assert templates["minimal"].description == "A bare list of category names."
+    assert "_helpers" not in templates
+    assert "notes" not in templates
+
+    module = load_template("minimal", templates)
+    assert module.generate_html({"categories": [{"name": "A"}]}, {}, {}) == "<ul><li>A</li></ul>"
+    assert templates["minimal"].loaded
+
+
+def test_loaded_template_can_be_pickled(user_dir):
+    """Test that a loaded template can be sent to a worker process, which imports it again."""
+    spec = discover_templates()["skill_tree"]
+    spec.load()
+
+    copy = pickle.loads(pickle.dumps(spec))
+    assert spec.loaded and not copy.loaded
+    assert copy.load() is spec.load()
+
+
+def test_user_template_overrides_builtin(user_dir):
+    """Test that a user template shadows a builtin of the same name."""
+    (user_dir / "reference_card.py").write_text(USER_TEMPLATE)
+    assert discover_templates()["reference_card"].source == "user"
+
+
+def test_entry_point_templates(user_dir, monkeypatch):
+    """Test that keystone.templates entry points are registered lazily."""
+    loaded = []
+
+    class FakeEntryPoint:
+        name = "plugin"
+        value = "plugin_pkg.template"
+
+        def load(self):
+            loaded.append(True)
+            return sys.modules[__name__]
+
+    monkeypatch.setattr(template_registry, "entry_points", lambda group: [FakeEntryPoint()])
+    templates = discover_templates()
+    assert templates["plugin"].source == "entry point"
+    assert loaded == []
+
+
+def test_unknown_template(user_dir):
+    """Test the error for an unknown template name."""
+    with pytest.raises(ImportError, match="Available templates: skill_tree, reference_card"):
+        load_template("missing")
+
+
+def test_template_options():
+    """Test that unsupported options are dropped for minimal templates."""
+    def minimal(data, theme, icons):
+        pass
+
+    def full(data, theme, icons, asset_dir=None):
+        pass
+
+    def flexible(data, theme, icons, **kwargs):
+        pass
+
+    assert template_options(minimal, asset_dir="x") == {}
+    assert template_options(full, asset_dir="x", fragment_cache=None) == {"asset_dir": "x"}
+    assert template_options(flexible, asset_dir="x", fragment_cache=None) == {"asset_dir": "x", "fragment_cache": None}
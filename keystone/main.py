@@ -1,18 +1,35 @@
 import argparse
 import sys
-import importlib
 import json
 import shutil
 import os
 from pathlib import Path
 
+from .core.document import build_document
 from .core.layout_parser import parse_layout
+from .core.render_jobs import RenderJob, output_suffix, parse_name_list, run_render_jobs
+from .core.template_registry import DEFAULT_TEMPLATE, discover_templates, load_template
 from .core.validator import validate_references
-from .utils.theme_loader import load_theme, load_icons
-from .utils.pdf_generator import generate_pdf
+from .utils.class_dedup import dedupe_classes
+from .utils.minify import minify_html
+from .utils.pdf_server import serve
+from .utils.pdf_size import PdfOptions
+from .utils.theme_loader import list_themes, load_theme, load_icons
 from .utils.discovery import find_layout_file
 
 
+def _name_list_type(available, all_names=None):
+    """Build an argparse type for comma-separated name lists (or 'all')."""
+    def parse(value):
+        try:
+            if value.strip() == "all" and all_names is not None:
+                return all_names()
+            return parse_name_list(value, available)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    return parse
+
+
 def handle_validate_command(args) -> int:
     """Handle the --validate command."""
     # Determine layout file to use
@@ -41,24 +58,23 @@ def handle_validate_command(args) -> int:
         print(f"Validating layout file: {layout_file_path}")
         layout_data = parse_layout(layout_file_path)
         
-        # Determine theme to use (CLI override takes precedence)
-        theme_name = args.theme or layout_data.get("theme", "default")
-        print(f"Validating theme: {theme_name}")
+        # Determine themes to use (CLI override takes precedence)
+        theme_names = args.theme or [layout_data.get("theme", "default")]
+        print(f"Validating theme: {', '.join(theme_names)}")
         
-        # Load theme and icons
-        theme = load_theme(theme_name)
+        # Load icons
         icons = load_icons()
         
         # Validate theme and icon references
         print("Validating theme and icon references...")
-        is_valid, error_message = validate_references(layout_data, theme, icons)
+        for theme_name in theme_names:
+            is_valid, error_message = validate_references(layout_data, load_theme(theme_name), icons)
+            if not is_valid:
+                print(f"✗ Validation failed: {error_message}", file=sys.stderr)
+                return 1
         
-        if is_valid:
-            print("✓ Validation successful! All references are valid.")
-            return 0
-        else:
-            print(f"✗ Validation failed: {error_message}", file=sys.stderr)
-            return 1
+        print("✓ Validation successful! All references are valid.")
+        return 0
             
     except Exception as e:
         print(f"✗ Validation failed: {e}", file=sys.stderr)
@@ -173,7 +189,40 @@ def handle_list_themes_command() -> int:
         return 1
 
 
+def handle_list_templates_command(templates) -> int:
+    """Handle the --list-templates command."""
+    if not templates:
+        print("No templates found.")
+        return 0
+    
+    print("Available templates:")
+    for name, spec in templates.items():
+        source = "" if spec.source == "package" else f" ({spec.source})"
+        print(f"  • {name} - {spec.description}{source}")
+    
+    print("\n📖 To use a template, run: keystone layout.yml --template <template_name>")
+    
+    return 0
+
+
+def handle_pdf_server_command(argv) -> int:
+    """Handle the pdf-server command."""
+    parser = argparse.ArgumentParser(
+        prog="keystone pdf-server",
+        description="Keep WeasyPrint loaded and render PDFs for other keystone runs"
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket to listen on (default: $KEYSTONE_PDF_SOCKET or pdf-server.sock in the cache directory)"
+    )
+    args = parser.parse_args(argv)
+    return serve(args.socket)
+
+
 def main():
+    if sys.argv[1:2] == ["pdf-server"]:
+        return handle_pdf_server_command(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description="Keystone Cheatsheet Generator",
         prog="keystone",
@@ -184,6 +233,7 @@ Examples:
   keystone layout.yml --output cheatsheet.html
   keystone layout.yml --format pdf --output cheatsheet.pdf
   keystone layout.yml --template skill_tree --theme dark
+  keystone pdf-server                         # Keep WeasyPrint warm for faster PDF builds
         """
     )
     
@@ -195,14 +245,17 @@ Examples:
     )
     
     # Optional arguments
+    templates = discover_templates()
     parser.add_argument(
         "--template", 
-        choices=["skill_tree", "reference_card"],
-        help="Override the template specified in the layout file (choices: skill_tree, reference_card)"
+        type=_name_list_type(list(templates)),
+        help=f"Override the template specified in the layout file: one of {', '.join(templates)}, "
+             "a comma-separated list, or 'all'"
     )
     parser.add_argument(
         "--theme", 
-        help="Override the theme specified in the layout file"
+        type=_name_list_type(None, all_names=list_themes),
+        help="Override the theme specified in the layout file: a theme name, a comma-separated list, or 'all'"
     )
     parser.add_argument(
         "--format", 
@@ -214,6 +267,92 @@ Examples:
         "--output", 
         help="Output file name (default: derived from layout file)"
     )
+    parser.add_argument(
+        "--sidecar-fonts",
+        action="store_true",
+        help="Write subset font files next to the output instead of embedding them as data URIs"
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Embed a search box that filters keybinds as you type (precomputed index, HTML output)"
+    )
+    parser.add_argument(
+        "--dedupe-classes",
+        action="store_true",
+        help="Replace repeated class strings with short generated classes to shrink the output"
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify the generated HTML and inline CSS"
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Also write .html.gz (and .html.br if brotli is installed) next to the HTML output"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Never access the network while rendering PDFs; remote assets come from the asset cache or are skipped"
+    )
+    parser.add_argument(
+        "--pdf-full-fonts",
+        action="store_true",
+        help="Embed complete fonts in PDFs instead of the subset of glyphs used"
+    )
+    parser.add_argument(
+        "--pdf-uncompressed",
+        action="store_true",
+        help="Write PDF streams uncompressed (larger; for inspecting the output)"
+    )
+    parser.add_argument(
+        "--pdf-jpeg-quality",
+        type=int,
+        help="Recompress images in PDFs as JPEG with this quality (0-95)"
+    )
+    parser.add_argument(
+        "--pdf-dpi",
+        type=int,
+        help="Downscale images in PDFs to this resolution"
+    )
+    parser.add_argument(
+        "--prune-css",
+        action="store_true",
+        help="Drop CSS rules and fonts the document does not use before rendering PDFs"
+    )
+    parser.add_argument(
+        "--pdf-timeout",
+        type=float,
+        default=600,
+        help="Stop rendering a PDF after this many seconds and continue with the other targets (default: 600, 0 for no limit)"
+    )
+    parser.add_argument(
+        "--pdf-memory-limit",
+        type=int,
+        help="Stop rendering a PDF that needs more than this many megabytes of memory (POSIX only)"
+    )
+    parser.add_argument(
+        "--pack-cards",
+        action="store_true",
+        help="Reorder the cards of skill-tree PDFs so they fill the page columns, for fewer pages"
+    )
+    parser.add_argument(
+        "--parallel-pdf",
+        action="store_true",
+        help="Render the PDF of a very large sheet as groups of categories on all workers and merge the pages (requires pypdf)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Maximum number of parallel workers for several themes/templates, or for the categories of one very large sheet (default: CPU count)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every category instead of reusing cached fragments from previous runs"
+    )
     parser.add_argument(
         "--validate", 
         action="store_true", 
@@ -229,6 +368,11 @@ Examples:
         action="store_true", 
         help="List available themes"
     )
+    parser.add_argument(
+        "--list-templates",
+        action="store_true",
+        help="List available templates"
+    )
 
     args = parser.parse_args()
 
@@ -242,6 +386,9 @@ Examples:
             
         if args.list_themes:
             return handle_list_themes_command()
+        
+        if args.list_templates:
+            return handle_list_templates_command(templates)
 
         # Determine layout file to use
         if args.layout_file:
@@ -270,38 +417,37 @@ Examples:
         print(f"Loading layout from: {layout_file_path}")
         layout_data = parse_layout(layout_file_path)
         
-        # Determine theme to use (CLI override takes precedence)
-        theme_name = args.theme or layout_data.get("theme", "default")
-        print(f"Using theme: {theme_name}")
+        # Determine themes to use (CLI override takes precedence)
+        theme_names = args.theme or [layout_data.get("theme", "default")]
+        print(f"Using theme: {', '.join(theme_names)}")
         
-        # Load theme and icons
-        theme = load_theme(theme_name)
+        # Load each theme once, and the icons
+        themes = {theme_name: load_theme(theme_name) for theme_name in theme_names}
         icons = load_icons()
         
         # Validate theme and icon references
         print("Validating theme and icon references...")
-        is_valid, error_message = validate_references(layout_data, theme, icons)
-        if not is_valid:
-            print(f"Error: {error_message}", file=sys.stderr)
-            return 1
+        for theme in themes.values():
+            is_valid, error_message = validate_references(layout_data, theme, icons)
+            if not is_valid:
+                print(f"Error: {error_message}", file=sys.stderr)
+                return 1
         
-        # Generate HTML using dynamically imported template
-        template_name = args.template or layout_data.get("template", "skill_tree")
+        # Determine templates to use
+        template_names = args.template or [layout_data.get("template", DEFAULT_TEMPLATE)]
         
-        try:
-            # Dynamically import the template module
-            template_module = importlib.import_module(f"keystone.templates.{template_name}")
-            generate_html = template_module.generate_html
-        except ImportError:
-            print(f"Error: Template '{template_name}' not found. Available templates: skill_tree, reference_card", file=sys.stderr)
-            return 1
-        except AttributeError:
-            print(f"Error: Template '{template_name}' does not have a generate_html function.", file=sys.stderr)
-            return 1
+        for template_name in template_names:
+            try:
+                # Import only the selected template modules
+                load_template(template_name, templates)
+            except ImportError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            except AttributeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
             
-        print(f"Using template: {template_name}")
-        print("Generating HTML...")
-        html_content = generate_html(layout_data, theme, icons)
+        print(f"Using template: {', '.join(template_names)}")
         
         # Determine output file paths
         if args.output:
@@ -322,43 +468,51 @@ Examples:
             output_name = layout_data.get("output_name", layout_path.stem)
             output_extension = None
         
-        # Handle different output formats
-        if args.format == "html" or args.format == "both":
-            # Write HTML output
-            if output_extension == ".html":
-                html_output = output_dir / f"{output_name}{output_extension}"
-            elif output_extension is None:
-                html_output = output_dir / f"{output_name}.html"
-            else:
-                html_output = output_dir / f"{output_name}_html.html"
-            
-            html_path = Path(html_output)
-            try:
-                # Create parent directory if it doesn't exist
-                html_path.parent.mkdir(parents=True, exist_ok=True)
+        # Sidecar fonts are written next to the HTML output
+        asset_dir = output_dir if args.sidecar_fonts else None
+        
+        # Every theme/template combination shares one parsed document
+        document = build_document(layout_data, icons)
+        # Whole-document output passes, in order
+        postprocessors = []
+        if args.dedupe_classes:
+            postprocessors.append(dedupe_classes)
+        if args.minify:
+            postprocessors.append(minify_html)
+        pdf_options = PdfOptions(subset_fonts=not args.pdf_full_fonts, compress=not args.pdf_uncompressed,
+                                 jpeg_quality=args.pdf_jpeg_quality, dpi=args.pdf_dpi, prune_css=args.prune_css)
+        jobs = []
+        for theme_name in theme_names:
+            for template_name in template_names:
+                suffix = output_suffix(theme_name, template_name, theme_names, template_names)
+                html_output = pdf_output = None
                 
-                with open(html_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                print(f"Generated HTML: {html_path.absolute()}")
-            except PermissionError:
-                print(f"Error: Permission denied when writing to '{html_path}'", file=sys.stderr)
-                return 1
-            except OSError as e:
-                print(f"Error: Could not write to '{html_path}': {e}", file=sys.stderr)
-                return 1
+                if args.format == "html" or args.format == "both":
+                    if output_extension == ".html":
+                        html_output = output_dir / f"{output_name}{suffix}{output_extension}"
+                    elif output_extension is None:
+                        html_output = output_dir / f"{output_name}{suffix}.html"
+                    else:
+                        html_output = output_dir / f"{output_name}{suffix}_html.html"
+                
+                if args.format == "pdf" or args.format == "both":
+                    if output_extension == ".pdf":
+                        pdf_output = output_dir / f"{output_name}{suffix}{output_extension}"
+                    elif output_extension is None:
+                        pdf_output = output_dir / f"{output_name}{suffix}.pdf"
+                    else:
+                        pdf_output = output_dir / f"{output_name}{suffix}_pdf.pdf"
+                
+                jobs.append(RenderJob(theme_name, template_name, themes[theme_name], html_output, pdf_output,
+                                      tuple(postprocessors), args.precompress, args.search, args.offline,
+                                      args.parallel_pdf, args.pack_cards, pdf_options, args.pdf_timeout or None,
+                                      args.pdf_memory_limit, templates[template_name]))
         
-        if args.format == "pdf" or args.format == "both":
-            # Generate PDF output
-            if output_extension == ".pdf":
-                pdf_output = output_dir / f"{output_name}{output_extension}"
-            elif output_extension is None:
-                pdf_output = output_dir / f"{output_name}.pdf"
-            else:
-                pdf_output = output_dir / f"{output_name}_pdf.pdf"
-            
-            print(f"Generating PDF: {pdf_output}")
-            generate_pdf(html_content, pdf_output)
-            print(f"Generated PDF: {Path(pdf_output).absolute()}")
+        print("Generating HTML...")
+        # Unchanged categories are reused from previous runs unless --no-cache is given
+        if not run_render_jobs(jobs, document, icons, asset_dir=asset_dir,
+                               use_cache=not args.no_cache, max_workers=args.jobs):
+            return 1
         
         return 0
         
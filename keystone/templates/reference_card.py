@@ -1,7 +1,68 @@
-from typing import Dict, List, Any
+"""
+Reference Card template: all keybinds in one dense, printable table.
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
 
+from ..core.document import Category, Chord, Document, as_category, as_chords, as_document
+from ..core.fragment_scheduler import FragmentTask, render_fragments
+from ..utils.css_compiler import build_stylesheet, icon_classes
+from ..utils.fonts import build_font_css, collect_document_text
+from ..utils.fragment_cache import FragmentCache
+from ..utils.icon_sprite import build_sprite, icon_reference
+from ..utils.key_chips import render_key_display
+from ..utils.print_sheet import print_document_start, print_sheet_styles, render_print_keys
+from ..utils.search_index import SEARCH_INPUT, SEARCH_INPUT_CLASSES, render_search_assets
 
-def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+
+# generate_html and iter_html also accept a prebuilt core.document.Document
+ACCEPTS_DOCUMENT = True
+
+# Utility classes written by this template itself (theme classes are collected separately)
+UTILITY_CLASSES = (
+    "mb-2 mb-6 text-2xl font-bold text-gray-800 text-gray-600 text-sm text-center text-gray-500 "
+    "w-full border w-1/4 w-1/3 px-3 py-2 text-left font-medium align-top flex items-center gap-2 "
+    "italic text-gray-400 text-xs mx-1 inline-flex gap-1 flex-wrap "
+    "bg-gray-800 text-gray-100 font-semibold border-gray-600 bg-gray-100 text-gray-700 border-gray-300 "
+    "hover:bg-gray-800 border-gray-700 hover:bg-gray-50"
+)
+
+# Table styles of the print rendering (added to print_sheet.PRINT_STYLES)
+PRINT_TABLE_STYLES = (
+    "table{width:100%;border-collapse:collapse}"
+    "th,td{border:.5pt solid #000;padding:.08cm .15cm;text-align:left;vertical-align:top}"
+    "thead th{background:#eee}"
+    "thead th:nth-child(1),thead th:nth-child(3){width:25%}"
+    "thead th:nth-child(2){width:33.3333%}"
+    "tbody th{font-weight:500}"
+    "tr{break-inside:avoid}"
+    ".desc{color:#333;font-size:8pt}"
+)
+
+PRINT_TABLE_HEAD = "<thead><tr><th>Category</th><th>Action</th><th>Keybind</th><th>Description</th></tr></thead>"
+
+
+def print_stylesheet(theme: Dict[str, Any]) -> str:
+    """
+    Get the stylesheet of the print rendering.
+
+    Renderers that parse stylesheets once (see utils.pdf_renderer) pass it
+    separately and render with ``inline_print_styles=False``.
+
+    Args:
+        theme: Theme configuration
+
+    Returns:
+        CSS text the print rendering otherwise embeds
+    """
+    return print_sheet_styles(PRINT_TABLE_STYLES)
+
+
+def generate_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+                  asset_dir: Optional[Union[str, Path]] = None,
+                  fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                  workers: Optional[int] = None, media: str = "screen",
+                  inline_print_styles: bool = True) -> str:
     """
     Generate the complete HTML document for the 'Reference Card' template.
     
@@ -9,23 +70,84 @@ def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str,
         data: Merged keybind data containing tool info and categories
         theme: Theme configuration with styling classes
         icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for rendered category fragments. If None, every
+            category is rendered.
+        search: Embed a search box with a precomputed keybind index
+        workers: Worker processes for the table rows of large sheets.
+            If None, rows are rendered in-process.
+        media: "screen" for the themed page, "print" for lean markup with a
+            precomputed print stylesheet (used for PDF output; no search)
+        inline_print_styles: Embed the print stylesheet in the print
+            rendering. If False, the renderer supplies print_stylesheet().
         
     Returns:
         Complete HTML document as a string
     """
+    return "".join(iter_html(data, theme, icons, asset_dir=asset_dir, fragment_cache=fragment_cache, search=search,
+                             workers=workers, media=media, inline_print_styles=inline_print_styles))
+
+
+def iter_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+              asset_dir: Optional[Union[str, Path]] = None,
+              fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+              workers: Optional[int] = None, media: str = "screen",
+              inline_print_styles: bool = True) -> Iterator[str]:
+    """
+    Render the 'Reference Card' document as a stream of chunks.
+    
+    Yields the document head, then the table rows one category at a time, then
+    the closing markup. Joining the chunks gives exactly the output of
+    generate_html.
+    
+    Args:
+        data: Merged keybind data containing tool info and categories
+        theme: Theme configuration with styling classes
+        icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for rendered category fragments. If None, every
+            category is rendered.
+        search: Embed a search box with a precomputed keybind index
+        workers: Worker processes for the table rows of large sheets.
+            If None, rows are rendered in-process.
+        media: "screen" for the themed page, "print" for lean print markup
+        inline_print_styles: Embed the print stylesheet (see generate_html)
+        
+    Yields:
+        Consecutive pieces of the HTML document
+    """
+    document = as_document(data, icons)
+    
+    if media == "print":
+        font_faces = build_font_css(collect_document_text(document.source), asset_dir=asset_dir)
+        yield print_document_start(document, "Reference Card", PRINT_TABLE_STYLES, font_faces,
+                                   build_sprite(icons, document.used_icons), inline_print_styles)
+        yield from iter_reference_table(document.categories, theme, icons, fragment_cache=fragment_cache,
+                                        workers=workers, media=media)
+        yield '\n</body>\n</html>'
+        return
+    
     # Get print styles from theme if available
     print_styles = theme.get("print_styles", "")
+    extra_classes = icon_classes(icons, document.used_icons)
+    if search:
+        extra_classes += f" {SEARCH_INPUT_CLASSES}"
+    utility_styles = build_stylesheet(theme, UTILITY_CLASSES, extra_classes)
+    font_faces = build_font_css(collect_document_text(document.source), asset_dir=asset_dir)
+    icon_sprite = build_sprite(icons, document.used_icons)
     
     # Generate the HTML structure
-    html_content = f'''<!DOCTYPE html>
+    yield f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{data.get("title", data.get("tool", "Keystone"))} - Reference Card</title>
-    <script src="https://cdn.tailwindcss.com"></script>
+    <title>{document.title} - Reference Card</title>
+    <style id="keystone-utilities">{utility_styles}</style>
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+        {font_faces}
         body {{ font-family: 'Inter', sans-serif; }}
         .keybind-key {{ 
             display: inline-block;
@@ -39,39 +161,86 @@ def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str,
     </style>
 </head>
 <body class="{theme["base_styles"]["body"]}">
+    {icon_sprite}
     <div class="{theme["base_styles"]["container"]}">
         <header class="mb-6">
-            <h1 class="text-2xl font-bold text-gray-800 mb-2">{data.get("title", data.get("tool", "Keystone"))}</h1>
-            {f'<p class="text-gray-600 text-sm">Version: {data["version"]}</p>' if data.get("version") else ''}
+            <h1 class="text-2xl font-bold text-gray-800 mb-2">{document.title}</h1>
+            {f'<p class="text-gray-600 text-sm">Version: {document.version}</p>' if document.version else ''}{SEARCH_INPUT if search else ''}
         </header>
         
-        {generate_reference_table(data.get("categories", []), theme, icons)}
-    </div>
+        '''
+    
+    yield from iter_reference_table(document.categories, theme, icons, fragment_cache=fragment_cache, search=search, workers=workers)
+    
+    search_assets = render_search_assets(document) if search else ''
+    yield f'''
+    </div>{search_assets}
 </body>
 </html>'''
-    
-    return html_content
 
 
-def generate_reference_table(categories: List[Dict[str, Any]], theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+def generate_reference_table(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                             fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                             workers: Optional[int] = None, media: str = "screen") -> str:
     """
     Generate HTML table for all categories in a dense reference format.
     
     Args:
-        categories: List of category dictionaries
+        categories: Categories (or category dictionaries)
         theme: Theme configuration
         icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category rows
+        search: Group rows per category and mark them for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for the themed table, "print" for a lean print table
         
     Returns:
         HTML string for the reference table
     """
+    return "".join(iter_reference_table(categories, theme, icons, fragment_cache=fragment_cache, search=search,
+                                        workers=workers, media=media))
+
+
+def iter_reference_table(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                         fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                         workers: Optional[int] = None, media: str = "screen") -> Iterator[str]:
+    """
+    Generate the reference table in chunks: table head, rows per category, table foot.
+    
+    Args:
+        categories: Categories (or category dictionaries)
+        theme: Theme configuration
+        icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category rows
+        search: Group rows per category and mark them for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for the themed table, "print" for a lean print table
+        
+    Yields:
+        Consecutive pieces of the reference table HTML
+    """
+    if media == "print":
+        if not categories:
+            yield '<p class="empty">No categories found</p>'
+            return
+        yield f"<table>{PRINT_TABLE_HEAD}<tbody>\n"
+        yield from iter_table_rows(categories, theme, icons, fragment_cache=fragment_cache, workers=workers,
+                                   media=media)
+        yield "\n</tbody></table>"
+        return
+    
     if not categories:
-        return '<div class="text-center text-gray-500">No categories found</div>'
+        yield '<div class="text-center text-gray-500">No categories found</div>'
+        return
     
     border_class = get_table_border_classes(theme)
     
+    # With search, each category brings its own <tbody> so it can be hidden as a group
+    body_open = "\n        " if search else "\n        <tbody>\n            "
+    body_close = "" if search else "\n        </tbody>"
+    
     # Build the complete table
-    table_html = f'''
+    yield f'''
     <table class="w-full border {border_class}">
         <thead>
             <tr class="{get_table_header_classes(theme)}">
@@ -80,123 +249,196 @@ def generate_reference_table(categories: List[Dict[str, Any]], theme: Dict[str,
                 <th class="border {border_class} px-3 py-2 text-left w-1/4">Keybind</th>
                 <th class="border {border_class} px-3 py-2 text-left">Description</th>
             </tr>
-        </thead>
-        <tbody>
-            {generate_table_rows(categories, theme, icons)}
-        </tbody>
-    </table>'''
+        </thead>{body_open}'''
+    
+    yield from iter_table_rows(categories, theme, icons, fragment_cache=fragment_cache, search=search, workers=workers)
     
-    return table_html
+    yield f'''{body_close}
+    </table>'''
 
 
-def generate_table_rows(categories: List[Dict[str, Any]], theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+def generate_table_rows(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                        fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                        workers: Optional[int] = None, media: str = "screen") -> str:
     """
     Generate table rows for all keybinds across all categories.
     
     Args:
-        categories: List of category dictionaries
+        categories: Categories (or category dictionaries)
         theme: Theme configuration
         icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category rows
+        search: Group rows per category and mark them for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for themed rows, "print" for lean print rows
         
     Returns:
         HTML string for table rows
     """
+    return "".join(iter_table_rows(categories, theme, icons, fragment_cache=fragment_cache, search=search,
+                                   workers=workers, media=media))
+
+
+def iter_table_rows(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                    fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                    workers: Optional[int] = None, media: str = "screen") -> Iterator[str]:
+    """
+    Generate table rows for all keybinds, one category at a time.
+    
+    Args:
+        categories: Categories (or category dictionaries)
+        theme: Theme configuration
+        icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category rows
+        search: Group rows per category and mark them for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for themed rows, "print" for lean print rows (never
+            marked for search)
+        
+    Yields:
+        HTML string for the rows of each category (newline-separated)
+    """
+    printing = media == "print"
+    search = search and not printing
+    tasks = []
+    row_offset = 0
+    for index, category in enumerate(categories):
+        category = as_category(category, icons, index)
+        # Search row ids number keybinds across the whole document
+        category_offset = row_offset if search else None
+        row_offset += len(category.keybinds)
+        variant: Tuple[Any, ...] = (category.icon, icons[category.icon] if category.icon else None)
+        if printing:
+            variant += ("print",)
+        if search:
+            variant += ("search", category.index, category_offset)
+        tasks.append(FragmentTask(category, variant, category_offset))
+    
+    render = _render_print_rows if printing else generate_category_rows
+    fragments = render_fragments("reference_card", render, tasks, theme, icons,
+                                 fragment_cache=fragment_cache, workers=workers)
+    for index, category_rows in enumerate(fragments):
+        yield f"\n{category_rows}" if index else category_rows
+
+
+def generate_category_rows(category: Union[Dict[str, Any], Category], theme: Dict[str, Any], icons: Dict[str, str],
+                           row_offset: Optional[int] = None) -> str:
+    """
+    Generate the table rows for one category.
+    
+    Args:
+        category: Category (or category dictionary) with name and keybinds
+        theme: Theme configuration
+        icons: Icon dictionary
+        row_offset: Search row id of the first keybind. If given, the rows are
+            wrapped in their own ``<tbody>`` and marked for search.
+        
+    Returns:
+        HTML string for the category's rows
+    """
+    category = as_category(category, icons)
     rows = []
     border_class = get_table_border_classes(theme)
     row_class = get_table_row_classes(theme)
+    keybinds = category.keybinds
     
-    for category in categories:
-        category_name = category.get("name", "Unknown Category")
-        keybinds = category.get("keybinds", [])
-        
-        # Get icon (use default if not specified or not found)
-        icon_name = category.get("icon_name", "grid")
-        icon_svg = icons.get(icon_name, icons.get("grid", ""))
-        
-        if not keybinds:
-            # Empty category row
-            rows.append(f'''
+    # Reference the sprite icon (already resolved to the default if missing)
+    icon_svg = icon_reference(category.icon, icons)
+    
+    if not keybinds:
+        # Empty category row
+        rows.append(f'''
             <tr class="{row_class}">
                 <td class="border {border_class} px-3 py-2 font-medium">
                     <div class="flex items-center gap-2">
                         {icon_svg}
-                        <span>{category_name}</span>
+                        <span>{category.name}</span>
                     </div>
                 </td>
                 <td class="border {border_class} px-3 py-2 text-gray-500 italic" colspan="3">No keybinds available</td>
             </tr>''')
-        else:
-            # Generate rows for each keybind in the category
-            for j, keybind in enumerate(keybinds):
-                action = keybind.get("action", "Unknown Action")
-                keys = keybind.get("keys", [])
-                description = keybind.get("description", "")
-                
-                # Show category name only for the first keybind in each category
-                category_cell = ""
-                if j == 0:
-                    rowspan = f' rowspan="{len(keybinds)}"' if len(keybinds) > 1 else ""
-                    category_cell = f'''
-                    <td class="border {border_class} px-3 py-2 font-medium align-top"{rowspan}>
+    else:
+        # Generate rows for each keybind in the category
+        for j, keybind in enumerate(keybinds):
+            # Show category name only for the first keybind in each category
+            category_cell = ""
+            if j == 0:
+                rowspan = f' rowspan="{len(keybinds)}"' if len(keybinds) > 1 else ""
+                # The search script moves this cell to the first visible row
+                head_attribute = ' data-h' if row_offset is not None else ''
+                category_cell = f'''
+                    <td class="border {border_class} px-3 py-2 font-medium align-top"{rowspan}{head_attribute}>
                         <div class="flex items-center gap-2">
                             {icon_svg}
-                            <span>{category_name}</span>
+                            <span>{category.name}</span>
                         </div>
                     </td>'''
-                
-                # Generate key display
-                key_display = generate_key_display(keys, theme)
-                
-                rows.append(f'''
-                <tr class="{row_class}">
+            
+            # Generate key display
+            key_display = generate_key_display(keybind.chords, theme)
+            row_attribute = f' data-k="{row_offset + j}"' if row_offset is not None else ''
+            
+            rows.append(f'''
+                <tr class="{row_class}"{row_attribute}>
                     {category_cell}
-                    <td class="border {border_class} px-3 py-2">{action}</td>
+                    <td class="border {border_class} px-3 py-2">{keybind.action}</td>
                     <td class="border {border_class} px-3 py-2">{key_display}</td>
-                    <td class="border {border_class} px-3 py-2 text-sm text-gray-600">{description}</td>
+                    <td class="border {border_class} px-3 py-2 text-sm text-gray-600">{keybind.description}</td>
                 </tr>''')
     
+    if row_offset is not None:
+        return f'<tbody data-c="{category.index}">' + '\n'.join(rows) + '\n            </tbody>'
     return '\n'.join(rows)
 
 
-def generate_key_display(keys: List[str], theme: Dict[str, Any]) -> str:
+def _render_print_rows(category: Category, theme: Dict[str, Any], icons: Dict[str, str],
+                       row_offset: Optional[int]) -> str:
+    # Module-level so render_fragments can send it to worker processes
+    return generate_print_rows(category, icons)
+
+
+def generate_print_rows(category: Union[Dict[str, Any], Category], icons: Dict[str, str]) -> str:
     """
-    Generate HTML for displaying keyboard keys in table format.
+    Generate lean print rows for one category.
     
     Args:
-        keys: List of key strings
-        theme: Theme configuration
+        category: Category (or category dictionary) with name and keybinds
+        icons: Icon dictionary
         
     Returns:
-        HTML string for key display
+        HTML string for the category's rows, styled by PRINT_TABLE_STYLES
     """
-    if not keys:
-        return '<span class="text-gray-400">-</span>'
-    
-    # Handle keys as string or list
-    if isinstance(keys, str):
-        keys = [keys]
+    category = as_category(category, icons)
+    keybinds = category.keybinds
+    label = f'{icon_reference(category.icon, icons)}{category.name}'
+    if not keybinds:
+        return f'<tr><th>{label}</th><td class="empty" colspan="3">No keybinds available</td></tr>'
     
-    key_combinations = []
-    key_class = theme["keybind_styles"]["key"]
+    rowspan = f' rowspan="{len(keybinds)}"' if len(keybinds) > 1 else ""
+    return "\n".join(
+        f'<tr>{f"<th{rowspan}>{label}</th>" if j == 0 else ""}<td>{keybind.action}</td>'
+        f'<td>{render_print_keys(keybind.chords)}</td><td class="desc">{keybind.description}</td></tr>'
+        for j, keybind in enumerate(keybinds)
+    )
+
+
+def generate_key_display(keys: Union[List[str], Sequence[Chord]], theme: Dict[str, Any]) -> str:
+    """
+    Generate HTML for displaying keyboard keys in table format.
     
-    for key in keys:
-        # Split compound keys like "Ctrl+S" into individual key boxes
-        individual_keys = key.split('+')
-        key_boxes = []
-        
-        for i, individual_key in enumerate(individual_keys):
-            # Clean up the key (remove extra spaces)
-            clean_key = individual_key.strip()
-            key_boxes.append(f'<kbd class="{key_class} keybind-key text-xs">{clean_key}</kbd>')
-            
-            # Add "+" separator between keys (but not after the last one)
-            if i < len(individual_keys) - 1:
-                key_boxes.append('<span class="text-gray-500 mx-1">+</span>')
+    Args:
+        keys: Parsed chords (or a list of key strings)
+        theme: Theme configuration
         
-        key_combinations.append(''.join(key_boxes))
-    
-    # Join multiple key combinations with spacing
-    return f'<div class="inline-flex items-center gap-1 flex-wrap">{"<span class=\"mx-1\"></span>".join(key_combinations)}</div>'
+    Returns:
+        HTML string for key display
+    """
+    return render_key_display(
+        as_chords(keys),
+        f'{theme["keybind_styles"]["key"]} keybind-key text-xs',
+        'inline-flex items-center gap-1 flex-wrap',
+        '<span class="mx-1"></span>',
+    )
 
 
 def get_table_header_classes(theme: Dict[str, Any]) -> str:
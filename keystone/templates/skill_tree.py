@@ -1,7 +1,74 @@
-from typing import Dict, List, Any
+"""
+Skill Tree template: categories as a responsive grid of color-coded cards.
+"""
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
 
+from ..core.document import Category, Chord, Document, Keybind, as_category, as_chords, as_document, as_keybinds
+from ..core.fragment_scheduler import FragmentTask, render_fragments
+from ..utils.card_packing import pack_pages
+from ..utils.css_compiler import build_stylesheet, icon_classes
+from ..utils.fonts import build_font_css, collect_document_text
+from ..utils.fragment_cache import FragmentCache
+from ..utils.icon_sprite import build_sprite, icon_reference
+from ..utils.key_chips import render_key_display
+from ..utils.print_sheet import print_document_start, print_sheet_styles, render_print_keys
+from ..utils.search_index import SEARCH_INPUT, SEARCH_INPUT_CLASSES, render_search_assets
 
-def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+
+# generate_html and iter_html also accept a prebuilt core.document.Document
+ACCEPTS_DOCUMENT = True
+
+# Utility classes written by this template itself (theme classes are collected separately)
+UTILITY_CLASSES = (
+    "mb-2 mb-8 text-3xl font-bold text-gray-800 text-gray-600 "
+    "grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 "
+    "col-span-full text-center text-gray-500 flex items-center gap-3 text-lg font-semibold text-sm "
+    "justify-between py-2 border-b border-gray-100 last:border-b-0 flex-1 min-w-0 font-medium mt-1 "
+    "flex-shrink-0 ml-4 space-y-1 text-gray-400 mx-1 mx-2"
+)
+
+# Card styles of the print rendering (added to print_sheet.PRINT_STYLES)
+PRINT_CARD_STYLES = (
+    ".cards{columns:2;column-gap:.5cm}"
+    ".page{display:flex;align-items:flex-start}"
+    ".page+.page{break-before:page}"
+    ".column{flex:1 1 0;min-width:0}"
+    ".column+.column{margin-left:.5cm}"
+    ".card{break-inside:avoid;border:1pt solid #000;margin:0 0 .4cm}"
+    ".card h2{font-size:11pt;margin:0;padding:.15cm .25cm;border-bottom:1pt solid #000}"
+    ".card ul{list-style:none;margin:0;padding:0 .25cm}"
+    ".card li{display:flex;align-items:center;padding:.08cm 0;border-bottom:.5pt solid #999}"
+    ".card li:last-child{border-bottom:0}"
+    ".card li>div:first-child{flex:1}"
+    ".card .keys{margin-left:.3cm}"
+    ".card small{display:block;color:#333;font-size:8pt}"
+    ".card .empty{margin:.15cm .25cm}"
+)
+
+
+def print_stylesheet(theme: Dict[str, Any]) -> str:
+    """
+    Get the stylesheet of the print rendering.
+
+    Renderers that parse stylesheets once (see utils.pdf_renderer) pass it
+    separately and render with ``inline_print_styles=False``.
+
+    Args:
+        theme: Theme configuration
+
+    Returns:
+        CSS text the print rendering otherwise embeds
+    """
+    return print_sheet_styles(PRINT_CARD_STYLES)
+
+
+def generate_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+                  asset_dir: Optional[Union[str, Path]] = None,
+                  fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                  workers: Optional[int] = None, media: str = "screen", pack: bool = False,
+                  inline_print_styles: bool = True) -> str:
     """
     Generate the complete HTML document for the 'Skill Tree' template.
     
@@ -9,23 +76,105 @@ def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str,
         data: Merged keybind data containing tool info and categories
         theme: Theme configuration with styling classes
         icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for rendered category fragments. If None, every
+            category is rendered.
+        search: Embed a search box with a precomputed keybind index
+        workers: Worker processes for the category cards of large sheets.
+            If None, cards are rendered in-process.
+        media: "screen" for the themed page, "print" for lean markup with a
+            precomputed print stylesheet (used for PDF output; no search)
+        pack: In the print rendering, reorder the cards so they fill the
+            page columns (see utils.card_packing)
+        inline_print_styles: Embed the print stylesheet in the print
+            rendering. If False, the renderer supplies print_stylesheet().
         
     Returns:
         Complete HTML document as a string
     """
+    return "".join(iter_html(data, theme, icons, asset_dir=asset_dir, fragment_cache=fragment_cache, search=search,
+                             workers=workers, media=media, pack=pack,
+                             inline_print_styles=inline_print_styles))
+
+
+def iter_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+              asset_dir: Optional[Union[str, Path]] = None,
+              fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+              workers: Optional[int] = None, media: str = "screen", pack: bool = False,
+              inline_print_styles: bool = True) -> Iterator[str]:
+    """
+    Render the 'Skill Tree' document as a stream of chunks.
+    
+    Yields the document head, then one chunk per category card, then the closing
+    markup, so the output can be written without holding the whole document in
+    memory. Joining the chunks gives exactly the output of generate_html.
+    
+    Args:
+        data: Merged keybind data containing tool info and categories
+        theme: Theme configuration with styling classes
+        icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for rendered category fragments. If None, every
+            category is rendered.
+        search: Embed a search box with a precomputed keybind index
+        workers: Worker processes for the category cards of large sheets.
+            If None, cards are rendered in-process.
+        media: "screen" for the themed page, "print" for lean print markup
+        pack: In the print rendering, reorder the cards to fill the page columns
+        inline_print_styles: Embed the print stylesheet (see generate_html)
+        
+    Yields:
+        Consecutive pieces of the HTML document
+    """
+    document = as_document(data, icons)
+    
+    if media == "print":
+        font_faces = build_font_css(collect_document_text(document.source), asset_dir=asset_dir)
+        yield print_document_start(document, "Keybind Cheatsheet", PRINT_CARD_STYLES, font_faces,
+                                   build_sprite(icons, document.used_icons), inline_print_styles)
+        if not (pack and document.categories):
+            yield '<main class="cards">\n'
+            yield from iter_categories(document.categories, theme, icons, fragment_cache=fragment_cache,
+                                       workers=workers, media=media)
+            yield '\n</main>\n</body>\n</html>'
+            return
+        
+        # One explicit container per packed column: CSS column balancing would redistribute the cards
+        pages = pack_pages(document.categories)
+        cards = iter_categories([category for page in pages for column in page for category in column], theme, icons,
+                                fragment_cache=fragment_cache, workers=workers, media=media)
+        yield '<main class="pages">\n'
+        for page in pages:
+            yield '<div class="page">'
+            for column in page:
+                yield '<div class="column">'
+                yield from (card.lstrip("\n") for card in islice(cards, len(column)))
+                yield '</div>'
+            yield '</div>\n'
+        yield '</main>\n</body>\n</html>'
+        return
+    
     # Get print styles from theme if available
     print_styles = theme.get("print_styles", "")
+    extra_classes = icon_classes(icons, document.used_icons)
+    if search:
+        extra_classes += f" {SEARCH_INPUT_CLASSES}"
+    utility_styles = build_stylesheet(theme, UTILITY_CLASSES, extra_classes)
+    font_faces = build_font_css(collect_document_text(document.source), asset_dir=asset_dir)
+    icon_sprite = build_sprite(icons, document.used_icons)
     
     # Generate the HTML structure
-    html_content = f'''<!DOCTYPE html>
+    yield f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{data.get("title", data.get("tool", "Keystone"))} - Keybind Cheatsheet</title>
-    <script src="https://cdn.tailwindcss.com"></script>
+    <title>{document.title} - Keybind Cheatsheet</title>
+    <style id="keystone-utilities">{utility_styles}</style>
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+        {font_faces}
         body {{ font-family: 'Inter', sans-serif; }}
         .keybind-key {{ 
             display: inline-block;
@@ -36,67 +185,127 @@ def generate_html(data: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str,
     </style>
 </head>
 <body class="{theme["base_styles"]["body"]}">
+    {icon_sprite}
     <div class="{theme["base_styles"]["container"]}">
         <header class="mb-8">
-            <h1 class="text-3xl font-bold text-gray-800 mb-2">{data.get("title", data.get("tool", "Keystone"))}</h1>
-            {f'<p class="text-gray-600">Version: {data["version"]}</p>' if data.get("version") else ''}
+            <h1 class="text-3xl font-bold text-gray-800 mb-2">{document.title}</h1>
+            {f'<p class="text-gray-600">Version: {document.version}</p>' if document.version else ''}{SEARCH_INPUT if search else ''}
         </header>
         
         <div class="{theme.get('grid_styles', {}).get('container', 'grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6')}">
-            {generate_categories(data.get("categories", []), theme, icons)}
+            '''
+    
+    yield from iter_categories(document.categories, theme, icons, fragment_cache=fragment_cache, search=search, workers=workers)
+    
+    search_assets = render_search_assets(document) if search else ''
+    yield f'''
         </div>
-    </div>
+    </div>{search_assets}
 </body>
 </html>'''
-    
-    return html_content
 
 
-def generate_categories(categories: List[Dict[str, Any]], theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+def generate_categories(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                        fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                        workers: Optional[int] = None, media: str = "screen") -> str:
     """
     Generate HTML for all categories.
     
     Args:
-        categories: List of category dictionaries
+        categories: Categories (or category dictionaries)
         theme: Theme configuration
         icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category cards
+        search: Mark cards and keybind rows for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for themed cards, "print" for lean print cards
         
     Returns:
         HTML string for all categories
     """
-    if not categories:
-        return '<div class="col-span-full text-center text-gray-500">No categories found</div>'
+    return "".join(iter_categories(categories, theme, icons, fragment_cache=fragment_cache, search=search,
+                                   workers=workers, media=media))
+
+
+def iter_categories(categories: Sequence[Union[Dict[str, Any], Category]], theme: Dict[str, Any], icons: Dict[str, str],
+                    fragment_cache: Optional[FragmentCache] = None, search: bool = False,
+                    workers: Optional[int] = None, media: str = "screen") -> Iterator[str]:
+    """
+    Generate HTML for all categories, one category card at a time.
     
-    category_html = []
-    color_keys = list(theme["color_variants"].keys())
+    Args:
+        categories: Categories (or category dictionaries)
+        theme: Theme configuration
+        icons: Icon dictionary
+        fragment_cache: Optional cache for rendered category cards
+        search: Mark cards and keybind rows for the search index
+        workers: Worker processes for large sheets (see render_fragments)
+        media: "screen" for themed cards, "print" for lean print cards
+            (never marked for search)
+        
+    Yields:
+        HTML string for each category card (newline-separated)
+    """
+    printing = media == "print"
+    if not categories:
+        yield ('<p class="empty">No categories found</p>' if printing
+               else '<div class="col-span-full text-center text-gray-500">No categories found</div>')
+        return
     
+    search = search and not printing
+    tasks = []
+    row_offset = 0
     for i, category in enumerate(categories):
-        # Assign color variants cyclically
-        color_variant = color_keys[i % len(color_keys)]
-        category_html.append(generate_category_card(category, theme, icons, color_variant))
+        category = as_category(category, icons, i)
+        # Search row ids number keybinds across the whole document
+        card_offset = row_offset if search else None
+        row_offset += len(category.keybinds)
+        variant: Tuple[Any, ...]
+        if printing:
+            variant = ("print", category.icon, icons[category.icon] if category.icon else None)
+        else:
+            variant = (category.color_variant(theme), category.icon, icons[category.icon] if category.icon else None)
+        if search:
+            variant += ("search", category.index, card_offset)
+        tasks.append(FragmentTask(category, variant, card_offset))
     
-    return '\n'.join(category_html)
+    cards = render_fragments("skill_tree", _render_print_card if printing else _render_card, tasks, theme, icons,
+                             fragment_cache=fragment_cache, workers=workers)
+    for i, card_html in enumerate(cards):
+        yield f"\n{card_html}" if i else card_html
+
+
+def _render_card(category: Category, theme: Dict[str, Any], icons: Dict[str, str],
+                 row_offset: Optional[int]) -> str:
+    # Module-level so render_fragments can send it to worker processes
+    return generate_category_card(category, theme, icons, category.color_variant(theme), row_offset=row_offset)
 
 
-def generate_category_card(category: Dict[str, Any], theme: Dict[str, Any], icons: Dict[str, str], color_variant: str) -> str:
+def _render_print_card(category: Category, theme: Dict[str, Any], icons: Dict[str, str],
+                       row_offset: Optional[int]) -> str:
+    return generate_print_card(category, icons)
+
+
+def generate_category_card(category: Union[Dict[str, Any], Category], theme: Dict[str, Any], icons: Dict[str, str], color_variant: str,
+                           row_offset: Optional[int] = None) -> str:
     """
     Generate HTML for a single category card.
     
     Args:
-        category: Category dictionary with name and keybinds
+        category: Category (or category dictionary) with name and keybinds
         theme: Theme configuration
         icons: Icon dictionary
         color_variant: Color variant key from theme
+        row_offset: Search row id of the first keybind. If None, the card is
+            not marked for search.
         
     Returns:
         HTML string for the category card
     """
-    category_name = category.get("name", "Unknown Category")
-    keybinds = category.get("keybinds", [])
+    category = as_category(category, icons)
     
-    # Get icon (use default if not specified or not found)
-    icon_name = category.get("icon_name", "grid")
-    icon_svg = icons.get(icon_name, icons.get("grid", ""))
+    # Reference the sprite icon (already resolved to the default if missing)
+    icon_svg = icon_reference(category.icon, icons)
     
     # Get color variant styles
     color_styles = theme["color_variants"][color_variant]
@@ -107,29 +316,58 @@ def generate_category_card(category: Dict[str, Any], theme: Dict[str, Any], icon
     if card_min_width:
         card_class += f" {card_min_width}"
     
+    group_attribute = f' data-c="{category.index}"' if row_offset is not None else ''
+    
     card_html = f'''
-    <div class="{card_class}">
+    <div class="{card_class}"{group_attribute}>
         <div class="{theme["card_styles"]["card_header"]} {color_styles["header"]}">
             <div class="flex items-center gap-3">
                 {icon_svg}
-                <h2 class="text-lg font-semibold">{category_name}</h2>
+                <h2 class="text-lg font-semibold">{category.name}</h2>
             </div>
         </div>
         <div class="{theme["card_styles"]["card_body"]}">
-            {generate_keybinds(keybinds, theme)}
+            {generate_keybinds(category.keybinds, theme, row_offset)}
         </div>
     </div>'''
     
     return card_html
 
 
-def generate_keybinds(keybinds: List[Dict[str, Any]], theme: Dict[str, Any]) -> str:
+def generate_print_card(category: Union[Dict[str, Any], Category], icons: Dict[str, str]) -> str:
+    """
+    Generate lean print markup for a single category card.
+    
+    Args:
+        category: Category (or category dictionary) with name and keybinds
+        icons: Icon dictionary
+        
+    Returns:
+        HTML string for the card, styled by PRINT_CARD_STYLES
+    """
+    category = as_category(category, icons)
+    if category.keybinds:
+        items = "".join(
+            f'<li><div>{keybind.action}{f"<small>{keybind.description}</small>" if keybind.description else ""}'
+            f'</div>{render_print_keys(keybind.chords)}</li>'
+            for keybind in category.keybinds
+        )
+        body = f'<ul>{items}</ul>'
+    else:
+        body = '<p class="empty">No keybinds available</p>'
+    return f'<section class="card"><h2>{icon_reference(category.icon, icons)}{category.name}</h2>{body}</section>'
+
+
+def generate_keybinds(keybinds: Sequence[Union[Dict[str, Any], Keybind]], theme: Dict[str, Any],
+                      row_offset: Optional[int] = None) -> str:
     """
     Generate HTML for keybinds within a category.
     
     Args:
-        keybinds: List of keybind dictionaries
+        keybinds: Keybinds (or keybind dictionaries)
         theme: Theme configuration
+        row_offset: Search row id of the first keybind. If None, rows are not
+            marked for search.
         
     Returns:
         HTML string for the keybinds
@@ -139,24 +377,17 @@ def generate_keybinds(keybinds: List[Dict[str, Any]], theme: Dict[str, Any]) ->
     
     keybind_html = []
     
-    for keybind in keybinds:
-        action = keybind.get("action", "Unknown Action")
-        keys = keybind.get("keys", [])
-        description = keybind.get("description", "")
-        
-        # Handle keys as string or list
-        if isinstance(keys, str):
-            keys = [keys]
-        
+    for j, keybind in enumerate(as_keybinds(keybinds)):
         # Generate key display
-        key_display = generate_key_display(keys, theme)
+        key_display = generate_key_display(keybind.chords, theme)
+        row_attribute = f' data-k="{row_offset + j}"' if row_offset is not None else ''
         
         # Build keybind HTML
         keybind_item = f'''
-        <div class="flex items-center justify-between py-2 border-b border-gray-100 last:border-b-0">
+        <div class="flex items-center justify-between py-2 border-b border-gray-100 last:border-b-0"{row_attribute}>
             <div class="flex-1 min-w-0">
-                <div class="font-medium text-gray-800">{action}</div>
-                {f'<div class="text-sm text-gray-600 mt-1">{description}</div>' if description else ''}
+                <div class="font-medium text-gray-800">{keybind.action}</div>
+                {f'<div class="text-sm text-gray-600 mt-1">{keybind.description}</div>' if keybind.description else ''}
             </div>
             <div class="flex-shrink-0 ml-4">
                 {key_display}
@@ -168,38 +399,20 @@ def generate_keybinds(keybinds: List[Dict[str, Any]], theme: Dict[str, Any]) ->
     return f'<div class="space-y-1">{"".join(keybind_html)}</div>'
 
 
-def generate_key_display(keys: List[str], theme: Dict[str, Any]) -> str:
+def generate_key_display(keys: Union[List[str], Sequence[Chord]], theme: Dict[str, Any]) -> str:
     """
     Generate HTML for displaying keyboard keys.
     
     Args:
-        keys: List of key strings
+        keys: Parsed chords (or a list of key strings)
         theme: Theme configuration
         
     Returns:
         HTML string for key display
     """
-    if not keys:
-        return '<span class="text-gray-400">-</span>'
-    
-    key_combinations = []
-    key_class = theme["keybind_styles"]["key"]
-    
-    for key in keys:
-        # Split compound keys like "Ctrl+S" into individual key boxes
-        individual_keys = key.split('+')
-        key_boxes = []
-        
-        for i, individual_key in enumerate(individual_keys):
-            # Clean up the key (remove extra spaces)
-            clean_key = individual_key.strip()
-            key_boxes.append(f'<kbd class="{key_class} keybind-key">{clean_key}</kbd>')
-            
-            # Add "+" separator between keys (but not after the last one)
-            if i < len(individual_keys) - 1:
-                key_boxes.append('<span class="text-gray-500 mx-1">+</span>')
-        
-        key_combinations.append(''.join(key_boxes))
-    
-    # Join multiple key combinations with spacing
-    return f'<div class="{theme["keybind_styles"]["key_group"]}">{"<span class=\"mx-2\"></span>".join(key_combinations)}</div>'
\ No newline at end of file
+    return render_key_display(
+        as_chords(keys),
+        f'{theme["keybind_styles"]["key"]} keybind-key',
+        theme["keybind_styles"]["key_group"],
+        '<span class="mx-2"></span>',
+    )
@@ -1,6 +1,9 @@
+import re
+
 import pytest
 from keystone.templates.reference_card import (
     generate_html,
+    iter_html,
     generate_reference_table,
     generate_table_rows,
     generate_key_display,
@@ -340,3 +343,33 @@ class TestReferenceCardTemplate:
         # Should contain theme styles
         assert sample_theme["base_styles"]["body"] in result
         assert sample_theme["keybind_styles"]["key"] in result
+
+    def test_iter_html_streams_rows_per_category(self, sample_data, sample_theme, sample_icons):
+        """Test that iter_html streams the table rows one category at a time."""
+        chunks = list(iter_html(sample_data, sample_theme, sample_icons))
+        # Document head, table head, one chunk per category, table foot, document tail
+        assert len(chunks) == len(sample_data["categories"]) + 4
+        assert "".join(chunks) == generate_html(sample_data, sample_theme, sample_icons)
+
+    def test_search_groups_rows_per_category(self, sample_data, sample_theme, sample_icons):
+        """Test that search mode marks rows and wraps each category in its own tbody."""
+        result = generate_html(sample_data, sample_theme, sample_icons, search=True)
+
+        assert "data-keystone-search" in result
+        assert 'id="keystone-search-index"' in result
+        assert result.count("<tbody") == 2
+        assert '<tbody data-c="1">' in result
+        assert 'rowspan="2" data-h>' in result
+        assert [int(row_id) for row_id in re.findall(r'data-k="(\d+)"', result)] == [0, 1, 2]
+        assert 'data-k="' not in generate_html(sample_data, sample_theme, sample_icons)
+
+    def test_print_media_emits_lean_table(self, sample_data, sample_theme, sample_icons):
+        """Test that the print rendering is a plain table without utility classes or search."""
+        result = generate_html(sample_data, sample_theme, sample_icons, search=True, media="print")
+
+        assert "<table><thead><tr><th>Category</th>" in result
+        assert '<th rowspan="2">' in result
+        assert "keystone-utilities" not in result and "hover:" not in result
+        assert "data-k=" not in result and "<script" not in result
+        chunks = list(iter_html(sample_data, sample_theme, sample_icons, media="print"))
+        assert "".join(chunks) == generate_html(sample_data, sample_theme, sample_icons, media="print")
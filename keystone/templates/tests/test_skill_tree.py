@@ -1,11 +1,17 @@
+import re
+
 import pytest
+
+from keystone.core.document import build_document
 from keystone.templates.skill_tree import (
     generate_html,
+    iter_html,
     generate_categories,
     generate_category_card,
     generate_keybinds,
     generate_key_display
 )
+from keystone.utils.card_packing import pack_pages
 
 
 class TestSkillTreeTemplate:
@@ -177,7 +183,7 @@ class TestSkillTreeTemplate:
         result = generate_category_card(category, sample_theme, sample_icons, "blue")
         
         assert "Test Category" in result
-        assert sample_icons["terminal"] in result
+        assert '<use href="#icon-terminal"></use>' in result
     
     def test_generate_category_card_missing_icon(self, sample_theme, sample_icons):
         """Test generate_category_card falls back to default icon."""
@@ -190,7 +196,24 @@ class TestSkillTreeTemplate:
         result = generate_category_card(category, sample_theme, sample_icons, "blue")
         
         assert "Test Category" in result
-        assert sample_icons["grid"] in result  # Default fallback
+        assert '<use href="#icon-grid"></use>' in result  # Default fallback
+    
+    def test_generate_html_emits_icon_sprite_once(self, sample_theme, sample_icons):
+        """Test that each used icon is emitted once as a sprite symbol."""
+        data = {
+            "tool": "Icons",
+            "categories": [
+                {"name": f"Category {i}", "icon_name": "terminal", "keybinds": []} for i in range(5)
+            ] + [{"name": "Fallback", "icon_name": "nonexistent", "keybinds": []}]
+        }
+        
+        html = generate_html(data, sample_theme, sample_icons)
+        
+        assert html.count('<symbol id="icon-terminal"') == 1
+        assert html.count('<symbol id="icon-grid"') == 1
+        assert '<symbol id="icon-wrench"' not in html  # Unused icons are not emitted
+        assert html.count('<use href="#icon-terminal"></use>') == 5
+        assert html.count(">terminal</symbol>") == 1
     
     def test_generate_keybinds_empty_list(self, sample_theme):
         """Test generate_keybinds with empty list."""
@@ -287,7 +310,7 @@ class TestSkillTreeTemplate:
         assert "O" in result
     
     def test_html_escaping_in_content(self, sample_theme, sample_icons):
-        """Test that HTML content is properly handled."""
+        """Test that HTML special characters in the data are escaped."""
         data = {
             "tool": "Test<Tool>",
             "categories": [
@@ -306,7 +329,61 @@ class TestSkillTreeTemplate:
         
         html = generate_html(data, sample_theme, sample_icons)
         
-        # Basic test that HTML is generated (escaping would be handled by template engine in real usage)
-        assert "Test<Tool>" in html
-        assert "Test & Category" in html
-        assert "Action with <tags>" in html
\ No newline at end of file
+        # Text from the data is escaped, markup from the template is not
+        assert "Test&lt;Tool&gt;" in html
+        assert "Test &amp; Category" in html
+        assert "Action with &lt;tags&gt;" in html
+        assert "Description with &amp; symbols" in html
+        assert "<tags>" not in html
+
+    def test_iter_html_streams_one_chunk_per_category(self, sample_data, sample_theme, sample_icons):
+        """Test that iter_html yields head, one chunk per card and tail, matching generate_html."""
+        chunks = list(iter_html(sample_data, sample_theme, sample_icons))
+        assert len(chunks) == len(sample_data["categories"]) + 2
+        assert chunks[0].startswith("<!DOCTYPE html>")
+        assert chunks[-1].endswith("</html>")
+        assert "".join(chunks) == generate_html(sample_data, sample_theme, sample_icons)
+
+    def test_search_marks_cards_and_rows(self, sample_data, sample_theme, sample_icons):
+        """Test that search mode embeds the index and numbers keybind rows across cards."""
+        result = generate_html(sample_data, sample_theme, sample_icons, search=True)
+        keybind_count = sum(len(category["keybinds"]) for category in sample_data["categories"])
+
+        assert "data-keystone-search" in result
+        assert 'id="keystone-search-index"' in result
+        assert len(re.findall(r'data-c="\d+"', result)) == len(sample_data["categories"])
+        assert [int(row_id) for row_id in re.findall(r'data-k="(\d+)"', result)] == list(range(keybind_count))
+        assert 'data-k="' not in generate_html(sample_data, sample_theme, sample_icons)
+
+    def test_print_media_emits_lean_markup(self, sample_data, sample_theme, sample_icons):
+        """Test that the print rendering has semantic cards and no utility classes or search."""
+        sample_theme = dict(sample_theme, print_styles=".card { border: 1px solid #000 !important; }")
+        result = generate_html(sample_data, sample_theme, sample_icons, search=True, media="print")
+
+        assert result.count('<section class="card">') == len(sample_data["categories"])
+        assert "<h2>" in result and "<small>Open a file from the filesystem</small>" in result
+        assert "!important" not in result
+        assert "keystone-utilities" not in result and "hover:" not in result
+        assert "data-k=" not in result and "<script" not in result
+        chunks = list(iter_html(sample_data, sample_theme, sample_icons, media="print"))
+        assert "".join(chunks) == generate_html(sample_data, sample_theme, sample_icons, media="print")
+
+    def test_print_media_packs_cards(self, sample_theme, sample_icons):
+        """Test that packing reorders print cards by column but keeps every card."""
+        data = {"title": "Packed", "categories": [
+            {"name": f"Group {index}", "keybinds": [{"action": "Save", "keys": "Ctrl+S"}] * size}
+            for index, size in enumerate([40, 2, 40, 2, 40])
+        ]}
+        packed = generate_html(data, sample_theme, sample_icons, media="print", pack=True)
+        names = re.findall(r"</svg>(Group \d)</h2>", packed)
+
+        assert sorted(names) == [f"Group {index}" for index in range(5)]
+        assert names != sorted(names)
+        # Packed columns are explicit containers, not a balanced multi-column flow
+        assert '<main class="pages">' in packed and '<main class="cards">' not in packed
+        columns = packed.split('<div class="column">')[1:]
+        assert [re.findall(r"</svg>(Group \d)</h2>", column) for column in columns] == [
+            [card.name for card in column] for page in pack_pages(build_document(data, sample_icons).categories)
+            for column in page
+        ]
+        assert generate_html(data, sample_theme, sample_icons, pack=True) == generate_html(data, sample_theme, sample_icons)
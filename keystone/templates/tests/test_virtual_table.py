@@ -0,0 +1,91 @@
+import json
+import re
+
+import pytest
+
+from keystone.core.document import build_document
+from keystone.templates.virtual_table import encode_rows, generate_html, iter_html
+
+
+class TestVirtualTableTemplate:
+
+    @pytest.fixture
+    def sample_theme(self):
+        """Sample theme configuration for testing."""
+        return {
+            "base_styles": {
+                "body": "bg-gray-50 text-gray-800 font-inter",
+                "container": "mx-auto p-4 sm:p-6 lg:p-8"
+            },
+            "keybind_styles": {
+                "key": "bg-gray-200 border border-gray-300 rounded-md px-2 py-1 font-mono text-sm font-semibold",
+                "key_group": "inline-flex items-center gap-1"
+            },
+            "color_variants": {
+                "blue": {"header": "bg-blue-50 text-blue-700", "accent": "text-blue-600"}
+            }
+        }
+
+    @pytest.fixture
+    def sample_icons(self):
+        """Sample icons dictionary for testing."""
+        return {"grid": "<svg class=\"h-6 w-6\">grid</svg>"}
+
+    @pytest.fixture
+    def sample_data(self):
+        """Sample keybind data for testing."""
+        return {
+            "title": "Huge <Sheet>",
+            "categories": [
+                {"name": "Files", "keybinds": [
+                    {"action": "Save", "keys": ["Ctrl+S"], "description": "Save the file"},
+                    {"action": "Save All", "keys": ["Ctrl+Shift+S", "Ctrl+K S"]},
+                ]},
+                {"name": "Empty", "keybinds": []},
+            ]
+        }
+
+    def test_encode_rows_uses_string_table(self, sample_data, sample_icons):
+        """Test that rows are stored as columns of indices into one string table."""
+        encoded = encode_rows(build_document(sample_data, sample_icons), sample_icons)
+        strings = encoded["s"]
+
+        assert len(strings) == len(set(strings))
+        assert encoded["r"]["c"] == [0, 0, 1]
+        assert [strings[index] for index in encoded["r"]["a"][:2]] == ["Save", "Save All"]
+        assert encoded["r"]["a"][2] == -1
+        assert [[strings[key] for key in chord] for chord in encoded["r"]["k"][1]] == [["Ctrl", "Shift", "S"], ["Ctrl", "K S"]]
+        # "Ctrl" is stored once for all rows
+        assert strings.count("Ctrl") == 1
+
+    def test_screen_version_embeds_data_not_rows(self, sample_data, sample_theme, sample_icons):
+        """Test that the screen version carries JSON data and row prototypes instead of rows."""
+        result = generate_html(sample_data, sample_theme, sample_icons)
+
+        assert "Huge &lt;Sheet&gt;" in result
+        assert "<table" not in result
+        assert '<template id="keystone-row">' in result
+        payload = re.search(r'<script type="application/json" id="keystone-data">(.*?)</script>', result).group(1)
+        assert json.loads(payload)["r"]["c"] == [0, 0, 1]
+        assert "beforeprint" in result
+
+    def test_print_version_is_static(self, sample_data, sample_theme, sample_icons):
+        """Test that the print version renders every row without scripts."""
+        result = generate_html(sample_data, sample_theme, sample_icons, media="print")
+
+        assert "<script" not in result
+        assert "<table" in result
+        assert "Save All" in result and "No keybinds available" in result
+
+    def test_iter_html_matches_generate_html(self, sample_data, sample_theme, sample_icons):
+        """Test that joining the streamed chunks gives the complete document."""
+        for media in ("screen", "print"):
+            chunks = list(iter_html(sample_data, sample_theme, sample_icons, media=media))
+            assert "".join(chunks) == generate_html(sample_data, sample_theme, sample_icons, media=media)
+
+    def test_payload_cannot_close_script(self, sample_theme, sample_icons):
+        """Test that "</" inside the data is escaped in the embedded JSON."""
+        data = {"title": "T", "categories": [{"name": "C", "keybinds": [{"action": "a</script>b", "keys": "X"}]}]}
+        result = generate_html(data, sample_theme, sample_icons)
+        payload = re.search(r'id="keystone-data">(.*?)</script>', result).group(1)
+        assert "a&lt;/script&gt;b" in json.loads(payload)["s"]
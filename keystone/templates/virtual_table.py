@@ -0,0 +1,316 @@
+"""
+Virtual Table template: huge sheets as embedded JSON data with a virtualized row renderer.
+
+The page carries the keybinds once, as a columnar JSON payload with a string
+table, and a small script renders only the rows inside the scroll viewport.
+HTML size and load time therefore grow with the data, not with the markup of
+tens of thousands of rows. Printing from the browser expands every row, and
+the PDF gets a static reference table (``media="print"``).
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Union
+
+from ..core.document import Document, as_document
+from ..utils.css_compiler import build_stylesheet, icon_classes
+from ..utils.fonts import build_font_css, collect_document_text
+from ..utils.fragment_cache import FragmentCache
+from ..utils.icon_sprite import build_sprite, icon_reference
+from ..utils.key_chips import EMPTY_KEYS, KEY_SEPARATOR
+from .reference_card import (
+    UTILITY_CLASSES as REFERENCE_CARD_CLASSES,
+    get_table_border_classes,
+    get_table_header_classes,
+    get_table_row_classes,
+    iter_reference_table,
+)
+
+
+# generate_html and iter_html also accept a prebuilt core.document.Document
+ACCEPTS_DOCUMENT = True
+
+# Utility classes written by this template itself (the static version uses the reference card's)
+UTILITY_CLASSES = REFERENCE_CARD_CLASSES + " border-b text-gray-500 text-xs"
+
+# Fixed row height in pixels; the script positions rows by index
+ROW_HEIGHT = 40
+
+# Rows rendered above and below the viewport
+OVERSCAN = 10
+
+VIRTUAL_STYLES = f"""
+        .keystone-viewport {{ height: 75vh; overflow-y: auto; }}
+        .keystone-vrow {{
+            display: grid;
+            grid-template-columns: 25% 33.3333% 25% 1fr;
+            height: {ROW_HEIGHT}px;
+            overflow: hidden;
+        }}
+        .keystone-vrow > div {{ overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }}
+        #keystone-print {{ display: none; }}
+        @media print {{
+            .keystone-viewport {{ display: none; }}
+            #keystone-print {{ display: block; }}
+            #keystone-print .keystone-vrow {{ height: auto; page-break-inside: avoid; }}
+            #keystone-print .keystone-vrow > div {{ white-space: normal; }}
+        }}"""
+
+# Row and key markup come from <template> prototypes, so output passes such as
+# class deduplication rewrite them like any other markup. "$x" marks a slot.
+VIRTUAL_SCRIPT = """(function () {
+  var data = JSON.parse(document.getElementById("keystone-data").textContent);
+  var strings = data.s, rows = data.r, count = rows.c.length, height = %(row_height)d, overscan = %(overscan)d;
+  function parts(id) {
+    return document.getElementById(id).innerHTML.trim().split(/\\$[a-z]/);
+  }
+  var row = parts("keystone-row"), empty = parts("keystone-empty-row"), key = parts("keystone-key");
+  var group = parts("keystone-key-group"), separator = parts("keystone-key-separator")[0];
+  var combination = parts("keystone-combination-separator")[0], noKeys = parts("keystone-no-keys")[0];
+  function keys(chords) {
+    if (!chords.length) return noKeys;
+    return group[0] + chords.map(function (chord) {
+      return chord.map(function (label) { return key[0] + strings[label] + key[1]; }).join(separator);
+    }).join(combination) + group[1];
+  }
+  function render(start, end) {
+    var html = [];
+    for (var i = start; i < end; i++) {
+      var category = rows.c[i], label = i === 0 || rows.c[i - 1] !== category ? strings[data.c[category]] : "";
+      var action = rows.a[i];
+      html.push(action < 0
+        ? empty[0] + label + empty[1]
+        : row[0] + label + row[1] + strings[action] + row[2] + keys(rows.k[i]) + row[3] + strings[rows.d[i]] + row[4]);
+    }
+    return html.join("");
+  }
+  var viewport = document.getElementById("keystone-viewport");
+  var canvas = document.getElementById("keystone-canvas");
+  var windowed = document.getElementById("keystone-window");
+  canvas.style.height = count * height + "px";
+  var shown = -1, pending = false;
+  function update() {
+    pending = false;
+    var first = Math.max(0, Math.floor(viewport.scrollTop / height) - overscan);
+    if (first === shown) return;
+    shown = first;
+    var last = Math.min(count, first + Math.ceil(viewport.clientHeight / height) + 2 * overscan);
+    windowed.style.transform = "translateY(" + first * height + "px)";
+    windowed.innerHTML = render(first, last);
+  }
+  viewport.addEventListener("scroll", function () {
+    if (!pending) { pending = true; requestAnimationFrame(update); }
+  });
+  window.addEventListener("resize", function () { shown = -1; update(); });
+  // Printing from the browser expands every row into a static list
+  var printed = document.getElementById("keystone-rows");
+  window.addEventListener("beforeprint", function () { printed.innerHTML = render(0, count); });
+  window.addEventListener("afterprint", function () { printed.innerHTML = ""; });
+  update();
+})();""" % {"row_height": ROW_HEIGHT, "overscan": OVERSCAN}
+
+
+def print_stylesheet(theme: Dict[str, Any]) -> str:
+    """
+    Get the theme stylesheet of the static (print) version.
+
+    Renderers that parse stylesheets once (see utils.pdf_renderer) pass it
+    separately and render with ``inline_print_styles=False``.
+
+    Args:
+        theme: Theme configuration
+
+    Returns:
+        The theme's ``print_styles``
+    """
+    return theme.get("print_styles", "")
+
+
+def generate_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+                  asset_dir: Optional[Union[str, Path]] = None,
+                  fragment_cache: Optional[FragmentCache] = None, media: str = "screen",
+                  workers: Optional[int] = None, inline_print_styles: bool = True) -> str:
+    """
+    Generate the complete HTML document for the 'Virtual Table' template.
+
+    Args:
+        data: Merged keybind data containing tool info and categories
+        theme: Theme configuration with styling classes
+        icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for the rows of the static (print) version
+        media: "screen" for the virtualized page, "print" for a static table
+            that renders without JavaScript (used for PDF output)
+        workers: Worker processes for the rows of the static version
+        inline_print_styles: Embed the theme's print styles in the static
+            version. If False, the renderer supplies print_stylesheet().
+
+    Returns:
+        Complete HTML document as a string
+    """
+    return "".join(iter_html(data, theme, icons, asset_dir=asset_dir, fragment_cache=fragment_cache, media=media, workers=workers,
+                             inline_print_styles=inline_print_styles))
+
+
+def iter_html(data: Union[Dict[str, Any], Document], theme: Dict[str, Any], icons: Dict[str, str],
+              asset_dir: Optional[Union[str, Path]] = None,
+              fragment_cache: Optional[FragmentCache] = None, media: str = "screen",
+              workers: Optional[int] = None, inline_print_styles: bool = True) -> Iterator[str]:
+    """
+    Render the 'Virtual Table' document as a stream of chunks.
+
+    Args:
+        data: Merged keybind data containing tool info and categories
+        theme: Theme configuration with styling classes
+        icons: Dictionary mapping icon names to SVG strings
+        asset_dir: Directory for sidecar font files. If None, fonts are embedded
+            as data URIs.
+        fragment_cache: Cache for the rows of the static (print) version
+        media: "screen" for the virtualized page, "print" for a static table
+        workers: Worker processes for the rows of the static version
+        inline_print_styles: Embed the theme's print styles in the static
+            version (see generate_html)
+
+    Yields:
+        Consecutive pieces of the HTML document
+    """
+    document = as_document(data, icons)
+
+    # Get print styles from theme if available
+    print_styles = theme.get("print_styles", "") if media != "print" or inline_print_styles else ""
+    utility_styles = build_stylesheet(theme, UTILITY_CLASSES, icon_classes(icons, document.used_icons))
+    font_faces = build_font_css(collect_document_text(document.source), asset_dir=asset_dir)
+    icon_sprite = build_sprite(icons, document.used_icons)
+
+    yield f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{document.title} - Keybind Reference</title>
+    <style id="keystone-utilities">{utility_styles}</style>
+    <style>
+        {font_faces}
+        body {{ font-family: 'Inter', sans-serif; }}
+        .keybind-key {{
+            display: inline-block;
+            min-width: 1.5rem;
+            text-align: center;
+        }}
+        table {{
+            border-collapse: collapse;
+        }}{VIRTUAL_STYLES if media != "print" else ""}
+        {print_styles}
+    </style>
+</head>
+<body class="{theme["base_styles"]["body"]}">
+    {icon_sprite}
+    <div class="{theme["base_styles"]["container"]}">
+        <header class="mb-6">
+            <h1 class="text-2xl font-bold text-gray-800 mb-2">{document.title}</h1>
+            {f'<p class="text-gray-600 text-sm">Version: {document.version}</p>' if document.version else ''}
+        </header>
+
+        '''
+
+    if media == "print":
+        # No script runs in the PDF renderer: emit the full static table
+        yield from iter_reference_table(document.categories, theme, icons, fragment_cache=fragment_cache,
+                                        workers=workers)
+    else:
+        yield generate_virtual_table(document, theme, icons)
+
+    yield '''
+    </div>
+</body>
+</html>'''
+
+
+def encode_rows(document: Document, icons: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Encode the document's rows as columnar JSON data with a string table.
+
+    Every distinct string (key labels, actions, descriptions, category cells)
+    is stored once in ``s``; the row columns hold indices into it.
+
+    Args:
+        document: Parsed document
+        icons: Icon dictionary
+
+    Returns:
+        Dictionary with ``s`` (string table), ``c`` (string index of each
+        category's label markup) and ``r`` (row columns: ``c`` category index,
+        ``a`` action or -1 for an empty category, ``k`` chords as lists of
+        key label indices, ``d`` description)
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    category_labels = []
+    columns: Dict[str, List[Any]] = {"c": [], "a": [], "k": [], "d": []}
+    for index, category in enumerate(document.categories):
+        label = f'<div class="flex items-center gap-2">{icon_reference(category.icon, icons)}<span>{category.name}</span></div>'
+        category_labels.append(intern(label))
+        if not category.keybinds:
+            columns["c"].append(index)
+            columns["a"].append(-1)
+            columns["k"].append([])
+            columns["d"].append(intern(""))
+        for keybind in category.keybinds:
+            columns["c"].append(index)
+            columns["a"].append(intern(keybind.action))
+            columns["k"].append([[intern(key) for key in chord] for chord in keybind.chords])
+            columns["d"].append(intern(keybind.description))
+
+    return {"s": list(strings), "c": category_labels, "r": columns}
+
+
+def generate_virtual_table(document: Document, theme: Dict[str, Any], icons: Dict[str, str]) -> str:
+    """
+    Generate the virtualized table: header, scroll viewport, row prototypes, data and script.
+
+    Args:
+        document: Parsed document
+        theme: Theme configuration
+        icons: Icon dictionary
+
+    Returns:
+        HTML string for the virtual table
+    """
+    if not document.categories:
+        return '<div class="text-center text-gray-500">No categories found</div>'
+
+    border_class = get_table_border_classes(theme)
+    row_class = get_table_row_classes(theme)
+    cell_class = f"border-b {border_class} px-3 py-2"
+    header = f'''<div class="keystone-vrow {get_table_header_classes(theme)} border {border_class}">
+            <div class="{cell_class}">Category</div>
+            <div class="{cell_class}">Action</div>
+            <div class="{cell_class}">Keybind</div>
+            <div class="{cell_class}">Description</div>
+        </div>'''
+
+    payload = json.dumps(encode_rows(document, icons), ensure_ascii=False, separators=(",", ":"))
+    # Keep "</script>" inside the data from closing the element early
+    payload = payload.replace("</", "<\\/")
+
+    return f'''
+    {header}
+    <div id="keystone-viewport" class="keystone-viewport border {border_class}">
+        <div id="keystone-canvas"><div id="keystone-window"></div></div>
+    </div>
+    <div id="keystone-print">
+        {header}
+        <div id="keystone-rows"></div>
+    </div>
+    <template id="keystone-row"><div class="keystone-vrow {row_class}"><div class="{cell_class} font-medium">$c</div><div class="{cell_class}">$a</div><div class="{cell_class}">$k</div><div class="{cell_class} text-sm text-gray-600">$d</div></div></template>
+    <template id="keystone-empty-row"><div class="keystone-vrow {row_class}"><div class="{cell_class} font-medium">$c</div><div class="{cell_class} text-gray-500 italic">No keybinds available</div><div class="{cell_class}"></div><div class="{cell_class}"></div></div></template>
+    <template id="keystone-key"><kbd class="{theme["keybind_styles"]["key"]} keybind-key text-xs">$k</kbd></template>
+    <template id="keystone-key-group"><div class="inline-flex items-center gap-1 flex-wrap">$k</div></template>
+    <template id="keystone-key-separator">{KEY_SEPARATOR}</template>
+    <template id="keystone-combination-separator"><span class="mx-1"></span></template>
+    <template id="keystone-no-keys">{EMPTY_KEYS}</template>
+    <script type="application/json" id="keystone-data">{payload}</script>
+    <script>{VIRTUAL_SCRIPT}</script>'''
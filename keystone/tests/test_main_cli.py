@@ -484,6 +484,34 @@ class TestMainCLI:
         assert "invalid choice" in stderr
         assert "choose from 'skill_tree', 'reference_card'" in stderr
     
+    def test_theme_and_template_fan_out(self, sample_layout, temp_dir):
+        """Test rendering several themes and templates from one parse."""
+        returncode, stdout, stderr = self.run_cli([
+            str(sample_layout),
+            "--theme", "default,dark",
+            "--template", "all",
+            "--output", "matrix.html"
+        ], cwd=temp_dir)
+        
+        assert returncode == 0, stderr
+        assert stdout.count("Loading layout from:") == 1
+        for theme in ["default", "dark"]:
+            for template in ["skill_tree", "reference_card"]:
+                output_file = temp_dir / f"matrix_{theme}_{template}.html"
+                assert output_file.exists()
+                assert "Test Cheatsheet" in output_file.read_text()
+        assert not (temp_dir / "matrix.html").exists()
+    
+    def test_invalid_template_in_list_error(self, sample_layout, temp_dir):
+        """Test that every name in a template list is validated."""
+        returncode, stdout, stderr = self.run_cli([
+            str(sample_layout),
+            "--template", "skill_tree,invalid_template"
+        ], cwd=temp_dir)
+        
+        assert returncode == 2
+        assert "invalid choice: 'invalid_template'" in stderr
+    
     def test_complex_flag_combination(self, sample_layout, temp_dir):
         """Test complex combination of all flags together."""
         custom_output = temp_dir / "complex" / "nested" / "output.html"
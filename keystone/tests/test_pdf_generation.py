@@ -186,6 +186,7 @@ class TestPDFGeneration:
     def test_unit_pdf_generator_error_handling(self, temp_dir):
         """Test PDF generator error handling for WeasyPrint errors."""
         from keystone.utils.pdf_generator import generate_pdf
+        from keystone.utils.pdf_supervisor import PdfGenerationError
         
         # Invalid HTML that might cause WeasyPrint issues
         invalid_html = "This is not valid HTML"
@@ -200,8 +201,8 @@ class TestPDFGeneration:
             # If it succeeds, that's fine too
             if result:
                 assert pdf_path.exists()
-        except SystemExit:
-            # If it exits due to an error, that's also acceptable behavior
+        except PdfGenerationError:
+            # If it raises a PDF error, that's also acceptable behavior
             pass
     
     def test_weasyprint_import_error_message(self, temp_dir):
@@ -0,0 +1,27 @@
+import os
+from pathlib import Path
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """
+    Get (and create) a directory inside Keystone's on-disk cache.
+
+    The cache root is taken from ``KEYSTONE_CACHE_DIR`` if set, otherwise
+    ``$XDG_CACHE_HOME/keystone`` (defaulting to ``~/.cache/keystone``).
+
+    Args:
+        *parts: Sub-directory names below the cache root, e.g. ``"fonts"``
+
+    Returns:
+        Path to the existing cache directory
+    """
+    root = os.environ.get("KEYSTONE_CACHE_DIR")
+    if root:
+        cache_dir = Path(root)
+    else:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        cache_dir = Path(xdg_cache) / "keystone"
+
+    cache_dir = cache_dir.joinpath(*parts)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
@@ -0,0 +1,166 @@
+"""
+Height-aware packing of category cards onto A4 pages.
+
+In the print rendering (see print_sheet) skill-tree cards flow through two
+columns per page and are never split, so a card that no longer fits leaves
+the rest of its column blank. pack_cards estimates each card's height from
+its keybind count and text lengths and assigns the cards to columns with
+first-fit decreasing bin packing: tallest cards first, each into the first
+column with room left. pack_pages groups the columns into pages; the print
+rendering emits each page as two explicit column containers (CSS column
+balancing would move the cards around again). The columns are then filled
+almost completely, so the PDF needs fewer pages. Within a column, cards keep
+their layout order. A card taller than a whole column cannot be packed: it
+gets a page of its own after the packed columns, stays in that page's first
+column and runs on over the following pages.
+
+All sizes are in points and follow the print stylesheets (A4, 1cm margins,
+9pt text). They are estimates: a misjudged card only shifts the flow.
+"""
+import math
+from html import unescape
+from typing import List, Sequence
+
+from ..core.document import Category, Keybind
+
+MM = 72 / 25.4
+
+# Height of one column: A4 minus the page margins
+COLUMN_HEIGHT = 297 * MM - 2 * 10 * MM
+
+# Width of one of the two columns (0.5cm apart)
+COLUMN_WIDTH = (210 * MM - 2 * 10 * MM - 5 * MM) / 2
+
+COLUMNS_PER_PAGE = 2
+
+# Document title and version above the first page's columns
+HEADER_HEIGHT = 50.0
+
+# Card border, title bar and bottom margin
+CARD_FRAME = 2 + 11 * 1.35 + 3 * MM + 1 + 4 * MM
+
+# Body of a card without keybinds
+EMPTY_CARD_BODY = 9 * 1.35 + 3 * MM
+
+# Vertical padding and divider of one keybind row
+ROW_FRAME = 1.6 * MM + 0.5
+
+# Line heights and average glyph widths of action text (9pt) and descriptions (8pt)
+ACTION_LINE, ACTION_CHAR = 9 * 1.35, 4.7
+DESCRIPTION_LINE, DESCRIPTION_CHAR = 8 * 1.35, 4.2
+
+# Key chips: line height, monospace glyph width, padding and border, separators
+KEY_LINE = 13.0
+KEY_CHAR, KEY_FRAME, KEY_MIN_WIDTH, KEY_SEPARATOR = 4.8, 5.5, 10.8, 7.7
+
+# Horizontal padding of the card body, plus the gap before the key chips
+ROW_INSET = 5 * MM + 2 + 3 * MM
+
+
+def _lines(text: str, char_width: float, width: float) -> int:
+    return max(1, math.ceil(len(unescape(text)) * char_width / max(width, char_width)))
+
+
+def _keys_width(keybind: Keybind) -> float:
+    chips = [max(KEY_MIN_WIDTH, len(unescape(key)) * KEY_CHAR + KEY_FRAME) for chord in keybind.chords for key in chord]
+    return sum(chips) + KEY_SEPARATOR * max(0, len(chips) - 1)
+
+
+def estimate_card_height(category: Category) -> float:
+    """
+    Estimate the printed height of a category card.
+
+    Args:
+        category: Category with its keybinds
+
+    Returns:
+        Height in points, including the margin below the card
+    """
+    if not category.keybinds:
+        return CARD_FRAME + EMPTY_CARD_BODY
+
+    height = CARD_FRAME
+    for keybind in category.keybinds:
+        # Action and description wrap in the space the key chips leave
+        text_width = COLUMN_WIDTH - ROW_INSET - min(_keys_width(keybind), COLUMN_WIDTH / 2)
+        text_height = _lines(keybind.action, ACTION_CHAR, text_width) * ACTION_LINE
+        if keybind.description:
+            text_height += _lines(keybind.description, DESCRIPTION_CHAR, text_width) * DESCRIPTION_LINE
+        height += ROW_FRAME + max(text_height, KEY_LINE)
+    return height
+
+
+def column_capacity(column: int, header_height: float = HEADER_HEIGHT) -> float:
+    """
+    Get the height available to cards in a column.
+
+    Args:
+        column: Column number across all pages (two per page)
+        header_height: Height of the document header on the first page
+
+    Returns:
+        Height in points. The margin below a column's last card is
+        truncated at the column end, so it does not count.
+    """
+    header = header_height if column < COLUMNS_PER_PAGE else 0
+    return COLUMN_HEIGHT - header + 4 * MM
+
+
+def pack_cards(categories: Sequence[Category], header_height: float = HEADER_HEIGHT) -> List[List[Category]]:
+    """
+    Assign cards to page columns, minimizing the number of columns.
+
+    Args:
+        categories: Categories in layout order
+        header_height: Height of the document header on the first page
+
+    Returns:
+        Columns in page order (two per page), each a list of categories in
+        layout order. Emitting them in sequence reproduces the packing. A
+        card taller than a column is alone on a page of its own, after the
+        packed columns: it starts a page and no card follows it on that page.
+    """
+    heights = [estimate_card_height(category) for category in categories]
+    full_column = column_capacity(COLUMNS_PER_PAGE, header_height)
+    oversized = [index for index in range(len(categories)) if heights[index] > full_column]
+    columns: List[List[int]] = []
+    remaining: List[float] = []
+
+    # sorted() is stable: equally tall cards keep their layout order
+    for index in sorted(range(len(categories)), key=lambda i: -heights[i]):
+        if heights[index] > full_column:
+            continue
+        for column, room in enumerate(remaining):
+            if heights[index] <= room:
+                columns[column].append(index)
+                remaining[column] -= heights[index]
+                break
+        else:
+            # First-page columns are shortened by the header; they stay open for smaller cards
+            while column_capacity(len(columns), header_height) < heights[index]:
+                columns.append([])
+                remaining.append(column_capacity(len(columns) - 1, header_height))
+            columns.append([index])
+            remaining.append(column_capacity(len(columns) - 1, header_height) - heights[index])
+
+    for index in oversized:
+        columns.extend([] for _ in range(-len(columns) % COLUMNS_PER_PAGE))
+        columns.append([index])
+
+    return [[categories[index] for index in sorted(column)] for column in columns]
+
+
+def pack_pages(categories: Sequence[Category], header_height: float = HEADER_HEIGHT) -> List[List[List[Category]]]:
+    """
+    Assign cards to page columns and group the columns into pages.
+
+    Args:
+        categories: Categories in layout order
+        header_height: Height of the document header on the first page
+
+    Returns:
+        Pages, each a list of two columns (see pack_cards)
+    """
+    columns = pack_cards(categories, header_height)
+    pages = [columns[start:start + COLUMNS_PER_PAGE] for start in range(0, len(columns), COLUMNS_PER_PAGE)]
+    return [page + [[]] * (COLUMNS_PER_PAGE - len(page)) for page in pages]
@@ -0,0 +1,171 @@
+"""
+Output pass replacing repeated class strings with short generated classes.
+
+Every keybind row repeats the same long theme class strings, e.g. the key
+chip's ``bg-gray-200 border border-gray-300 rounded-md px-2 py-1 ...``.
+dedupe_classes maps each repeated class string to a short class such as
+``k0``, compiles the utilities of that string into one rule for the short
+class (one per media query and pseudo-class variant) and rebuilds the inline
+utility stylesheet from the classes that are still used, which shrinks large
+documents for both the browser and the PDF renderer.
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .css_compiler import PREFLIGHT, compile_class, compile_declarations
+
+# Prefix of the generated short classes
+SHORT_CLASS_PREFIX = "k"
+
+# Marker added to the utility stylesheet once a document has been processed
+DEDUPED_ATTRIBUTE = "data-keystone-deduped"
+
+_UTILITY_STYLE = re.compile(r'<style id="keystone-utilities">(.*?)</style>', re.S)
+_OTHER_STYLE = re.compile(r'<style(?! id="keystone-utilities")[^>]*>(.*?)</style>', re.S)
+# Scripts are matched first so class attributes inside them are left alone
+_CLASS_OR_SCRIPT = re.compile(r'(<script\b.*?</script>)|(\sclass=")([^"]*)(")', re.S)
+_CSS_CLASS_SELECTOR = re.compile(r'\.((?:\\.|[\w-])+)')
+
+
+def _base36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        result = digits[remainder] + result
+        if not number:
+            return result
+
+
+def referenced_classes(css: str) -> Set[str]:
+    """
+    Collect the class names used in the selectors of a stylesheet.
+
+    Args:
+        css: Stylesheet text (e.g. a theme's ``print_styles``)
+
+    Returns:
+        Unescaped class names (may include false positives such as ``5cm``)
+    """
+    return {re.sub(r"\\(.)", r"\1", name) for name in _CSS_CLASS_SELECTOR.findall(css)}
+
+
+def _merged_rules(short_class: str, class_names: List[str],
+                  position: Callable[[str], int]) -> List[Tuple[Tuple[int, int, int], int, str]]:
+    """Compile classes into one rule per (media query, selector suffix) for a short class."""
+    groups: Dict[Tuple[Optional[str], str], List[Tuple[Tuple[int, int, int], int, str]]] = {}
+    for class_name in class_names:
+        compiled = compile_declarations(class_name)
+        # Only classes the compiler supports are folded (see dedupe_classes)
+        assert compiled is not None
+        sort_key, media, suffix, declarations = compiled
+        groups.setdefault((media, suffix), []).append((sort_key, position(class_name), declarations))
+    rules = []
+    for (media, suffix), parts in groups.items():
+        # Declarations keep the cascade order of the original stylesheet, so later utilities keep winning
+        parts.sort(key=lambda part: part[:2])
+        declarations = ";".join(declaration for _, _, declaration in parts)
+        rule = f".{short_class}{suffix}{{{declarations}}}"
+        rules.append((parts[0][0], parts[0][1], f"{media}{{{rule}}}" if media else rule))
+    return rules
+
+
+def dedupe_classes(html: str, keep: Iterable[str] = (), min_count: int = 2) -> str:
+    """
+    Replace repeated class strings with short generated classes.
+
+    Only the utilities the static compiler supports are folded into a short
+    class. Marker classes (e.g. ``keybind-key``), classes referenced by other
+    ``<style>`` blocks such as the theme's print styles, and classes listed in
+    ``keep`` stay literal in the attribute so those rules keep matching.
+
+    Args:
+        html: Complete document containing a ``keystone-utilities`` stylesheet
+        keep: Extra class names that must stay literal (e.g. toggled by scripts)
+        min_count: Minimum number of occurrences before a class string is replaced
+
+    Returns:
+        Rewritten document, or ``html`` unchanged if it has no utility
+        stylesheet or was already processed
+    """
+    utilities = _UTILITY_STYLE.search(html)
+    if not utilities:
+        return html
+    original_css = utilities.group(1)
+
+    def position(class_name: str) -> int:
+        # Rules sharing a sort key keep the order compile_css gave them
+        result = compile_class(class_name)
+        found = original_css.find(result[1]) if result is not None else -1
+        return found if found >= 0 else len(original_css)
+
+    pinned = set(keep)
+    for css in _OTHER_STYLE.findall(html):
+        pinned |= referenced_classes(css)
+
+    counts: Dict[str, int] = {}
+    used: Set[str] = set()
+    for match in _CLASS_OR_SCRIPT.finditer(html):
+        if match.group(1) is None:
+            class_names = match.group(3).split()
+            used.update(class_names)
+            key = " ".join(class_names)
+            counts[key] = counts.get(key, 0) + 1
+
+    # Assign short classes in document order, skipping names already in use
+    short_classes: Dict[str, str] = {}
+    folded: Dict[str, List[str]] = {}
+    next_index = 0
+    for class_string, count in counts.items():
+        if count < min_count:
+            continue
+        foldable = [
+            name for name in dict.fromkeys(class_string.split())
+            if name not in pinned and compile_class(name) is not None
+        ]
+        if len(foldable) < 2:
+            continue
+        short_class = f"{SHORT_CLASS_PREFIX}{_base36(next_index)}"
+        while short_class in used or short_class in pinned:
+            next_index += 1
+            short_class = f"{SHORT_CLASS_PREFIX}{_base36(next_index)}"
+        next_index += 1
+        short_classes[class_string] = short_class
+        folded[class_string] = foldable
+
+    literal_classes: Dict[str, None] = {}
+
+    def rewrite(match: "re.Match[str]") -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        class_names = match.group(3).split()
+        class_string = " ".join(class_names)
+        short_class = short_classes.get(class_string)
+        if short_class is None:
+            literal_classes.update(dict.fromkeys(class_names))
+            return match.group(0)
+        kept = [name for name in class_names if name not in folded[class_string]]
+        literal_classes.update(dict.fromkeys(kept))
+        return f"{match.group(2)}{' '.join([short_class] + kept)}{match.group(4)}"
+
+    html = _CLASS_OR_SCRIPT.sub(rewrite, html)
+    literal_classes.update(dict.fromkeys(sorted(pinned)))
+
+    # Short-class rules and the remaining literal classes share one cascade order
+    compiled: List[Tuple[Tuple[int, int, int], int, int, str]] = []
+    for class_name in literal_classes:
+        result = compile_class(class_name)
+        if result is not None:
+            compiled.append((result[0], position(class_name), len(compiled), result[1]))
+    for class_string, short_class in short_classes.items():
+        compiled.extend(
+            (sort_key, rule_position, len(compiled) + offset, rule)
+            for offset, (sort_key, rule_position, rule)
+            in enumerate(_merged_rules(short_class, folded[class_string], position))
+        )
+    compiled.sort()
+    stylesheet = PREFLIGHT + "".join(rule for _, _, _, rule in compiled)
+
+    return _UTILITY_STYLE.sub(
+        lambda _: f'<style id="keystone-utilities" {DEDUPED_ATTRIBUTE}>{stylesheet}</style>', html, count=1
+    )
@@ -0,0 +1,547 @@
+"""
+Static compiler for the Tailwind-style utility classes used by themes and templates.
+
+Templates used to load the Tailwind CDN runtime, which compiles classes in the
+browser and does nothing for WeasyPrint (no JavaScript). This module resolves
+the subset of utility classes Keystone actually uses into a small stylesheet
+that can be inlined into the document, so the output works offline and in PDF.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Theme keys whose values are not class strings
+NON_CLASS_THEME_KEYS = {"name", "description", "inherits_from", "print_styles"}
+
+# Responsive breakpoints (min-width, in pixels) in cascade order
+BREAKPOINTS = {"sm": 640, "md": 768, "lg": 1024, "xl": 1280, "2xl": 1536}
+
+# Pseudo-class variants in cascade order
+PSEUDO_VARIANTS = {
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "hover": ":hover",
+    "focus": ":focus",
+    "active": ":active",
+}
+
+# Minimal subset of Tailwind's preflight reset that the utilities rely on
+PREFLIGHT = (
+    "*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}"
+    "html{line-height:1.5;-webkit-text-size-adjust:100%}"
+    "body{margin:0;line-height:inherit}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "h1,h2,h3,h4,h5,h6,p,figure,blockquote,dl,dd{margin:0}"
+    "table{text-indent:0;border-color:inherit;border-collapse:collapse}"
+    "kbd,code,pre,samp{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,\"Liberation Mono\",\"Courier New\",monospace;font-size:1em}"
+    "svg,img{display:block;vertical-align:middle}"
+    "[hidden]{display:none}"
+)
+
+_FONT_FAMILIES = {
+    "sans": "ui-sans-serif,system-ui,sans-serif,\"Apple Color Emoji\",\"Segoe UI Emoji\"",
+    "serif": "ui-serif,Georgia,Cambria,\"Times New Roman\",Times,serif",
+    "mono": "ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,\"Liberation Mono\",\"Courier New\",monospace",
+    "inter": "'Inter',ui-sans-serif,system-ui,sans-serif",
+}
+
+_FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"),
+    "sm": ("0.875rem", "1.25rem"),
+    "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"),
+    "xl": ("1.25rem", "1.75rem"),
+    "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"),
+    "4xl": ("2.25rem", "2.5rem"),
+    "5xl": ("3rem", "1"),
+}
+
+_FONT_WEIGHTS = {
+    "thin": "100", "extralight": "200", "light": "300", "normal": "400",
+    "medium": "500", "semibold": "600", "bold": "700", "extrabold": "800", "black": "900",
+}
+
+_RADII = {
+    "none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem", "lg": "0.5rem",
+    "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px",
+}
+
+_SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "none": "0 0 #0000",
+}
+
+_MAX_WIDTHS = {
+    "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+    "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem",
+    "7xl": "80rem", "none": "none", "full": "100%", "prose": "65ch",
+}
+
+_GRADIENT_DIRECTIONS = {
+    "t": "to top", "tr": "to top right", "r": "to right", "br": "to bottom right",
+    "b": "to bottom", "bl": "to bottom left", "l": "to left", "tl": "to top left",
+}
+
+_SIDES = {
+    "t": ("top",), "r": ("right",), "b": ("bottom",), "l": ("left",),
+    "x": ("left", "right"), "y": ("top", "bottom"), "": ("",),
+}
+
+_STATIC_UTILITIES = {
+    "block": "display:block",
+    "inline-block": "display:inline-block",
+    "inline": "display:inline",
+    "flex": "display:flex",
+    "inline-flex": "display:inline-flex",
+    "grid": "display:grid",
+    "inline-grid": "display:inline-grid",
+    "table": "display:table",
+    "table-row": "display:table-row",
+    "table-cell": "display:table-cell",
+    "contents": "display:contents",
+    "hidden": "display:none",
+    "static": "position:static",
+    "relative": "position:relative",
+    "absolute": "position:absolute",
+    "fixed": "position:fixed",
+    "sticky": "position:sticky",
+    "flex-1": "flex:1 1 0%",
+    "flex-auto": "flex:1 1 auto",
+    "flex-initial": "flex:0 1 auto",
+    "flex-none": "flex:none",
+    "flex-shrink-0": "flex-shrink:0",
+    "shrink-0": "flex-shrink:0",
+    "flex-grow": "flex-grow:1",
+    "grow": "flex-grow:1",
+    "flex-row": "flex-direction:row",
+    "flex-col": "flex-direction:column",
+    "flex-wrap": "flex-wrap:wrap",
+    "flex-nowrap": "flex-wrap:nowrap",
+    "col-span-full": "grid-column:1 / -1",
+    "items-start": "align-items:flex-start",
+    "items-end": "align-items:flex-end",
+    "items-center": "align-items:center",
+    "items-baseline": "align-items:baseline",
+    "items-stretch": "align-items:stretch",
+    "justify-start": "justify-content:flex-start",
+    "justify-end": "justify-content:flex-end",
+    "justify-center": "justify-content:center",
+    "justify-between": "justify-content:space-between",
+    "justify-around": "justify-content:space-around",
+    "overflow-hidden": "overflow:hidden",
+    "overflow-auto": "overflow:auto",
+    "overflow-x-auto": "overflow-x:auto",
+    "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+    "whitespace-nowrap": "white-space:nowrap",
+    "break-words": "overflow-wrap:break-word",
+    "text-left": "text-align:left",
+    "text-center": "text-align:center",
+    "text-right": "text-align:right",
+    "align-top": "vertical-align:top",
+    "align-middle": "vertical-align:middle",
+    "align-bottom": "vertical-align:bottom",
+    "italic": "font-style:italic",
+    "not-italic": "font-style:normal",
+    "uppercase": "text-transform:uppercase",
+    "lowercase": "text-transform:lowercase",
+    "capitalize": "text-transform:capitalize",
+    "underline": "text-decoration-line:underline",
+    "leading-none": "line-height:1",
+    "leading-tight": "line-height:1.25",
+    "leading-snug": "line-height:1.375",
+    "leading-normal": "line-height:1.5",
+    "leading-relaxed": "line-height:1.625",
+    "tracking-tight": "letter-spacing:-0.025em",
+    "tracking-wide": "letter-spacing:0.025em",
+    "transition": "transition-property:color,background-color,border-color,text-decoration-color,fill,stroke,opacity,box-shadow,transform;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-all": "transition-property:all;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-colors": "transition-property:color,background-color,border-color;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-shadow": "transition-property:box-shadow;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "cursor-pointer": "cursor:pointer",
+    "select-none": "user-select:none",
+    "sr-only": "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;clip:rect(0,0,0,0);white-space:nowrap;border-width:0",
+}
+
+
+@lru_cache(maxsize=1)
+def load_palette() -> Dict[str, Dict[str, str]]:
+    """
+    Load the Tailwind color palette bundled in the assets directory.
+
+    Returns:
+        Dictionary mapping color family to shade to hex value
+    """
+    palette_path = Path(__file__).parent.parent / "assets" / "tailwind_palette.json"
+    with open(palette_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _format_number(value: float) -> str:
+    return f"{value:g}"
+
+
+def _arbitrary(value: str) -> Optional[str]:
+    """Return the CSS value of an arbitrary ``[...]`` value, if it is one."""
+    if value.startswith("[") and value.endswith("]") and len(value) > 2:
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _spacing(value: str) -> Optional[str]:
+    if value == "0":
+        return "0px"
+    if value == "px":
+        return "1px"
+    if value == "auto":
+        return "auto"
+    if re.fullmatch(r"\d+(\.5)?", value):
+        return f"{_format_number(float(value) / 4)}rem"
+    return _arbitrary(value)
+
+
+def _size(value: str, axis: str) -> Optional[str]:
+    keywords = {
+        "full": "100%",
+        "screen": "100vw" if axis == "w" else "100vh",
+        "min": "min-content",
+        "max": "max-content",
+        "fit": "fit-content",
+    }
+    if value in keywords:
+        return keywords[value]
+    fraction = re.fullmatch(r"(\d+)/(\d+)", value)
+    if fraction:
+        numerator, denominator = (int(part) for part in fraction.groups())
+        if denominator:
+            return f"{_format_number(round(numerator / denominator * 100, 6))}%"
+        return None
+    return _spacing(value)
+
+
+def _color(value: str) -> Optional[str]:
+    keywords = {
+        "white": "#fff",
+        "black": "#000",
+        "transparent": "transparent",
+        "current": "currentColor",
+        "inherit": "inherit",
+    }
+    if value in keywords:
+        return keywords[value]
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        return arbitrary
+    match = re.fullmatch(r"([a-z]+)-(\d{2,3})", value)
+    if match:
+        family, shade = match.groups()
+        return load_palette().get(family, {}).get(shade)
+    return None
+
+
+def _sided(properties: Tuple[str, ...], template: str, value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return ";".join(template.format(side=f"-{side}" if side else "", value=value) for side in properties)
+
+
+# Ordered pattern utilities; the position in this list is the cascade order
+# of the generated rules (general utilities before more specific ones).
+_PATTERN_UTILITIES: List[Tuple["re.Pattern[str]", Callable[..., Optional[str]]]] = [
+    (re.compile(r"m([xytrbl]?)-(.+)"),
+     lambda side, value: _sided(_SIDES[side], "margin{side}:{value}", _spacing(value))),
+    (re.compile(r"p([xytrbl]?)-(.+)"),
+     lambda side, value: _sided(_SIDES[side], "padding{side}:{value}", _spacing(value))),
+    (re.compile(r"w-(.+)"), lambda value: _size(value, "w") and f"width:{_size(value, 'w')}"),
+    (re.compile(r"min-w-(.+)"),
+     lambda value: (_size(value, "w") if value != "auto" else None) and f"min-width:{_size(value, 'w')}"),
+    (re.compile(r"max-w-(.+)"),
+     lambda value: (_MAX_WIDTHS.get(value) or _arbitrary(value)) and f"max-width:{_MAX_WIDTHS.get(value) or _arbitrary(value)}"),
+    (re.compile(r"h-(.+)"), lambda value: _size(value, "h") and f"height:{_size(value, 'h')}"),
+    (re.compile(r"min-h-(.+)"), lambda value: _size(value, "h") and f"min-height:{_size(value, 'h')}"),
+    (re.compile(r"grid-cols-(\d+)"),
+     lambda count: f"grid-template-columns:repeat({count},minmax(0,1fr))"),
+    (re.compile(r"grid-cols-(\[.+\])"), lambda value: f"grid-template-columns:{_arbitrary(value)}"),
+    (re.compile(r"col-span-(\d+)"), lambda count: f"grid-column:span {count} / span {count}"),
+    (re.compile(r"gap-(.+)"), lambda value: _spacing(value) and f"gap:{_spacing(value)}"),
+    (re.compile(r"gap-x-(.+)"), lambda value: _spacing(value) and f"column-gap:{_spacing(value)}"),
+    (re.compile(r"gap-y-(.+)"), lambda value: _spacing(value) and f"row-gap:{_spacing(value)}"),
+    (re.compile(r"rounded(?:-(none|sm|md|lg|xl|2xl|3xl|full))?"),
+     lambda size: f"border-radius:{_RADII[size or '']}"),
+    (re.compile(r"border(?:-(\d+))?"), lambda width: f"border-width:{width or 1}px"),
+    (re.compile(r"border-([xytrbl])(?:-(\d+))?"),
+     lambda side, width: _sided(_SIDES[side], "border{side}-width:{value}", f"{width or 1}px")),
+    (re.compile(r"border-(.+)"), lambda value: _color(value) and f"border-color:{_color(value)}"),
+    (re.compile(r"bg-gradient-to-(t|tr|r|br|b|bl|l|tl)"),
+     lambda direction: f"background-image:linear-gradient({_GRADIENT_DIRECTIONS[direction]},var(--tw-gradient-stops))"),
+    (re.compile(r"bg-(.+)"), lambda value: _color(value) and f"background-color:{_color(value)}"),
+    (re.compile(r"from-(.+)"),
+     lambda value: _color(value) and f"--tw-gradient-from:{_color(value)};--tw-gradient-to:rgb(255 255 255 / 0);--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)"),
+    (re.compile(r"via-(.+)"),
+     lambda value: _color(value) and f"--tw-gradient-stops:var(--tw-gradient-from),{_color(value)},var(--tw-gradient-to)"),
+    (re.compile(r"to-(.+)"), lambda value: _color(value) and f"--tw-gradient-to:{_color(value)}"),
+    (re.compile(r"font-(.+)"),
+     lambda value: (f"font-family:{_FONT_FAMILIES[value]}" if value in _FONT_FAMILIES
+                    else f"font-weight:{_FONT_WEIGHTS[value]}" if value in _FONT_WEIGHTS else None)),
+    (re.compile(r"text-(xs|sm|base|lg|xl|2xl|3xl|4xl|5xl)"),
+     lambda size: f"font-size:{_FONT_SIZES[size][0]};line-height:{_FONT_SIZES[size][1]}"),
+    (re.compile(r"text-(.+)"), lambda value: _color(value) and f"color:{_color(value)}"),
+    (re.compile(r"opacity-(\d+)"), lambda value: f"opacity:{_format_number(int(value) / 100)}"),
+    (re.compile(r"shadow(?:-(sm|md|lg|xl|2xl|none))?"), lambda size: f"box-shadow:{_SHADOWS[size or '']}"),
+]
+
+# Utilities that style the children of the element rather than the element itself
+_SPACE_BETWEEN = re.compile(r"space-([xy])-(.+)")
+
+
+def _split_variants(class_name: str) -> Tuple[List[str], str]:
+    """Split ``md:hover:p-4`` into ``(["md", "hover"], "p-4")``, ignoring colons in brackets."""
+    parts: List[str] = []
+    depth = 0
+    current: List[str] = []
+    for char in class_name:
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        if char == ":" and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts[:-1], parts[-1]
+
+
+def escape_class(class_name: str) -> str:
+    """
+    Escape a class name for use in a CSS selector.
+
+    Args:
+        class_name: Raw class name, e.g. ``md:grid-cols-2`` or ``w-1/4``
+
+    Returns:
+        Escaped selector fragment without the leading dot
+    """
+    escaped = re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", class_name)
+    if escaped[:1].isdigit():
+        escaped = f"\\3{escaped[0]} {escaped[1:]}"
+    return escaped
+
+
+def resolve_utility(utility: str) -> Optional[Tuple[int, str, str]]:
+    """
+    Resolve a single utility (without variants) to its CSS declarations.
+
+    Args:
+        utility: Utility class name such as ``px-2`` or ``text-gray-600``
+
+    Returns:
+        Tuple of (cascade order, selector suffix, declarations), or None if the
+        utility is not supported
+    """
+    if utility in _STATIC_UTILITIES:
+        return 0, "", _STATIC_UTILITIES[utility]
+
+    space = _SPACE_BETWEEN.fullmatch(utility)
+    if space:
+        axis, value = space.groups()
+        amount = _spacing(value)
+        if amount is None:
+            return None
+        side = "left" if axis == "x" else "top"
+        return len(_PATTERN_UTILITIES) + 1, " > :not([hidden]) ~ :not([hidden])", f"margin-{side}:{amount}"
+
+    for order, (pattern, handler) in enumerate(_PATTERN_UTILITIES, start=1):
+        match = pattern.fullmatch(utility)
+        if not match:
+            continue
+        try:
+            declarations = handler(*match.groups())
+        except KeyError:
+            declarations = None
+        if declarations:
+            return order, "", declarations
+    return None
+
+
+def compile_declarations(class_name: str) -> Optional[Tuple[Tuple[int, int, int], Optional[str], str, str]]:
+    """
+    Compile one (possibly variant-prefixed) class into the parts of a CSS rule.
+
+    Args:
+        class_name: Class name, e.g. ``lg:grid-cols-3`` or ``last:border-b-0``
+
+    Returns:
+        Tuple of (sort key, media query or None, selector suffix such as
+        ``:last-child``, declarations), or None if the class is not supported
+    """
+    variants, utility = _split_variants(class_name)
+    resolved = resolve_utility(utility)
+    if resolved is None:
+        return None
+    order, suffix, declarations = resolved
+
+    media_order = 0
+    media = None
+    pseudo = ""
+    pseudo_order = 0
+    for variant in variants:
+        if variant in BREAKPOINTS:
+            media_order = list(BREAKPOINTS).index(variant) + 1
+            media = f"@media (min-width:{BREAKPOINTS[variant]}px)"
+        elif variant == "print":
+            media_order = len(BREAKPOINTS) + 1
+            media = "@media print"
+        elif variant in PSEUDO_VARIANTS:
+            pseudo += PSEUDO_VARIANTS[variant]
+            pseudo_order = max(pseudo_order, list(PSEUDO_VARIANTS).index(variant) + 1)
+        else:
+            # Unsupported variant (e.g. dark:, group-hover:)
+            return None
+
+    return (media_order, pseudo_order, order), media, f"{pseudo}{suffix}", declarations
+
+
+def compile_class(class_name: str, selector: Optional[str] = None) -> Optional[Tuple[Tuple[int, int, int], str]]:
+    """
+    Compile one (possibly variant-prefixed) class into a CSS rule.
+
+    Args:
+        class_name: Class name, e.g. ``lg:grid-cols-3`` or ``last:border-b-0``
+        selector: Selector to attach the declarations to. Defaults to the
+            escaped class itself.
+
+    Returns:
+        Tuple of (sort key, rule text), or None if the class is not supported
+    """
+    compiled = compile_declarations(class_name)
+    if compiled is None:
+        return None
+    sort_key, media, suffix, declarations = compiled
+
+    if selector is None:
+        selector = f".{escape_class(class_name)}"
+    rule = f"{selector}{suffix}{{{declarations}}}"
+    if media:
+        rule = f"{media}{{{rule}}}"
+    return sort_key, rule
+
+
+def collect_classes(*sources: str) -> List[str]:
+    """
+    Collect distinct class names from whitespace-separated class strings.
+
+    Args:
+        *sources: Class strings (e.g. theme values or template class lists)
+
+    Returns:
+        Class names in first-seen order without duplicates
+    """
+    seen: Dict[str, None] = {}
+    for source in sources:
+        for class_name in source.split():
+            seen.setdefault(class_name, None)
+    return list(seen)
+
+
+def theme_classes(theme: Dict[str, Any]) -> List[str]:
+    """
+    Collect every class name referenced by a theme's style values.
+
+    Args:
+        theme: Theme configuration
+
+    Returns:
+        Class names in first-seen order without duplicates
+    """
+    strings = []
+
+    def walk(value: Any) -> None:
+        if isinstance(value, dict):
+            for key, nested in value.items():
+                if key not in NON_CLASS_THEME_KEYS:
+                    walk(nested)
+        elif isinstance(value, list):
+            for nested in value:
+                walk(nested)
+        elif isinstance(value, str):
+            strings.append(value)
+
+    walk(theme)
+    return collect_classes(*strings)
+
+
+def compile_css(class_names: Iterable[str]) -> str:
+    """
+    Compile utility classes into a minimal static stylesheet.
+
+    Unsupported classes are skipped, so arbitrary marker classes such as
+    ``keybind-key`` can be passed through safely.
+
+    Args:
+        class_names: Class names to compile
+
+    Returns:
+        Stylesheet containing the preflight reset and one rule per supported class
+    """
+    compiled = []
+    for index, class_name in enumerate(dict.fromkeys(class_names)):
+        result = compile_class(class_name)
+        if result is not None:
+            sort_key, rule = result
+            compiled.append((sort_key, index, rule))
+    compiled.sort()
+    return PREFLIGHT + "".join(rule for _, _, rule in compiled)
+
+
+# Stylesheets kept per process: a few per theme and template combination
+STYLESHEET_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=STYLESHEET_CACHE_SIZE)
+def _cached_stylesheet(theme_class_names: Tuple[str, ...], template_classes: str, extra_classes: str) -> str:
+    return compile_css(list(theme_class_names) + collect_classes(template_classes, extra_classes))
+
+
+def build_stylesheet(theme: Dict[str, Any], template_classes: str, extra_classes: str = "") -> str:
+    """
+    Build the utility stylesheet for a theme and template, cached per set of classes.
+
+    Args:
+        theme: Theme configuration
+        template_classes: Class names the template writes itself
+        extra_classes: Additional class names, e.g. from icon markup
+
+    Returns:
+        Compiled stylesheet ready to be inlined in a ``<style>`` element
+    """
+    return _cached_stylesheet(tuple(theme_classes(theme)), template_classes, extra_classes)
+
+
+def icon_classes(icons: Dict[str, str], icon_names: Iterable[Optional[str]]) -> str:
+    """
+    Extract the class attributes used inside the markup of the given icons.
+
+    Args:
+        icons: Icon name to SVG string mapping
+        icon_names: Names of the icons the document uses (None entries are skipped)
+
+    Returns:
+        Space-separated class names
+    """
+    return " ".join(
+        match.group(1)
+        for name in dict.fromkeys(icon_names) if name is not None
+        for match in re.finditer(r'class="([^"]*)"', icons[name])
+    )
@@ -0,0 +1,232 @@
+"""
+Local font pipeline: find bundled font files, subset them to the glyphs a
+document uses and emit ``@font-face`` rules (data URIs or sidecar files).
+
+The Inter font files (SIL Open Font License) are shipped in ``assets/fonts``
+as package data. Subsetting requires fontTools (``pip install keystone[fonts]``).
+Without it the full font files are embedded; without any font files the
+document falls back to the system font stack. No network access is ever needed.
+"""
+import base64
+import hashlib
+import json
+import os
+import sys
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .cache import get_cache_dir
+
+
+FONTS_DIR = Path(__file__).parent.parent / "assets" / "fonts"
+
+# Font file extensions in order of preference
+FONT_EXTENSIONS = [".woff2", ".woff", ".ttf", ".otf"]
+
+FONT_FORMATS = {
+    ".woff2": ("woff2", "font/woff2"),
+    ".woff": ("woff", "font/woff"),
+    ".ttf": ("truetype", "font/ttf"),
+    ".otf": ("opentype", "font/otf"),
+}
+
+# Printable ASCII is always kept so template literals ("Version:", "+", ...)
+# render, and so that most documents share the same subset.
+BASE_GLYPHS = "".join(chr(code) for code in range(0x20, 0x7F))
+
+_SUBSET_MEMORY_CACHE: Dict[str, bytes] = {}
+
+
+def load_font_manifest() -> Dict[str, Dict[str, str]]:
+    """
+    Load the manifest describing the bundled font families.
+
+    Returns:
+        Dictionary mapping family name to weight to file stem
+    """
+    with open(FONTS_DIR / "fonts.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def font_search_paths() -> List[Path]:
+    """
+    Get the directories searched for font files.
+
+    The bundled ``assets/fonts`` directory comes first, followed by any
+    directories listed in ``KEYSTONE_FONT_PATH`` (os.pathsep separated).
+
+    Returns:
+        List of directories in search order
+    """
+    paths = [FONTS_DIR]
+    extra = os.environ.get("KEYSTONE_FONT_PATH", "")
+    paths.extend(Path(entry) for entry in extra.split(os.pathsep) if entry)
+    return paths
+
+
+def find_font_files(family: str) -> Dict[str, Path]:
+    """
+    Locate the font file for each weight of a family.
+
+    Args:
+        family: Font family name from the manifest, e.g. ``"Inter"``
+
+    Returns:
+        Dictionary mapping weight to font file path (missing weights are omitted)
+    """
+    stems = load_font_manifest().get(family, {})
+    found = {}
+    for weight, stem in stems.items():
+        for directory in font_search_paths():
+            candidates = [directory / f"{stem}{extension}" for extension in FONT_EXTENSIONS]
+            match = next((path for path in candidates if path.is_file()), None)
+            if match:
+                found[weight] = match
+                break
+    return found
+
+
+def collect_document_text(data: Dict[str, Any]) -> str:
+    """
+    Collect every character a document will render from its data.
+
+    Args:
+        data: Merged keybind data
+
+    Returns:
+        String containing the distinct characters, sorted
+    """
+    chars = set(BASE_GLYPHS)
+
+    def add(value: Any) -> None:
+        if isinstance(value, str):
+            chars.update(value)
+        elif isinstance(value, list):
+            for item in value:
+                add(item)
+
+    for field in ("title", "tool", "version", "subtitle"):
+        add(data.get(field))
+    for category in data.get("categories", []):
+        add(category.get("name"))
+        for keybind in category.get("keybinds", []):
+            add(keybind.get("action"))
+            add(keybind.get("keys"))
+            add(keybind.get("description"))
+
+    return "".join(sorted(chars))
+
+
+def _subset_available() -> bool:
+    try:
+        import fontTools.subset  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _woff2_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def subset_font(font_path: Union[str, Path], text: str) -> Tuple[bytes, str]:
+    """
+    Subset a font file to the glyphs needed for ``text``, with caching.
+
+    Subsets are cached in memory and on disk under a hash of the font file
+    contents and the glyph set, so repeated builds skip the subsetting step.
+
+    Args:
+        font_path: Path to the source font file
+        text: Characters that must be kept
+
+    Returns:
+        Tuple of (font bytes, file extension). The original file is returned
+        unchanged if fontTools is not installed.
+    """
+    font_path = Path(font_path)
+    font_bytes = font_path.read_bytes()
+
+    if not _subset_available():
+        return font_bytes, font_path.suffix.lower()
+
+    extension = ".woff2" if _woff2_available() else ".woff"
+    glyphs = "".join(sorted(set(text)))
+    key = hashlib.sha256(
+        hashlib.sha256(font_bytes).digest() + glyphs.encode('utf-8') + extension.encode('ascii')
+    ).hexdigest()
+
+    if key in _SUBSET_MEMORY_CACHE:
+        return _SUBSET_MEMORY_CACHE[key], extension
+
+    cache_path = get_cache_dir("fonts") / f"{key}{extension}"
+    if cache_path.exists():
+        subset_bytes = cache_path.read_bytes()
+    else:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+
+        options = subset.Options()
+        options.flavor = extension.lstrip(".")
+        font = TTFont(BytesIO(font_bytes))
+        subsetter = subset.Subsetter(options=options)
+        subsetter.populate(text=glyphs)
+        subsetter.subset(font)
+        buffer = BytesIO()
+        font.save(buffer)
+        subset_bytes = buffer.getvalue()
+
+        try:
+            temp_path = cache_path.with_suffix(f"{extension}.tmp")
+            temp_path.write_bytes(subset_bytes)
+            temp_path.replace(cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write font cache {cache_path}: {e}", file=sys.stderr)
+
+    _SUBSET_MEMORY_CACHE[key] = subset_bytes
+    return subset_bytes, extension
+
+
+def build_font_css(text: str, families: Iterable[str] = ("Inter",), asset_dir: Optional[Union[str, Path]] = None) -> str:
+    """
+    Build ``@font-face`` rules for the bundled fonts, subset to ``text``.
+
+    Args:
+        text: Characters used by the document
+        families: Font families to include
+        asset_dir: Directory of the generated HTML. If given, subset fonts are
+            written to ``asset_dir/fonts`` and referenced relatively; otherwise
+            they are embedded as data URIs.
+
+    Returns:
+        CSS text with one ``@font-face`` rule per available weight (empty if
+        no font files are installed)
+    """
+    rules = []
+    for family in families:
+        for weight, font_path in sorted(find_font_files(family).items()):
+            font_bytes, extension = subset_font(font_path, text)
+            css_format, mime_type = FONT_FORMATS[extension]
+
+            if asset_dir is not None:
+                digest = hashlib.sha256(font_bytes).hexdigest()[:16]
+                filename = f"{family}-{weight}-{digest}{extension}"
+                fonts_dir = Path(asset_dir) / "fonts"
+                fonts_dir.mkdir(parents=True, exist_ok=True)
+                sidecar = fonts_dir / filename
+                if not sidecar.exists():
+                    sidecar.write_bytes(font_bytes)
+                url = f"fonts/{filename}"
+            else:
+                url = f"data:{mime_type};base64,{base64.b64encode(font_bytes).decode('ascii')}"
+
+            rules.append(
+                f"@font-face{{font-family:'{family}';font-style:normal;font-weight:{weight};"
+                f"font-display:swap;src:url({url}) format('{css_format}')}}"
+            )
+    return "".join(rules)
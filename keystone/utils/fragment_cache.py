@@ -0,0 +1,195 @@
+"""
+Render cache for category fragments.
+
+Each rendered category (a skill-tree card, or the reference-card rows of one
+category) is stored under a hash of everything that affects its markup: the
+category data, the theme fingerprint, the template name, the Keystone version
+and any per-fragment variant such as the assigned color. Re-rendering a large
+cheatsheet after editing one source then only renders the categories that
+actually changed; the rest are spliced in from memory or from disk.
+
+Both levels are bounded. The memory level keeps the most recently used
+fragments only, so a build never holds the whole document there. The disk
+level is trimmed to a total size once per cache instance, dropping the least
+recently used fragments first (a hit refreshes a file's modification time).
+"""
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .. import __version__
+from .cache import get_cache_dir
+from .theme_loader import theme_fingerprint
+
+# Fragments kept in memory per cache
+MEMORY_FRAGMENTS = 256
+
+# Total size of the on-disk fragments, in bytes
+DISK_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FragmentCache:
+    """Two-level (memory and disk) cache of rendered category fragments."""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, persist: bool = True,
+                 maxsize: int = MEMORY_FRAGMENTS, max_disk_bytes: int = DISK_CACHE_BYTES):
+        """
+        Create a fragment cache.
+
+        Args:
+            directory: Directory for cached fragments. Defaults to the
+                ``fragments`` directory in Keystone's cache (see get_cache_dir).
+            persist: Whether to read and write fragments on disk
+            maxsize: Maximum number of fragments kept in memory
+            max_disk_bytes: Size the on-disk fragments are trimmed to
+        """
+        self._directory = Path(directory) if directory is not None else None
+        self.persist = persist
+        self.maxsize = maxsize
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._trimmed = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def directory(self) -> Path:
+        """Directory holding the on-disk fragments (created on first use)."""
+        if self._directory is None:
+            self._directory = get_cache_dir("fragments")
+        else:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        return self._directory
+
+    def fragment_key(self, template: str, category: Dict[str, Any], theme: Dict[str, Any],
+                     variant: Tuple[Any, ...] = ()) -> str:
+        """
+        Compute the cache key for a category fragment.
+
+        Args:
+            template: Template name
+            category: Category data being rendered
+            theme: Theme configuration
+            variant: Any other inputs the fragment depends on
+
+        Returns:
+            Hex digest identifying the fragment
+        """
+        payload = json.dumps(
+            [__version__, template, theme_fingerprint(theme), category, list(variant)],
+            sort_keys=True, separators=(',', ':'), default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a fragment by key in memory, then on disk.
+
+        Args:
+            key: Key from fragment_key
+
+        Returns:
+            Fragment HTML, or None on a miss
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        cache_path = self.directory / f"{key}.html" if self.persist else None
+        if cache_path is not None and cache_path.exists():
+            self.hits += 1
+            fragment = cache_path.read_text(encoding='utf-8')
+            try:
+                # Mark as recently used for trim_disk
+                os.utime(cache_path)
+            except OSError:
+                pass
+            self._remember(key, fragment)
+            return fragment
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, fragment: str) -> None:
+        """
+        Store a rendered fragment in memory and on disk.
+
+        Args:
+            key: Key from fragment_key
+            fragment: Fragment HTML
+        """
+        self._remember(key, fragment)
+        if not self.persist:
+            return
+        if not self._trimmed:
+            self._trimmed = True
+            self.trim_disk()
+        cache_path = self.directory / f"{key}.html"
+        try:
+            temp_path = cache_path.with_suffix(".html.tmp")
+            temp_path.write_text(fragment, encoding='utf-8')
+            temp_path.replace(cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write fragment cache {cache_path}: {e}", file=sys.stderr)
+
+    def _remember(self, key: str, fragment: str) -> None:
+        self._memory[key] = fragment
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def trim_disk(self) -> int:
+        """
+        Delete the least recently used on-disk fragments beyond max_disk_bytes.
+
+        Returns:
+            Number of fragments deleted
+        """
+        entries = []
+        for path in self.directory.glob("*.html"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        deleted = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            deleted += 1
+        return deleted
+
+    def get_or_render(self, template: str, category: Dict[str, Any], theme: Dict[str, Any],
+                      render: Callable[[], str], variant: Tuple[Any, ...] = ()) -> str:
+        """
+        Return the cached fragment for a category, rendering it on a miss.
+
+        Args:
+            template: Template name
+            category: Category data being rendered
+            theme: Theme configuration
+            render: Callable producing the fragment HTML
+            variant: Any other inputs the fragment depends on
+
+        Returns:
+            Fragment HTML
+        """
+        key = self.fragment_key(template, category, theme, variant)
+        fragment = self.get(key)
+        if fragment is None:
+            fragment = render()
+            self.put(key, fragment)
+        return fragment
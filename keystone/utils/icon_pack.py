@@ -0,0 +1,206 @@
+"""
+Indexed icon packs.
+
+An icon pack is a single file with a small JSON index mapping icon names to
+byte ranges, followed by the concatenated SVG bodies::
+
+    KEYSTONE-ICONPACK 1\\n
+    <index length in bytes>\\n
+    {"grid": [0, 231], "terminal": [231, 228], ...}
+    <svg ...>...</svg><svg ...>...</svg>...
+
+Opening a pack only reads the index, so membership checks and name listings
+are cheap even for packs with thousands of icons; an SVG body is read and
+decoded the first time that icon is looked up.
+
+The bundled icons are kept as ``icons.json`` only; cached_icon_pack builds
+their pack into Keystone's cache the first time it is needed, so the pack can
+never drift from the manifest.
+"""
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .cache import get_cache_dir
+
+MAGIC = b"KEYSTONE-ICONPACK 1\n"
+
+ICON_PACK_SUFFIX = ".iconpack"
+
+
+class IconPack(Mapping):
+    """Read-only mapping of icon name to SVG string backed by an icon pack file."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open an icon pack and read its index.
+
+        Args:
+            path: Path to the ``.iconpack`` file
+
+        Raises:
+            FileNotFoundError: If the pack file doesn't exist
+            ValueError: If the file is not a valid icon pack
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Icon pack not found at {self.path}")
+
+        with open(self.path, 'rb') as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f"Not a Keystone icon pack: {self.path}")
+            try:
+                index_length = int(f.readline())
+                self._index: Dict[str, Tuple[int, int]] = json.loads(f.read(index_length))
+            except ValueError as e:
+                raise ValueError(f"Corrupt icon pack index in {self.path}: {e}")
+            self._data_offset = f.tell()
+
+        self._decoded: Dict[str, str] = {}
+
+    def __getitem__(self, name: str) -> str:
+        if name in self._decoded:
+            return self._decoded[name]
+        offset, length = self._index[name]
+        with open(self.path, 'rb') as f:
+            f.seek(self._data_offset + offset)
+            svg = f.read(length).decode('utf-8')
+        self._decoded[name] = svg
+        return svg
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def decoded_count(self) -> int:
+        """Number of icons whose SVG body has been read so far."""
+        return len(self._decoded)
+
+
+def write_icon_pack(icons: Dict[str, str], output_path: Union[str, Path]) -> Path:
+    """
+    Write icons to an indexed icon pack file.
+
+    Args:
+        icons: Icon name to SVG string mapping
+        output_path: Destination ``.iconpack`` path
+
+    Returns:
+        Path to the written pack
+    """
+    index = {}
+    bodies = []
+    offset = 0
+    for name in sorted(icons):
+        body = icons[name].encode('utf-8')
+        index[name] = [offset, len(body)]
+        bodies.append(body)
+        offset += len(body)
+
+    index_bytes = json.dumps(index, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(f"{len(index_bytes)}\n".encode('ascii'))
+        f.write(index_bytes)
+        for body in bodies:
+            f.write(body)
+    return output_path
+
+
+def build_icon_pack(source: Union[str, Path], output_path: Union[str, Path]) -> Path:
+    """
+    Build an icon pack from a JSON manifest or a directory of ``.svg`` files.
+
+    Args:
+        source: ``icons.json``-style manifest, or a directory whose ``*.svg``
+            files become icons named after their file stem
+        output_path: Destination ``.iconpack`` path
+
+    Returns:
+        Path to the written pack
+
+    Raises:
+        FileNotFoundError: If the source doesn't exist
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f"Icon source not found: {source}")
+
+    if source.is_dir():
+        icons = {
+            svg_path.stem: svg_path.read_text(encoding='utf-8').strip()
+            for svg_path in sorted(source.glob("*.svg"))
+        }
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            icons = json.load(f)
+
+    return write_icon_pack(icons, output_path)
+
+
+def cached_icon_pack(source: Union[str, Path]) -> Path:
+    """
+    Get the icon pack for a source manifest, building it into the cache if needed.
+
+    The cached pack is keyed on the manifest's content, so editing the
+    manifest builds a new pack on the next load.
+
+    Args:
+        source: ``icons.json``-style manifest
+
+    Returns:
+        Path to the cached pack
+
+    Raises:
+        FileNotFoundError: If the source doesn't exist
+        OSError: If the cache directory cannot be written
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(f"Icon source not found: {source}")
+
+    key = hashlib.sha256(MAGIC + source.read_bytes()).hexdigest()
+    cache_path = get_cache_dir("icons") / f"{key}{ICON_PACK_SUFFIX}"
+    if not cache_path.exists():
+        # Concurrent builds (e.g. render workers) each write their own file
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        build_icon_pack(source, temp_path)
+        temp_path.replace(cache_path)
+    return cache_path
+
+
+def find_icon_packs(directories: List[Path]) -> List[Path]:
+    """
+    Find icon pack files in the given directories.
+
+    Args:
+        directories: Directories to search, in priority order
+
+    Returns:
+        Pack paths in priority order (sorted by name within a directory)
+    """
+    packs = []
+    for directory in directories:
+        if directory.is_dir():
+            packs.extend(sorted(directory.glob(f"*{ICON_PACK_SUFFIX}")))
+    return packs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m keystone.utils.icon_pack <icons.json|svg_dir> <output.iconpack>", file=sys.stderr)
+        sys.exit(2)
+    written = build_icon_pack(sys.argv[1], sys.argv[2])
+    print(f"Wrote {len(IconPack(written))} icons to {written}")
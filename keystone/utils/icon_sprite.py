@@ -0,0 +1,134 @@
+"""
+SVG sprite helpers: emit each used icon once as a ``<symbol>`` and reference
+it with ``<use href>`` instead of repeating the full SVG markup per category.
+"""
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+# Attributes of the source <svg> that belong on the referencing element
+_OUTER_ATTRIBUTES = {"class", "width", "height", "style"}
+
+_SVG_PATTERN = re.compile(r"<svg\b([^>]*)>(.*)</svg>\s*$", re.S)
+_ATTRIBUTE_PATTERN = re.compile(r'([^\s=]+)\s*=\s*"([^"]*)"')
+_SPRITE_PATTERN = re.compile(r'<svg[^>]*\bdata-keystone-sprite\b[^>]*>(.*?)</svg>', re.S)
+_SYMBOL_PATTERN = re.compile(r'<symbol id="([^"]+)"([^>]*)>(.*?)</symbol>', re.S)
+_USE_PATTERN = re.compile(r'<svg([^>]*)><use href="#([^"]+)"></use></svg>')
+
+
+def symbol_id(icon_name: str) -> str:
+    """
+    Get the sprite symbol id for an icon name.
+
+    Args:
+        icon_name: Icon name from the icon manifest
+
+    Returns:
+        Element id safe for use in ``href="#..."``
+    """
+    return "icon-" + re.sub(r"[^a-zA-Z0-9_-]", "-", icon_name)
+
+
+def resolve_icon_name(icon_name: Optional[str], icons: Dict[str, str]) -> Optional[str]:
+    """
+    Resolve a category icon name, falling back to the ``grid`` icon.
+
+    Args:
+        icon_name: Requested icon name (None for the default)
+        icons: Icon name to SVG string mapping
+
+    Returns:
+        Icon name present in ``icons``, or None if not even the fallback exists
+    """
+    if icon_name is not None and icon_name in icons:
+        return icon_name
+    return "grid" if "grid" in icons else None
+
+
+def _split_svg(svg: str) -> Tuple[Dict[str, str], str]:
+    match = _SVG_PATTERN.search(svg.strip())
+    if not match:
+        return {}, svg
+    attributes = dict(_ATTRIBUTE_PATTERN.findall(match.group(1)))
+    return attributes, match.group(2)
+
+
+def icon_reference(icon_name: Optional[str], icons: Dict[str, str]) -> str:
+    """
+    Render a ``<use>`` reference to an icon in the document sprite.
+
+    Args:
+        icon_name: Resolved icon name (see resolve_icon_name)
+        icons: Icon name to SVG string mapping
+
+    Returns:
+        Small SVG element referencing the sprite symbol (empty if no icon)
+    """
+    if icon_name is None:
+        return ""
+    attributes, _ = _split_svg(icons[icon_name])
+    outer = "".join(f' {key}="{value}"' for key, value in attributes.items() if key in _OUTER_ATTRIBUTES)
+    return f'<svg{outer} aria-hidden="true"><use href="#{symbol_id(icon_name)}"></use></svg>'
+
+
+def build_sprite(icons: Dict[str, str], icon_names: Iterable[Optional[str]]) -> str:
+    """
+    Build a hidden SVG sprite containing one ``<symbol>`` per used icon.
+
+    Args:
+        icons: Icon name to SVG string mapping
+        icon_names: Resolved icon names used by the document (duplicates allowed)
+
+    Returns:
+        Sprite markup to place at the start of ``<body>`` (empty if no icons)
+    """
+    symbols = []
+    for icon_name in dict.fromkeys(name for name in icon_names if name is not None):
+        attributes, inner = _split_svg(icons[icon_name])
+        symbol_attributes = "".join(
+            f' {key}="{value}"' for key, value in attributes.items()
+            if key not in _OUTER_ATTRIBUTES and key != "xmlns"
+        )
+        symbols.append(f'<symbol id="{symbol_id(icon_name)}"{symbol_attributes}>{inner}</symbol>')
+
+    if not symbols:
+        return ""
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" data-keystone-sprite aria-hidden="true" '
+        'width="0" height="0" style="position:absolute;width:0;height:0;overflow:hidden">'
+        f'{"".join(symbols)}</svg>'
+    )
+
+
+def expand_icon_sprite(html_content: str) -> str:
+    """
+    Replace sprite ``<use>`` references with the full inline SVG.
+
+    WeasyPrint renders every inline ``<svg>`` as a separate image, so references
+    to symbols in another ``<svg>`` element cannot be resolved there. This
+    restores self-contained icons for PDF output.
+
+    Args:
+        html_content: HTML document that may contain a Keystone sprite
+
+    Returns:
+        HTML with the sprite removed and each reference inlined
+    """
+    sprite = _SPRITE_PATTERN.search(html_content)
+    if not sprite:
+        return html_content
+
+    symbols = {
+        symbol_match.group(1): (symbol_match.group(2), symbol_match.group(3))
+        for symbol_match in _SYMBOL_PATTERN.finditer(sprite.group(1))
+    }
+
+    def inline(match):
+        outer, reference = match.group(1), match.group(2)
+        if reference not in symbols:
+            return match.group(0)
+        symbol_attributes, inner = symbols[reference]
+        outer = outer.replace(' aria-hidden="true"', '')
+        return f'<svg xmlns="http://www.w3.org/2000/svg"{outer}{symbol_attributes}>{inner}</svg>'
+
+    html_content = html_content[:sprite.start()] + html_content[sprite.end():]
+    return _USE_PATTERN.sub(inline, html_content)
@@ -0,0 +1,113 @@
+"""
+Shared rendering of keyboard chords as ``<kbd>`` chips.
+
+Cheatsheets repeat the same chords ("Ctrl+S", "Esc", "Shift+Tab"...) many
+times, so rendered chords are memoized in a bounded LRU cache keyed by the
+chip class (which comes from the theme) and the normalized chord tuple.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple, Union
+
+# Separator between the keys of a single chord
+KEY_SEPARATOR = '<span class="text-gray-500 mx-1">+</span>'
+
+# Placeholder shown when a keybind has no keys
+EMPTY_KEYS = '<span class="text-gray-400">-</span>'
+
+
+class KeyChipCache:
+    """Bounded LRU cache of rendered chord HTML with hit-rate statistics."""
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Create an empty cache.
+
+        Args:
+            maxsize: Maximum number of rendered chords to keep
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render_chord(self, chord: Tuple[str, ...], key_class: str) -> str:
+        """
+        Render a chord such as ``("Ctrl", "S")`` as ``<kbd>`` chips.
+
+        Args:
+            chord: Escaped key labels of the chord (see document.parse_chords)
+            key_class: Class attribute for each ``<kbd>`` element
+
+        Returns:
+            HTML for the chord
+        """
+        cache_key = (key_class, chord)
+        with self._lock:
+            rendered = self._entries.get(cache_key)
+            if rendered is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return rendered
+            self.misses += 1
+
+        rendered = KEY_SEPARATOR.join(f'<kbd class="{key_class}">{key}</kbd>' for key in chord)
+
+        with self._lock:
+            self._entries[cache_key] = rendered
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rendered
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, size, maxsize and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached chords and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Process-wide cache shared by all templates
+KEY_CHIP_CACHE = KeyChipCache()
+
+
+def render_key_display(chords: Sequence[Tuple[str, ...]], key_class: str, group_class: str,
+                       combination_separator: str, cache: KeyChipCache = KEY_CHIP_CACHE) -> str:
+    """
+    Render the chords of a keybind as groups of ``<kbd>`` chips.
+
+    Args:
+        chords: Alternative chords of the keybind (see document.parse_chords)
+        key_class: Class attribute for each ``<kbd>`` element
+        group_class: Class attribute for the wrapping ``<div>``
+        combination_separator: Markup placed between alternative chords
+        cache: Chord cache to use
+
+    Returns:
+        HTML string for key display
+    """
+    if not chords:
+        return EMPTY_KEYS
+
+    key_combinations = combination_separator.join(cache.render_chord(chord, key_class) for chord in chords)
+    return f'<div class="{group_class}">{key_combinations}</div>'
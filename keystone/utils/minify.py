@@ -0,0 +1,96 @@
+"""
+Whitespace minification for generated documents.
+
+The templates are f-strings indented like the Python code around them, so the
+output carries deep indentation on every line. minify_html removes whitespace
+that cannot affect rendering and minifies inline stylesheets with minify_css.
+"""
+import re
+
+# Elements whose surrounding whitespace never renders as a space
+BLOCK_ELEMENTS = frozenset({
+    "!doctype", "html", "head", "body", "title", "meta", "link", "style", "script",
+    "header", "footer", "main", "section", "article", "nav", "aside",
+    "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tfoot", "tr", "th", "td", "caption", "colgroup", "col", "pre",
+    "svg", "symbol", "defs", "template", "noscript", "br", "hr",
+})
+
+# Elements whose content is kept exactly as written (style content is minified separately)
+_RAW_ELEMENTS = ("pre", "textarea", "script", "style")
+
+_RAW_BLOCK = re.compile(r"<(%s)\b.*?</\1\s*>" % "|".join(_RAW_ELEMENTS), re.S | re.I)
+_RAW_PLACEHOLDER = re.compile(r'<(\w+) data-keystone-raw="(\d+)">')
+_STYLE_BLOCK = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.S | re.I)
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_TAG = re.compile(r"(<[^>]+>)")
+_TAG_NAME = re.compile(r"</?\s*([!\w-]+)")
+_WHITESPACE = re.compile(r"\s+")
+
+_CSS_STRING = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", re.S)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css: str) -> str:
+    """
+    Remove comments and insignificant whitespace from a stylesheet.
+
+    Quoted strings (font names, data URIs) are left untouched.
+
+    Args:
+        css: Stylesheet text
+
+    Returns:
+        Equivalent minified stylesheet
+    """
+    parts = _CSS_STRING.split(css)
+    for index in range(0, len(parts), 2):
+        code = _CSS_COMMENT.sub("", parts[index])
+        code = _WHITESPACE.sub(" ", code)
+        code = _CSS_PUNCTUATION.sub(r"\1", code)
+        # "a: b" -> "a:b"; whitespace before ":" is a descendant combinator and stays
+        parts[index] = code.replace(": ", ":").replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def _is_block(tag: str) -> bool:
+    match = _TAG_NAME.match(tag)
+    return match is not None and match.group(1).lower() in BLOCK_ELEMENTS
+
+
+def minify_html(html: str) -> str:
+    """
+    Minify an HTML document and its inline stylesheets.
+
+    Whitespace runs collapse to one space, and whitespace next to block-level
+    tags is removed, so inline spacing (e.g. between words or inline elements)
+    is preserved. ``<pre>``, ``<textarea>`` and ``<script>`` contents are kept
+    as written.
+
+    Args:
+        html: HTML document
+
+    Returns:
+        Minified document that renders the same
+    """
+    html = _STYLE_BLOCK.sub(lambda m: f"{m.group(1)}{minify_css(m.group(2))}{m.group(3)}", html)
+
+    # Swap raw elements for placeholder tags of the same name while collapsing whitespace
+    raw_blocks = []
+
+    def stash(match: "re.Match[str]") -> str:
+        raw_blocks.append(match.group(0))
+        return f'<{match.group(1)} data-keystone-raw="{len(raw_blocks) - 1}">'
+
+    tokens = _TAG.split(_COMMENT.sub("", _RAW_BLOCK.sub(stash, html)))
+    # tokens alternate text, tag, text, tag, ..., text
+    for index in range(0, len(tokens), 2):
+        text = _WHITESPACE.sub(" ", tokens[index])
+        if index == 0 or _is_block(tokens[index - 1]):
+            text = text.lstrip()
+        if index + 1 == len(tokens) or _is_block(tokens[index + 1]):
+            text = text.rstrip()
+        tokens[index] = text
+
+    return _RAW_PLACEHOLDER.sub(lambda m: raw_blocks[int(m.group(2))], "".join(tokens))
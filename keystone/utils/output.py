@@ -0,0 +1,107 @@
+import gzip
+import os
+from pathlib import Path
+from typing import Iterable, List, Sequence, Union
+
+# Write buffer for streamed output; large enough to batch many small chunks
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+# Precompressed variants written next to an output file, by file suffix
+PRECOMPRESS_FORMATS = ("gz", "br")
+
+
+def write_chunks(chunks: Iterable[str], output_path: Union[str, Path],
+                 buffer_size: int = DEFAULT_BUFFER_SIZE) -> int:
+    """
+    Write an iterable of text chunks to a file through a buffered handle.
+
+    Chunks are written as they are produced, so only the current chunk has to be
+    held in memory. The file is written next to its destination and moved into
+    place once complete, so a failed render never leaves a truncated document.
+
+    Args:
+        chunks: Text chunks to write in order (e.g. a template's iter_html)
+        output_path: Destination file path
+        buffer_size: Size of the write buffer in bytes
+
+    Returns:
+        Number of characters written
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f".{output_path.name}.tmp")
+
+    written = 0
+    try:
+        with open(temp_path, 'w', encoding='utf-8', buffering=buffer_size) as f:
+            for chunk in chunks:
+                written += f.write(chunk)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return written
+
+
+def brotli_available() -> bool:
+    """Whether the optional brotli module is installed."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _write_bytes(data: bytes, output_path: Path) -> None:
+    temp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        temp_path.write_bytes(data)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_precompressed(output_path: Union[str, Path],
+                        formats: Sequence[str] = PRECOMPRESS_FORMATS) -> List[Path]:
+    """
+    Write precompressed copies of a file for static servers.
+
+    ``page.html`` gets ``page.html.gz`` (gzip) and ``page.html.br`` (brotli,
+    skipped when the brotli module is not installed). Both use maximum
+    compression, and the gzip header carries no timestamp, so unchanged
+    output compresses to identical bytes.
+
+    Args:
+        output_path: File that has already been written
+        formats: Suffixes to write, from ``PRECOMPRESS_FORMATS``
+
+    Returns:
+        Paths of the compressed files that were written
+
+    Raises:
+        OSError: If a file cannot be read or written
+        ValueError: If a format is unknown
+    """
+    output_path = Path(output_path)
+    data = output_path.read_bytes()
+
+    written = []
+    for suffix in formats:
+        if suffix == "gz":
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        elif suffix == "br":
+            if not brotli_available():
+                continue
+            import brotli
+            compressed = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+        else:
+            raise ValueError(f"Unknown precompression format: {suffix}")
+        compressed_path = output_path.with_name(f"{output_path.name}.{suffix}")
+        _write_bytes(compressed, compressed_path)
+        written.append(compressed_path)
+    return written
@@ -0,0 +1,158 @@
+"""
+Chunked, parallel PDF rendering.
+
+WeasyPrint lays out a document on one core and keeps every page in memory
+until it is written. For very large sheets the caller renders groups of
+categories as separate HTML documents instead. render_pdf_chunks lays them
+out in a process pool (one warm PdfRenderer per worker) and appends their
+pages, in order, to one PDF with pypdf. Only the first chunk shows the page
+header. Peak memory is bounded by the largest chunk, and wall time scales
+with cores.
+
+With a time or memory limit, every chunk renders in its own supervised
+process instead (see utils.pdf_supervisor), and the limits apply per chunk.
+
+Each chunk starts on a new page. Documents that print page counters
+(``counter(page)``/``counter(pages)``) cannot be split without renumbering and
+are rendered in one pass by the caller (see can_render_in_chunks).
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .icon_sprite import expand_icon_sprite
+from .pdf_manifest import pdf_inputs_digest, pdf_is_current, record_pdf
+from .pdf_renderer import get_renderer
+from .pdf_size import PdfOptions, prune_unused_css
+from .pdf_supervisor import process_context, render_supervised
+
+# Keybinds per chunk document; smaller chunks lower peak memory but add page breaks
+PDF_CHUNK_KEYBINDS = 1500
+
+# Later chunks continue the first one, so they drop its page header
+CONTINUATION_STYLES = "header { display: none !important; }"
+
+# HTML, output path, base URL, offline, continuation, options, stylesheets
+_ChunkJob = Tuple[str, str, Optional[str], bool, bool, PdfOptions, Tuple[str, ...]]
+
+
+def merge_available() -> bool:
+    """Check whether pypdf is available to merge chunk PDFs."""
+    try:
+        import pypdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def can_render_in_chunks(html_content: str) -> bool:
+    """
+    Check whether a document may be split into independently rendered chunks.
+
+    Args:
+        html_content: HTML of the complete document (or its first chunk)
+
+    Returns:
+        True if pypdf is installed and the document prints no page counters
+    """
+    return merge_available() and "counter(page" not in html_content
+
+
+def _prepare_chunk(html_content: str, options: PdfOptions) -> str:
+    if options.prune_css:
+        html_content = prune_unused_css(html_content)
+    # WeasyPrint cannot resolve <use> references across inline SVGs
+    return expand_icon_sprite(html_content)
+
+
+def _render_chunk(job: _ChunkJob) -> str:
+    html_content, output_path, base_url, offline, continuation, options, stylesheets = job
+    stylesheets += (CONTINUATION_STYLES,) if continuation else ()
+    get_renderer().render(_prepare_chunk(html_content, options), output_path, base_url, stylesheets=stylesheets,
+                          offline=offline, options=options)
+    return output_path
+
+
+def _render_chunk_supervised(job: _ChunkJob, timeout: Optional[float], memory_limit_mb: Optional[int]) -> str:
+    html_content, output_path, base_url, offline, continuation, options, stylesheets = job
+    stylesheets += (CONTINUATION_STYLES,) if continuation else ()
+    render_supervised(_prepare_chunk(html_content, options), output_path, base_url, stylesheets=stylesheets,
+                      offline=offline, options=options, timeout=timeout, memory_limit_mb=memory_limit_mb)
+    return output_path
+
+
+def render_pdf_chunks(html_chunks: Sequence[str], output_path: Union[str, Path], base_url: Optional[str] = None,
+                      offline: bool = False, max_workers: Optional[int] = None, use_cache: bool = True,
+                      options: Optional[PdfOptions] = None, timeout: Optional[float] = None,
+                      memory_limit_mb: Optional[int] = None, stylesheets: Sequence[str] = ()) -> int:
+    """
+    Render chunk documents in parallel and merge them into one PDF.
+
+    Args:
+        html_chunks: Complete HTML documents, in page order
+        output_path: Path where the merged PDF should be saved
+        base_url: Base URL for resolving relative references
+        offline: Never access the network for remote URLs
+        max_workers: Maximum worker processes (defaults to the CPU count)
+        use_cache: Skip rendering if the existing PDF is up to date (see
+            utils.pdf_manifest)
+        options: Size options for every chunk (see utils.pdf_size)
+        timeout: Seconds each chunk may take to render. If None, no time limit.
+        memory_limit_mb: Memory each chunk may use, in megabytes (POSIX only).
+            If None, no memory limit.
+        stylesheets: Additional stylesheets for every chunk (see
+            PdfRenderer.render)
+
+    Returns:
+        Number of pages written (0 if the PDF was up to date)
+
+    Raises:
+        ImportError: If WeasyPrint or pypdf is not installed
+        PdfGenerationError: If a supervised chunk failed, timed out or ran out
+            of memory (see utils.pdf_supervisor)
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    options = options or PdfOptions()
+    inputs = pdf_inputs_digest(html_chunks, base_url, offline, [*stylesheets, CONTINUATION_STYLES], options)
+    if use_cache and pdf_is_current(output_path, inputs):
+        return 0
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    workers = min(len(html_chunks), max_workers or os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory(prefix="keystone-pdf-") as temp_dir:
+        jobs = [
+            (html, str(Path(temp_dir) / f"{index:04d}.pdf"), base_url, offline, index > 0, options, tuple(stylesheets))
+            for index, html in enumerate(html_chunks)
+        ]
+        if timeout is not None or memory_limit_mb is not None:
+            # Each chunk has its own supervised process; the threads only wait for them
+            render = partial(_render_chunk_supervised, timeout=timeout, memory_limit_mb=memory_limit_mb)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunk_paths: List[str] = list(executor.map(render, jobs))
+        elif workers <= 1:
+            chunk_paths = [_render_chunk(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=process_context()) as executor:
+                chunk_paths = list(executor.map(_render_chunk, jobs))
+
+        writer = PdfWriter()
+        for index, chunk_path in enumerate(chunk_paths):
+            reader = PdfReader(chunk_path)
+            if index == 0 and reader.metadata:
+                # Title and creator of the document as a whole
+                writer.add_metadata(reader.metadata)
+            # Keep each chunk's category bookmarks, in order
+            writer.append(reader, import_outline=True)
+
+        temp_path = output_path.with_name(f".{output_path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            writer.write(f)
+        temp_path.replace(output_path)
+        record_pdf(output_path, inputs)
+        return len(writer.pages)
@@ -1,38 +1,98 @@
-import sys
 from pathlib import Path
-from typing import Union
+from typing import Optional, Sequence, Union
 
+from .icon_sprite import expand_icon_sprite
+from .pdf_manifest import pdf_inputs_digest, pdf_is_current, record_pdf
+from .pdf_server import render_with_server
+from .pdf_renderer import PdfRenderer, get_renderer
+from .pdf_size import PdfOptions, format_size_report, pdf_size_report, prune_unused_css
+from .pdf_supervisor import INSTALL_MESSAGE, PdfDependencyError, PdfGenerationError, render_supervised
 
-def generate_pdf(html_content: str, output_path: Union[str, Path]) -> bool:
+
+def generate_pdf(html_content: str, output_path: Union[str, Path], base_url: Optional[str] = None,
+                 offline: bool = False, stylesheets: Sequence[str] = (),
+                 renderer: Optional[PdfRenderer] = None, use_cache: bool = True,
+                 options: Optional[PdfOptions] = None, report: bool = False,
+                 timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None) -> bool:
     """
     Generate a PDF from HTML content using WeasyPrint.
     
+    If a PDF server (``keystone pdf-server``) is running, the document is
+    rendered there with an already warm WeasyPrint; otherwise in-process with
+    a PdfRenderer, which keeps font configurations and parsed stylesheets for
+    later calls in the same process. Remote URLs are resolved through an AssetFetcher (cache first, limited
+    network time). If the PDF was already rendered from the same inputs and
+    not modified since, nothing is rendered (see utils.pdf_manifest).
+    
+    With a ``timeout`` or ``memory_limit_mb``, the PDF is rendered in a
+    supervised worker process instead (see utils.pdf_supervisor), by the server
+    if one is running. Workers stay warm between renders.
+    
     Args:
         html_content: The HTML content to convert to PDF
         output_path: Path where the PDF should be saved
+        base_url: Base URL for resolving relative references (e.g. sidecar fonts)
+        offline: Never access the network for remote URLs
+        stylesheets: Additional stylesheets, parsed once per process (see
+            PdfRenderer.render)
+        renderer: Renderer to use in-process. Defaults to the shared
+            renderer from get_renderer(). Ignored when rendering is supervised.
+        use_cache: Skip rendering if the existing PDF is up to date
+        options: Size options (font subsetting, compression, images, CSS
+            pruning; see utils.pdf_size)
+        report: Print the size of the PDF by fonts, content streams and images
+        timeout: Seconds rendering may take. If None, no time limit.
+        memory_limit_mb: Memory rendering may use, in megabytes (POSIX only).
+            If None, no memory limit.
         
     Returns:
-        True if PDF was generated successfully, False if WeasyPrint is not available
+        True if the PDF was generated (or was up to date)
         
     Raises:
-        SystemExit: If WeasyPrint is not installed (with error code 1)
+        PdfDependencyError: If WeasyPrint is not installed
+        PdfTimeoutError: If rendering took longer than ``timeout``
+        PdfMemoryError: If rendering exceeded ``memory_limit_mb``
+        PdfGenerationError: If rendering failed for any other reason
     """
-    try:
-        import weasyprint
-    except ImportError:
-        print("Error: PDF generation requires weasyprint. Install with:", file=sys.stderr)
-        print("uv pip install keystone[pdf]", file=sys.stderr)
-        sys.exit(1)
+    options = options or PdfOptions()
+    inputs = pdf_inputs_digest(html_content, base_url, offline, stylesheets, options)
+    if use_cache and pdf_is_current(output_path, inputs):
+        if report:
+            print(format_size_report(pdf_size_report(output_path)))
+        return True
+    if options.prune_css:
+        html_content = prune_unused_css(html_content)
     
+    # Ensure output directory exists
+    output_path = Path(output_path)
     try:
-        # Ensure output directory exists
-        output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Generate PDF using WeasyPrint
-        weasyprint.HTML(string=html_content).write_pdf(str(output_path))
-        return True
-        
-    except Exception as e:
-        print(f"Error generating PDF: {e}", file=sys.stderr)
-        sys.exit(1)
+    except OSError as e:
+        raise PdfGenerationError(f"Cannot create {output_path.parent}: {e}") from e
+    
+    # WeasyPrint cannot resolve <use> references across inline SVGs
+    html_content = expand_icon_sprite(html_content)
+    
+    rendered = render_with_server(html_content, output_path, base_url, offline=offline, stylesheets=stylesheets,
+                                  options=options, timeout=timeout, memory_limit_mb=memory_limit_mb)
+    if rendered:
+        pass
+    elif timeout is not None or memory_limit_mb is not None:
+        render_supervised(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                          options=options, timeout=timeout, memory_limit_mb=memory_limit_mb)
+    else:
+        try:
+            if renderer is None:
+                renderer = get_renderer()
+        except ImportError as e:
+            raise PdfDependencyError(INSTALL_MESSAGE) from e
+        try:
+            renderer.render(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                            options=options)
+        except Exception as e:
+            raise PdfGenerationError(str(e)) from e
+    
+    record_pdf(output_path, inputs)
+    if report:
+        print(format_size_report(pdf_size_report(output_path)))
+    return True
@@ -0,0 +1,114 @@
+"""
+Build manifest for generated PDFs.
+
+Rendering a PDF is by far the slowest stage of a build. After each render,
+the hash of its inputs (the HTML, the WeasyPrint version and the render
+options) is stored in a small manifest entry in Keystone's cache, together
+with the size and modification time of the PDF written. A later build with
+the same inputs finds the PDF untouched and skips WeasyPrint entirely.
+
+Sidecar fonts are referenced by content hash, so they are covered by the HTML.
+Remote assets are not: clear the entry (or pass ``--no-cache``) after
+changing an asset behind an unchanged URL.
+"""
+import hashlib
+import json
+import sys
+from dataclasses import asdict
+from importlib import metadata
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+from .. import __version__
+from .cache import get_cache_dir
+from .pdf_size import PdfOptions
+
+
+def weasyprint_version() -> Optional[str]:
+    """
+    Get the installed WeasyPrint version without importing it.
+
+    Returns:
+        Version string, or None if WeasyPrint is not installed
+    """
+    try:
+        return metadata.version("weasyprint")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def pdf_inputs_digest(html_content: Union[str, Sequence[str]], base_url: Optional[str] = None,
+                      offline: bool = False, stylesheets: Sequence[str] = (),
+                      options: Optional[PdfOptions] = None) -> Optional[str]:
+    """
+    Hash everything a PDF render depends on.
+
+    Args:
+        html_content: HTML document, or the chunk documents of a merged PDF
+        base_url: Base URL for resolving relative references
+        offline: Whether remote URLs are resolved from the cache only
+        stylesheets: Additional stylesheets passed to the renderer
+        options: Size options of the render
+
+    Returns:
+        Hex digest of the inputs, or None if WeasyPrint is not installed
+    """
+    version = weasyprint_version()
+    if version is None:
+        return None
+    chunks = [html_content] if isinstance(html_content, str) else list(html_content)
+    header = json.dumps([__version__, version, base_url, offline, list(stylesheets),
+                         asdict(options or PdfOptions()), len(chunks)], separators=(',', ':'))
+    digest = hashlib.sha256(header.encode('utf-8'))
+    for chunk in chunks:
+        encoded = chunk.encode('utf-8')
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _manifest_path(output_path: Union[str, Path]) -> Path:
+    key = hashlib.sha256(str(Path(output_path).resolve()).encode('utf-8')).hexdigest()
+    return get_cache_dir("pdf") / f"{key}.json"
+
+
+def pdf_is_current(output_path: Union[str, Path], inputs: Optional[str]) -> bool:
+    """
+    Check whether a PDF was rendered from the given inputs and left untouched.
+
+    Args:
+        output_path: Path of the PDF
+        inputs: Result of pdf_inputs_digest
+
+    Returns:
+        True if rendering again would produce the same file
+    """
+    if inputs is None:
+        return False
+    try:
+        stat = Path(output_path).stat()
+        entry = json.loads(_manifest_path(output_path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return False
+    return entry == {"inputs": inputs, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def record_pdf(output_path: Union[str, Path], inputs: Optional[str]) -> None:
+    """
+    Remember the inputs of a freshly rendered PDF.
+
+    Args:
+        output_path: Path of the PDF just written
+        inputs: Result of pdf_inputs_digest
+    """
+    if inputs is None:
+        return
+    try:
+        stat = Path(output_path).stat()
+        manifest_path = _manifest_path(output_path)
+        temp_path = manifest_path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps({"inputs": inputs, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}),
+                             encoding='utf-8')
+        temp_path.replace(manifest_path)
+    except OSError as e:
+        print(f"Warning: Could not record PDF inputs for {output_path}: {e}", file=sys.stderr)
@@ -0,0 +1,163 @@
+"""
+Reusable WeasyPrint renderer.
+
+Each WeasyPrint render normally starts from scratch: a new Fontconfig
+configuration (scanning the system fonts, registering every ``@font-face``)
+and freshly parsed stylesheets. PdfRenderer keeps both between renders in one
+process, so batch builds, the Python API and the PDF server only pay for them
+once per distinct font set and stylesheet.
+
+Font configurations are shared between documents with identical
+``@font-face`` rules only: documents embed different subsets of the same
+family, and a shared configuration would pick the wrong subset.
+"""
+import hashlib
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from .pdf_size import PdfOptions
+from .url_fetcher import AssetFetcher, weasyprint_url_fetcher
+
+# Font configurations kept alive, one per distinct set of @font-face rules
+FONT_CONFIG_CACHE_SIZE = 8
+
+# Parsed stylesheets kept alive
+STYLESHEET_CACHE_SIZE = 32
+
+_FONT_FACE = re.compile(r"@font-face\s*\{[^}]*\}", re.I)
+
+
+def font_faces_digest(html_content: str) -> str:
+    """
+    Hash the ``@font-face`` rules of a document.
+
+    Args:
+        html_content: HTML document
+
+    Returns:
+        Hex digest of the document's @font-face rules
+    """
+    faces = "\n".join(_FONT_FACE.findall(html_content))
+    return hashlib.sha256(faces.encode("utf-8")).hexdigest()
+
+
+def _remember(cache: "OrderedDict[Any, Any]", key: Any, value: Any, size: int) -> Any:
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+    return value
+
+
+class PdfRenderer:
+    """WeasyPrint renderer reusing font configurations and parsed stylesheets."""
+
+    def __init__(self, offline: bool = False):
+        """
+        Import WeasyPrint and create an empty renderer.
+
+        Args:
+            offline: Default for render(): never access the network for remote URLs
+
+        Raises:
+            ImportError: If WeasyPrint is not installed
+        """
+        import weasyprint
+        from weasyprint.text.fonts import FontConfiguration
+        self._weasyprint = weasyprint
+        self._font_configuration = FontConfiguration
+        self.offline = offline
+        self._font_configs: "OrderedDict[str, Any]" = OrderedDict()
+        self._stylesheets: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def font_config(self, digest: str) -> Any:
+        """
+        Get the font configuration for a set of @font-face rules.
+
+        Args:
+            digest: Result of font_faces_digest
+
+        Returns:
+            Cached or new weasyprint FontConfiguration
+        """
+        if digest in self._font_configs:
+            self._font_configs.move_to_end(digest)
+            return self._font_configs[digest]
+        return _remember(self._font_configs, digest, self._font_configuration(), FONT_CONFIG_CACHE_SIZE)
+
+    def stylesheet(self, css: str, digest: str = "") -> Any:
+        """
+        Get a parsed stylesheet.
+
+        Stylesheets without ``@font-face`` rules do not depend on the font
+        set, so they are parsed once for all documents.
+
+        Args:
+            css: Stylesheet text
+            digest: Font set (font_faces_digest) of the documents it is used with
+
+        Returns:
+            Cached or newly parsed weasyprint.CSS
+        """
+        if not _FONT_FACE.search(css):
+            digest = font_faces_digest("")
+        key = (digest, hashlib.sha256(css.encode("utf-8")).hexdigest())
+        if key in self._stylesheets:
+            self._stylesheets.move_to_end(key)
+            return self._stylesheets[key]
+        parsed = self._weasyprint.CSS(
+            string=css, font_config=self.font_config(digest),
+            url_fetcher=weasyprint_url_fetcher(AssetFetcher(offline=self.offline)),
+        )
+        return _remember(self._stylesheets, key, parsed, STYLESHEET_CACHE_SIZE)
+
+    def warm_up(self) -> None:
+        """Build the font configuration for documents without @font-face rules."""
+        self.font_config(font_faces_digest(""))
+
+    def render(self, html_content: str, output_path: Union[str, Path], base_url: Optional[str] = None,
+               stylesheets: Sequence[str] = (), offline: Optional[bool] = None,
+               options: Optional[PdfOptions] = None) -> None:
+        """
+        Render a PDF.
+
+        Args:
+            html_content: HTML document (icon sprite already expanded)
+            output_path: Path where the PDF should be saved
+            base_url: Base URL for resolving relative references
+            stylesheets: Additional stylesheets, applied as user stylesheets
+                (below the document's own rules unless ``!important``)
+            offline: Never access the network for remote URLs. Defaults to
+                the renderer's setting.
+            options: Size options (font subsetting, compression, images)
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        digest = font_faces_digest(html_content)
+        url_fetcher = weasyprint_url_fetcher(AssetFetcher(offline=self.offline if offline is None else offline))
+        self._weasyprint.HTML(string=html_content, base_url=base_url, url_fetcher=url_fetcher).write_pdf(
+            str(output_path),
+            stylesheets=[self.stylesheet(css, digest) for css in stylesheets],
+            font_config=self.font_config(digest),
+            **(options or PdfOptions()).write_pdf_options(),
+        )
+
+
+_default_renderer: Optional[PdfRenderer] = None
+
+
+def get_renderer() -> PdfRenderer:
+    """
+    Get the renderer shared by generate_pdf calls in this process.
+
+    Returns:
+        The process-wide PdfRenderer
+
+    Raises:
+        ImportError: If WeasyPrint is not installed
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = PdfRenderer()
+    return _default_renderer
@@ -0,0 +1,300 @@
+"""
+Persistent PDF render server.
+
+Importing WeasyPrint and building its font configuration takes about a second
+before any layout happens. ``keystone pdf-server`` pays that once: it keeps
+one PdfRenderer (WeasyPrint imported, font configurations and parsed
+stylesheets cached) and renders PDFs sent to it over a local Unix socket.
+generate_pdf hands documents to the server automatically when one is running,
+and renders in-process otherwise.
+
+Each connection carries one request: a JSON line with ``html``, ``output``
+(absolute path), ``base_url`` (absolute when it is a path), ``stylesheets``, ``offline``, ``options``
+(PdfOptions fields), ``timeout`` and ``memory_limit_mb``, answered by a
+JSON line ``{"ok": true}`` or ``{"ok": false, "error": "...", "limit": ...}``
+(``limit`` is ``"timeout"`` or ``"memory"`` when a limit stopped the render).
+
+Requests with a time or memory limit are rendered by the server in a
+supervised worker process (see utils.pdf_supervisor), so the server itself
+stops a render that runs past its limits and is free for the next request.
+The worker outlives the request and keeps its renderer warm for the next one.
+"""
+import json
+import os
+import socket
+import socketserver
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+from .cache import get_cache_dir
+from .pdf_renderer import PdfRenderer
+from .pdf_size import PdfOptions
+from .pdf_supervisor import PdfGenerationError, PdfMemoryError, PdfTimeoutError, render_supervised
+
+# Overrides the socket location (e.g. when the cache path is too long for AF_UNIX)
+SOCKET_ENV = "KEYSTONE_PDF_SOCKET"
+
+# Seconds to wait for a connection before rendering in-process
+CONNECT_TIMEOUT = 0.5
+
+# Extra seconds the client waits for the server to report its own timeout
+TIMEOUT_MARGIN = 10
+
+
+class PdfServerError(PdfGenerationError):
+    """Raised when the PDF server fails to render a document."""
+
+
+def default_socket_path() -> Path:
+    """
+    Get the socket path shared by the server and generate_pdf.
+
+    Returns:
+        ``KEYSTONE_PDF_SOCKET`` if set, otherwise ``pdf-server.sock`` in
+        Keystone's cache directory
+    """
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    return get_cache_dir() / "pdf-server.sock"
+
+
+def _absolute_base_url(base_url: Optional[str]) -> Optional[str]:
+    # The server resolves relative paths against its own working directory, not the client's
+    if base_url is None or len(urlparse(base_url).scheme) > 1:
+        return base_url
+    return str(Path(base_url).absolute())
+
+
+def render_with_server(html_content: str, output_path: Union[str, Path], base_url: Optional[str] = None,
+                       socket_path: Optional[Union[str, Path]] = None, offline: bool = False,
+                       stylesheets: Sequence[str] = (), options: Optional[PdfOptions] = None,
+                       timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None) -> bool:
+    """
+    Render a PDF with a running PDF server.
+
+    Args:
+        html_content: HTML document (icon sprite already expanded)
+        output_path: Path where the PDF should be saved
+        base_url: Base URL for resolving relative references
+        socket_path: Server socket. Defaults to default_socket_path().
+        offline: Never access the network for remote URLs
+        stylesheets: Additional stylesheets (see PdfRenderer.render)
+        options: Size options (see PdfRenderer.render)
+        timeout: Seconds rendering may take. If None, no time limit.
+        memory_limit_mb: Memory rendering may use, in megabytes. If None, no
+            memory limit.
+
+    Returns:
+        True if the server rendered the PDF, False if no server is running
+
+    Raises:
+        PdfTimeoutError: If rendering took longer than ``timeout``
+        PdfMemoryError: If rendering exceeded ``memory_limit_mb``
+        PdfServerError: If the server is running but rendering failed
+    """
+    path = Path(socket_path) if socket_path is not None else default_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return False
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(str(path))
+        except OSError:
+            # Stale socket file or unreachable server
+            return False
+        # The server enforces the limits; this only guards against a server that stopped responding
+        client.settimeout(None if timeout is None else timeout + TIMEOUT_MARGIN)
+
+        request = {
+            "html": html_content, "output": str(Path(output_path).absolute()),
+            "base_url": _absolute_base_url(base_url), "offline": offline, "stylesheets": list(stylesheets),
+            "options": asdict(options or PdfOptions()), "timeout": timeout, "memory_limit_mb": memory_limit_mb,
+        }
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            response_line = stream.readline()
+    except socket.timeout:
+        raise PdfTimeoutError(f"PDF server did not finish rendering within {timeout:g}s")
+    except OSError as e:
+        raise PdfServerError(f"Lost connection to PDF server: {e}")
+    finally:
+        client.close()
+
+    if not response_line:
+        raise PdfServerError("PDF server closed the connection without a response")
+    response = json.loads(response_line)
+    if not response.get("ok"):
+        error = response.get("error", "unknown error")
+        if response.get("limit") == "timeout":
+            raise PdfTimeoutError(error)
+        if response.get("limit") == "memory":
+            raise PdfMemoryError(error)
+        raise PdfServerError(error)
+    return True
+
+
+def server_running(socket_path: Union[str, Path]) -> bool:
+    """
+    Check whether a PDF server is accepting connections.
+
+    Args:
+        socket_path: Server socket
+
+    Returns:
+        True if a connection could be made
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        client.close()
+
+
+class _RenderHandler(socketserver.StreamRequestHandler):
+    """Handle one render request."""
+
+    server: "PdfServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # Connection probe (server_running)
+            return
+        try:
+            request = json.loads(line)
+            self.server.render(request["html"], Path(request["output"]), request.get("base_url"),
+                               bool(request.get("offline")), request.get("stylesheets", ()),
+                               PdfOptions(**request.get("options", {})), request.get("timeout"),
+                               request.get("memory_limit_mb"))
+            response: Dict[str, Any] = {"ok": True}
+        except PdfTimeoutError as e:
+            response = {"ok": False, "error": str(e), "limit": "timeout"}
+        except PdfMemoryError as e:
+            response = {"ok": False, "error": str(e), "limit": "memory"}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class PdfServer(socketserver.UnixStreamServer):
+    """Unix socket server rendering PDFs one at a time with a warm WeasyPrint."""
+
+    def __init__(self, socket_path: Optional[Union[str, Path]] = None):
+        """
+        Bind the server socket.
+
+        Args:
+            socket_path: Socket to listen on. Defaults to default_socket_path().
+
+        Raises:
+            OSError: If another server is already listening on the socket
+        """
+        self.socket_path = Path(socket_path) if socket_path is not None else default_socket_path()
+        self.renderer: Optional[PdfRenderer] = None
+
+        if self.socket_path.exists():
+            if server_running(self.socket_path):
+                raise OSError(f"A PDF server is already listening on {self.socket_path}")
+            # Left behind by a server that did not shut down cleanly
+            self.socket_path.unlink()
+
+        # The socket accepts file writes on our behalf: keep it private to this user
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.socket_path), _RenderHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def warm_up(self) -> None:
+        """
+        Create the renderer: import WeasyPrint and build the default font configuration.
+
+        Raises:
+            ImportError: If WeasyPrint is not installed
+        """
+        self.renderer = PdfRenderer()
+        self.renderer.warm_up()
+
+    def render(self, html_content: str, output_path: Path, base_url: Optional[str], offline: bool = False,
+               stylesheets: Sequence[str] = (), options: Optional[PdfOptions] = None,
+               timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None) -> None:
+        """
+        Render one PDF.
+
+        With a time or memory limit, the PDF is rendered by a long-lived
+        supervised worker (with its own warm renderer) instead of by the
+        server's renderer.
+
+        Args:
+            html_content: HTML document
+            output_path: Absolute path where the PDF should be saved
+            base_url: Base URL for resolving relative references
+            offline: Never access the network for remote URLs
+            stylesheets: Additional stylesheets (see PdfRenderer.render)
+            options: Size options (see PdfRenderer.render)
+            timeout: Seconds rendering may take. If None, no time limit.
+            memory_limit_mb: Memory rendering may use, in megabytes. If None,
+                no memory limit.
+        """
+        if timeout is not None or memory_limit_mb is not None:
+            render_supervised(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                              options=options, timeout=timeout, memory_limit_mb=memory_limit_mb)
+        else:
+            if self.renderer is None:
+                self.warm_up()
+            assert self.renderer is not None
+            self.renderer.render(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                                 options=options)
+        print(f"Rendered {output_path}")
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def serve(socket_path: Optional[Union[str, Path]] = None) -> int:
+    """
+    Run the PDF server in the foreground until interrupted.
+
+    Args:
+        socket_path: Socket to listen on. Defaults to default_socket_path().
+
+    Returns:
+        Exit code
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: The PDF server requires Unix domain sockets.", file=sys.stderr)
+        return 1
+    try:
+        server = PdfServer(socket_path)
+    except OSError as e:
+        print(f"Error: Could not start PDF server: {e}", file=sys.stderr)
+        return 1
+
+    with server:
+        try:
+            server.warm_up()
+        except ImportError:
+            print("Error: PDF generation requires weasyprint. Install with:", file=sys.stderr)
+            print("uv pip install keystone[pdf]", file=sys.stderr)
+            return 1
+        print(f"PDF server listening on {server.socket_path} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nPDF server stopped")
+    return 0
@@ -0,0 +1,255 @@
+"""
+PDF size options and size report.
+
+PdfOptions collects the settings that trade PDF size against fidelity: font
+subsetting, stream compression, image recompression and pruning the
+document's CSS before rendering. prune_unused_css drops style rules whose
+selectors name classes or ids the document does not contain, and
+``@font-face`` rules of families no remaining rule uses. WeasyPrint then
+parses less CSS and loads fewer fonts.
+
+pdf_size_report breaks a written PDF down into bytes of embedded fonts,
+page content streams, images and everything else, so size regressions are
+visible after each build.
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+
+@dataclass(frozen=True)
+class PdfOptions:
+    """Size-related PDF render options."""
+
+    # Embed only the glyphs the document uses (WeasyPrint's default)
+    subset_fonts: bool = True
+    # Compress streams; pydyf, WeasyPrint's PDF writer, picks the deflate level itself
+    # and offers no setting for it, so this is on/off. Off is for debugging.
+    compress: bool = True
+    # JPEG quality (0-95) for recompressed images; None keeps images as they are
+    jpeg_quality: Optional[int] = None
+    # Downscale images to this resolution; None keeps their size
+    dpi: Optional[int] = None
+    # Drop CSS rules and fonts the document does not use before rendering
+    prune_css: bool = False
+
+    def write_pdf_options(self) -> Dict[str, Any]:
+        """
+        Translate the options into keyword arguments of ``write_pdf``.
+
+        Returns:
+            WeasyPrint render options
+        """
+        options: Dict[str, Any] = {
+            "full_fonts": not self.subset_fonts,
+            "uncompressed_pdf": not self.compress,
+        }
+        if self.jpeg_quality is not None or self.dpi is not None:
+            options["optimize_images"] = True
+        if self.jpeg_quality is not None:
+            options["jpeg_quality"] = self.jpeg_quality
+        if self.dpi is not None:
+            options["dpi"] = self.dpi
+        return options
+
+
+_STYLE_BLOCK = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.S | re.I)
+_CLASS_ATTRIBUTE = re.compile(r'\sclass="([^"]*)"')
+_ID_ATTRIBUTE = re.compile(r'\sid="([^"]*)"')
+_STYLE_ATTRIBUTE = re.compile(r'\sstyle="([^"]*)"')
+_CLASS_SELECTOR = re.compile(r'\.((?:\\.|[\w-])+)')
+_ID_SELECTOR = re.compile(r'#((?:\\.|[\w-])+)')
+_CSS_TOKEN = re.compile(r'["\'{};]|/\*')
+_FONT_DECLARATION = re.compile(r"font(?:-family)?\s*:([^;}]*)", re.I)
+_FONT_FACE_FAMILY = re.compile(r"font-family\s*:\s*['\"]?([^;'\"}]+)", re.I)
+
+# At-rules whose block holds style rules that can be pruned
+_GROUPING_RULES = ("@media", "@supports")
+
+
+def _unescape(name: str) -> str:
+    return re.sub(r"\\(.)", r"\1", name)
+
+
+def _split_rules(css: str) -> List[Tuple[str, Optional[str]]]:
+    """Split a stylesheet into top-level (prelude, block) pairs; statements have no block."""
+    rules: List[Tuple[str, Optional[str]]] = []
+    depth = start = prelude_end = 0
+    position = 0
+    while True:
+        match = _CSS_TOKEN.search(css, position)
+        if match is None:
+            break
+        token, position = match.group(), match.end()
+        if token == "/*":
+            end = css.find("*/", position)
+            position = len(css) if end < 0 else end + 2
+        elif token in "\"'":
+            # Skip the string, honouring backslash escapes
+            while position < len(css) and css[position] != token:
+                position += 2 if css[position] == "\\" else 1
+            position += 1
+        elif token == "{":
+            if depth == 0:
+                prelude_end = match.start()
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:prelude_end].strip(), css[prelude_end + 1:match.start()]))
+                start = position
+        elif depth == 0:
+            rules.append((css[start:position].strip(), None))
+            start = position
+    return rules
+
+
+def _may_match(selectors: str, classes: Set[str], ids: Set[str]) -> bool:
+    if "[" in selectors or "(" in selectors:
+        # Attribute selectors and functional pseudo-classes are kept as they are
+        return True
+    return any(
+        all(_unescape(name) in classes for name in _CLASS_SELECTOR.findall(selector))
+        and all(_unescape(name) in ids for name in _ID_SELECTOR.findall(selector))
+        for selector in selectors.split(",")
+    )
+
+
+def _prune_rules(css: str, classes: Set[str], ids: Set[str]) -> List[Tuple[str, Optional[str]]]:
+    kept: List[Tuple[str, Optional[str]]] = []
+    for prelude, block in _split_rules(css):
+        if block is None or prelude.lower().startswith("@font-face"):
+            kept.append((prelude, block))
+        elif prelude.lower().startswith(_GROUPING_RULES):
+            inner = _join_rules(_prune_rules(block, classes, ids))
+            if inner:
+                kept.append((prelude, inner))
+        elif prelude.startswith("@") or _may_match(prelude, classes, ids):
+            kept.append((prelude, block))
+    return kept
+
+
+def _join_rules(rules: List[Tuple[str, Optional[str]]]) -> str:
+    return "".join(prelude if block is None else f"{prelude}{{{block}}}" for prelude, block in rules)
+
+
+def prune_unused_css(html_content: str) -> str:
+    """
+    Remove CSS rules and fonts a static document cannot use.
+
+    A style rule is dropped when it names a class or id that appears nowhere
+    in the document. Selector lists are kept whole, and selectors with
+    attribute or functional pseudo-class parts are always kept. An
+    ``@font-face`` rule is dropped when no remaining rule or inline style
+    mentions its family. Only use this on documents that are not scripted
+    (such as documents about to be rendered to PDF).
+
+    Args:
+        html_content: HTML document
+
+    Returns:
+        HTML document with pruned ``<style>`` elements
+    """
+    classes = {name for value in _CLASS_ATTRIBUTE.findall(html_content) for name in value.split()}
+    ids = set(_ID_ATTRIBUTE.findall(html_content))
+    styles = [(match, _prune_rules(match.group(2), classes, ids)) for match in _STYLE_BLOCK.finditer(html_content)]
+
+    # Font families still referenced by rules or inline styles
+    font_values = _STYLE_ATTRIBUTE.findall(html_content)
+    for _, rules in styles:
+        for prelude, block in rules:
+            if block is not None and not prelude.lower().startswith("@font-face"):
+                font_values.extend(_FONT_DECLARATION.findall(block))
+    used_fonts = " ".join(font_values).lower()
+
+    def keep_font(rule: Tuple[str, Optional[str]]) -> bool:
+        prelude, block = rule
+        if block is None or not prelude.lower().startswith("@font-face"):
+            return True
+        family = _FONT_FACE_FAMILY.search(block)
+        return family is None or family.group(1).strip().lower() in used_fonts
+
+    pieces = []
+    position = 0
+    for match, rules in styles:
+        pieces.append(html_content[position:match.start(2)])
+        pieces.append(_join_rules([rule for rule in rules if keep_font(rule)]))
+        position = match.end(2)
+    pieces.append(html_content[position:])
+    return "".join(pieces)
+
+
+_STREAM_OBJECT = re.compile(rb"\d+\s+\d+\s+obj\s*(<<.*?>>)\s*stream\r?\n", re.S)
+_DIRECT_LENGTH = re.compile(rb"/Length\s+(\d+)\b(?!\s+\d+\s+R)")
+_FONT_STREAM = re.compile(rb"/Length[123]\b|/Subtype\s*/(?:Type1C|CIDFontType0C|OpenType)\b")
+_IMAGE_STREAM = re.compile(rb"/Subtype\s*/Image\b")
+_STRUCTURE_STREAM = re.compile(rb"/Type\s*/(?:ObjStm|XRef|Metadata)\b")
+
+
+def pdf_size_report(pdf_path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Break a PDF file down into bytes per kind of content.
+
+    Args:
+        pdf_path: Path of the PDF
+
+    Returns:
+        Dictionary with ``total``, ``fonts`` (embedded font programs),
+        ``content`` (page and form content streams), ``images`` and
+        ``other`` (object structure, metadata, cross-reference data)
+    """
+    data = Path(pdf_path).read_bytes()
+    report = {"total": len(data), "fonts": 0, "content": 0, "images": 0, "other": 0}
+    position = 0
+    while True:
+        match = _STREAM_OBJECT.search(data, position)
+        if match is None:
+            break
+        dictionary = match.group(1)
+        length = _DIRECT_LENGTH.search(dictionary)
+        if length is not None:
+            size = int(length.group(1))
+        else:
+            end = data.find(b"endstream", match.end())
+            size = (len(data) if end < 0 else end) - match.end()
+        if _FONT_STREAM.search(dictionary):
+            report["fonts"] += size
+        elif _IMAGE_STREAM.search(dictionary):
+            report["images"] += size
+        elif not _STRUCTURE_STREAM.search(dictionary):
+            report["content"] += size
+        position = match.end() + size
+    report["other"] = report["total"] - report["fonts"] - report["content"] - report["images"]
+    return report
+
+
+def format_size(size: int) -> str:
+    """
+    Format a byte count for display.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        Size such as ``"812 B"``, ``"14.2 KB"`` or ``"3.1 MB"``
+    """
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_size_report(report: Dict[str, int]) -> str:
+    """
+    Format a size report as one line.
+
+    Args:
+        report: Result of pdf_size_report
+
+    Returns:
+        Line such as ``"PDF size: 96.3 KB (fonts 61.0 KB, content 28.4 KB, images 0 B, other 6.9 KB)"``
+    """
+    parts = ", ".join(f"{kind} {format_size(report[kind])}" for kind in ("fonts", "content", "images", "other"))
+    return f"PDF size: {format_size(report['total'])} ({parts})"
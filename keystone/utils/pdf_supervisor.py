@@ -0,0 +1,256 @@
+"""
+Supervised PDF rendering.
+
+WeasyPrint renders whatever it is given: a pathological stylesheet or a
+document referencing a stalled server can keep it busy, and growing, for as
+long as it likes. render_supervised runs the render in a worker process with
+a wall-clock timeout and, where the platform supports it, a cap on the
+worker's address space. Every way the worker can fail becomes a
+PdfGenerationError subclass, so callers never block past the timeout and
+batch builds carry on with their other targets.
+
+Workers are long-lived: each keeps one renderer (see utils.pdf_renderer), so
+its font configurations and parsed stylesheets serve every later render. A
+worker is only replaced after it was stopped by a limit or died.
+
+Children are never forked from the calling process, which may be running
+other threads (a fork could copy a lock another thread holds and deadlock).
+On POSIX they come from a forkserver: a single-threaded process that imports
+WeasyPrint once, so starting a worker costs milliseconds rather than a
+second. Elsewhere they are spawned.
+"""
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+from .pdf_renderer import get_renderer
+from .pdf_size import PdfOptions
+
+# Shown when WeasyPrint is missing
+INSTALL_MESSAGE = "PDF generation requires weasyprint. Install with: uv pip install keystone[pdf]"
+
+# Imported once by the forkserver, before it starts any child
+FORKSERVER_PRELOAD = ["keystone.utils.pdf_supervisor", "weasyprint"]
+
+# Idle workers kept for later renders
+MAX_IDLE_WORKERS = os.cpu_count() or 1
+
+_idle_workers: List["SupervisedWorker"] = []
+_idle_lock = threading.Lock()
+
+
+class PdfGenerationError(Exception):
+    """Raised when a PDF cannot be generated."""
+
+
+class PdfDependencyError(PdfGenerationError):
+    """Raised when WeasyPrint is not installed."""
+
+
+class PdfTimeoutError(PdfGenerationError):
+    """Raised when rendering a PDF takes longer than its time limit."""
+
+
+class PdfMemoryError(PdfGenerationError):
+    """Raised when rendering a PDF needs more memory than its limit."""
+
+
+def process_context() -> Union[multiprocessing.context.ForkServerContext, multiprocessing.context.SpawnContext]:
+    """
+    Get the start method for PDF render processes.
+
+    Returns:
+        A forkserver context preloading WeasyPrint where available,
+        otherwise a spawn context
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Only takes effect before the server's first start
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _limit_memory(limit_mb: int) -> None:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows: the timeout still applies
+        return
+    limit = limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _serve_renders(connection: Connection, renderer_factory: Callable[[], Any],
+                   memory_limit_mb: Optional[int]) -> None:
+    if memory_limit_mb:
+        _limit_memory(memory_limit_mb)
+    renderer = None
+    while True:
+        try:
+            html_content, output_path, base_url, stylesheets, offline, options = connection.recv()
+        except EOFError:
+            # The parent closed the connection or exited
+            return
+        try:
+            if renderer is None:
+                renderer = renderer_factory()
+            renderer.render(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                            options=options)
+            result = None
+        except MemoryError:
+            result = ("memory", "")
+        except ImportError:
+            result = ("dependency", INSTALL_MESSAGE)
+        except Exception as e:
+            result = ("error", str(e) or type(e).__name__)
+        connection.send(result)
+        if result is not None and result[0] == "memory":
+            # The renderer may be left half-updated: let the parent start a new worker
+            return
+
+
+class SupervisedWorker:
+    """Long-lived child process rendering PDFs one at a time with a warm renderer."""
+
+    def __init__(self, renderer_factory: Callable[[], Any], memory_limit_mb: Optional[int] = None):
+        """
+        Start the worker process.
+
+        Args:
+            renderer_factory: Creates the renderer in the child (called once)
+            memory_limit_mb: Address space limit of the child in megabytes
+                (POSIX only). If None, no memory limit.
+        """
+        self.renderer_factory = renderer_factory
+        self.memory_limit_mb = memory_limit_mb
+        context = process_context()
+        self._connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_serve_renders, daemon=True,
+                                       args=(child_connection, renderer_factory, memory_limit_mb))
+        self.process.start()
+        child_connection.close()
+
+    def is_alive(self) -> bool:
+        """Check whether the worker can take another render."""
+        return not self._connection.closed and self.process.is_alive()
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self._connection.close()
+
+    def render(self, html_content: str, output_path: Union[str, Path], base_url: Optional[str] = None,
+               stylesheets: Sequence[str] = (), offline: bool = False, options: Optional[PdfOptions] = None,
+               timeout: Optional[float] = None) -> None:
+        """
+        Render a PDF in the worker under a time limit.
+
+        A render that hits a limit or kills the worker also stops the worker;
+        other failures leave it ready for the next render.
+
+        Args:
+            html_content: HTML document (icon sprite already expanded)
+            output_path: Path where the PDF should be saved
+            base_url: Base URL for resolving relative references
+            stylesheets: Additional stylesheets (see PdfRenderer.render)
+            offline: Never access the network for remote URLs
+            options: Size options (see PdfRenderer.render)
+            timeout: Seconds before the worker is killed. If None, no time limit.
+
+        Raises:
+            PdfDependencyError: If WeasyPrint is not installed
+            PdfTimeoutError: If rendering took longer than ``timeout``
+            PdfMemoryError: If rendering exceeded the worker's memory limit
+            PdfGenerationError: If rendering failed for any other reason
+        """
+        try:
+            self._connection.send((html_content, str(output_path), base_url, list(stylesheets), offline,
+                                   options or PdfOptions()))
+            if not self._connection.poll(timeout):
+                self.close()
+                raise PdfTimeoutError(f"PDF rendering timed out after {timeout:g}s")
+            result = self._connection.recv()
+        except (EOFError, OSError):
+            # The worker died before reporting: collect its exit code
+            self.process.join(1)
+            result = ("exit", "")
+        if result is None:
+            return
+
+        kind, message = result
+        if kind in ("memory", "exit"):
+            self.close()
+        if kind == "dependency":
+            raise PdfDependencyError(message)
+        if kind == "memory" or kind == "exit" and self.memory_limit_mb:
+            raise PdfMemoryError(f"PDF rendering exceeded the memory limit of {self.memory_limit_mb} MB")
+        if kind == "exit":
+            raise PdfGenerationError(f"PDF renderer exited unexpectedly (exit code {self.process.exitcode})")
+        raise PdfGenerationError(message)
+
+
+def _acquire_worker(renderer_factory: Callable[[], Any], memory_limit_mb: Optional[int]) -> SupervisedWorker:
+    with _idle_lock:
+        for worker in list(_idle_workers):
+            if not worker.is_alive():
+                _idle_workers.remove(worker)
+                worker.close()
+            elif worker.renderer_factory is renderer_factory and worker.memory_limit_mb == memory_limit_mb:
+                _idle_workers.remove(worker)
+                return worker
+    return SupervisedWorker(renderer_factory, memory_limit_mb)
+
+
+def _release_worker(worker: SupervisedWorker) -> None:
+    if not worker.is_alive():
+        worker.close()
+        return
+    with _idle_lock:
+        _idle_workers.append(worker)
+        # Keep the most recently used workers
+        evicted = _idle_workers[:-MAX_IDLE_WORKERS]
+        del _idle_workers[:-MAX_IDLE_WORKERS]
+    for stale in evicted:
+        stale.close()
+
+
+def render_supervised(html_content: str, output_path: Union[str, Path], base_url: Optional[str] = None,
+                      stylesheets: Sequence[str] = (), offline: bool = False, options: Optional[PdfOptions] = None,
+                      timeout: Optional[float] = None, memory_limit_mb: Optional[int] = None) -> None:
+    """
+    Render a PDF in a supervised worker process under a time and memory limit.
+
+    Workers are kept between calls (one per concurrent render, the
+    MAX_IDLE_WORKERS most recently used while idle), so later renders reuse a warm renderer with its
+    font configurations and parsed stylesheets.
+
+    Args:
+        html_content: HTML document (icon sprite already expanded)
+        output_path: Path where the PDF should be saved
+        base_url: Base URL for resolving relative references
+        stylesheets: Additional stylesheets (see PdfRenderer.render)
+        offline: Never access the network for remote URLs
+        options: Size options (see PdfRenderer.render)
+        timeout: Seconds before the worker is killed. If None, no time limit.
+        memory_limit_mb: Address space limit of the worker in megabytes
+            (POSIX only). If None, no memory limit.
+
+    Raises:
+        PdfDependencyError: If WeasyPrint is not installed
+        PdfTimeoutError: If rendering took longer than ``timeout``
+        PdfMemoryError: If rendering exceeded ``memory_limit_mb``
+        PdfGenerationError: If rendering failed for any other reason
+    """
+    # The renderer factory is sent along, so a replaced get_renderer reaches the worker
+    worker = _acquire_worker(get_renderer, memory_limit_mb)
+    try:
+        worker.render(html_content, output_path, base_url, stylesheets=stylesheets, offline=offline,
+                      options=options, timeout=timeout)
+    finally:
+        _release_worker(worker)
@@ -0,0 +1,82 @@
+"""
+Lean print markup shared by the PDF renderings of the templates.
+
+The screen templates write Tailwind utility classes (hover states, responsive
+breakpoints, shadows), and each theme's ``print_styles`` undoes them for print
+with ``!important`` overrides. With ``media="print"`` the templates emit plain
+semantic markup styled by a small precomputed stylesheet instead, so
+WeasyPrint parses and matches a fraction of the rules and no override fights
+the cascade. Print output is black on white whatever the theme.
+"""
+from typing import Sequence, Tuple
+
+from ..core.document import Document
+from .key_chips import render_key_display
+
+# Page, header and key chip styles common to every print rendering
+PRINT_STYLES = (
+    "@page{size:A4;margin:1cm}"
+    "body{margin:0;font:9pt/1.35 'Inter',sans-serif;color:#000;background:#fff}"
+    "header{margin-bottom:.4cm}"
+    "h1{font-size:16pt;margin:0}"
+    "header p{margin:.1cm 0 0;color:#333}"
+    "svg{width:1.1em;height:1.1em;vertical-align:-.2em;margin-right:.3em}"
+    "kbd{display:inline-block;min-width:1.2em;padding:0 .25em;border:.5pt solid #000;border-radius:2pt;"
+    "font:600 8pt/1.4 monospace;text-align:center}"
+    ".keys span{margin:0 .15em;color:#333}"
+    ".empty{color:#555;font-style:italic}"
+)
+
+
+def print_sheet_styles(styles: str) -> str:
+    """
+    Get the complete stylesheet of a print rendering.
+
+    Args:
+        styles: Template stylesheet
+
+    Returns:
+        PRINT_STYLES followed by ``styles``
+    """
+    return PRINT_STYLES + styles
+
+
+def render_print_keys(chords: Sequence[Tuple[str, ...]]) -> str:
+    """
+    Render the chords of a keybind as unstyled ``<kbd>`` chips.
+
+    Args:
+        chords: Alternative chords of the keybind (see document.parse_chords)
+
+    Returns:
+        HTML string for key display
+    """
+    return render_key_display(chords, "key", "keys", "<span>/</span>")
+
+
+def print_document_start(document: Document, title_suffix: str, styles: str, font_faces: str,
+                         icon_sprite: str, inline_styles: bool = True) -> str:
+    """
+    Build the start of a print document, up to and including its header.
+
+    Args:
+        document: Parsed document
+        title_suffix: Template-specific part of the ``<title>``
+        styles: Template stylesheet, appended to PRINT_STYLES
+        font_faces: ``@font-face`` rules (see fonts.build_font_css)
+        icon_sprite: Sprite markup (see icon_sprite.build_sprite)
+        inline_styles: Embed PRINT_STYLES and ``styles``. If False, only the
+            ``@font-face`` rules are embedded and the renderer must supply
+            the stylesheet (see print_sheet_styles).
+
+    Returns:
+        HTML string opening ``<body>``
+    """
+    version = f"<p>Version: {document.version}</p>" if document.version else ""
+    inlined = print_sheet_styles(styles) if inline_styles else ""
+    return (
+        f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8">\n'
+        f'<title>{document.title} - {title_suffix}</title>\n'
+        f'<style>{font_faces}{inlined}</style>\n</head>\n<body>\n{icon_sprite}\n'
+        f'<header><h1>{document.title}</h1>{version}</header>\n'
+    )
@@ -0,0 +1,185 @@
+"""
+Precomputed client-side search for generated cheatsheets.
+
+build_search_index tokenizes every keybind's action, description and chord
+keys at generation time and stores posting lists of row ids: one-/two-letter
+prefixes for short queries and trigrams for longer ones. The inline script
+intersects those lists as the user types and toggles rows by id, so no DOM
+text is scanned per keystroke. Rows carry ``data-k`` (row id) and their
+category container ``data-c`` (category index).
+"""
+import json
+import re
+from html import unescape
+from typing import Any, Dict, Iterable, List, Set
+
+from ..core.document import Document
+
+# Class names of the search box (compiled into the utility stylesheet when search is on)
+SEARCH_INPUT_CLASSES = "w-full max-w-md px-3 py-2 mb-6 border rounded-md text-sm bg-transparent text-inherit print:hidden"
+
+SEARCH_INPUT = (
+    f'<input type="search" class="{SEARCH_INPUT_CLASSES}" data-keystone-search '
+    'placeholder="Search keybinds..." aria-label="Search keybinds" autocomplete="off">'
+)
+
+# Index format version, bumped when the script and index layout change together
+INDEX_VERSION = 1
+
+_TOKEN = re.compile(r"\w+")
+
+# Kept in sync with tokenize() and grams(): \w+ words, 1-2 char prefixes, trigrams
+SEARCH_SCRIPT = """(function () {
+  var input = document.querySelector("[data-keystone-search]");
+  var source = document.getElementById("keystone-search-index");
+  if (!input || !source) return;
+  var index = JSON.parse(source.textContent);
+  var rows = document.querySelectorAll("[data-k]");
+  var groups = document.querySelectorAll("[data-c]");
+  var decoded = {};
+  function postings(gram) {
+    var list = decoded[gram];
+    if (!list) {
+      var deltas = index.g[gram] || [], id = 0;
+      list = new Array(deltas.length);
+      for (var i = 0; i < deltas.length; i++) { id += deltas[i]; list[i] = id; }
+      decoded[gram] = list;
+    }
+    return list;
+  }
+  function intersect(a, b) {
+    var out = [], i = 0, j = 0;
+    while (i < a.length && j < b.length) {
+      if (a[i] < b[j]) i++; else if (a[i] > b[j]) j++; else { out.push(a[i]); i++; j++; }
+    }
+    return out;
+  }
+  function search(query) {
+    var words = query.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu);
+    if (!words) return null;
+    var result = null;
+    for (var w = 0; w < words.length; w++) {
+      var word = words[w], grams = word.length < 3 ? [word] : [];
+      for (var i = 0; i + 3 <= word.length; i++) grams.push(word.substr(i, 3));
+      for (var g = 0; g < grams.length; g++) {
+        result = result === null ? postings(grams[g]) : intersect(result, postings(grams[g]));
+        if (!result.length) return result;
+      }
+    }
+    return result;
+  }
+  function apply(ids) {
+    var visible = new Uint8Array(index.n);
+    if (ids === null) visible.fill(1); else for (var i = 0; i < ids.length; i++) visible[ids[i]] = 1;
+    for (var r = 0; r < rows.length; r++) rows[r].hidden = !visible[r];
+    var start = 0;
+    for (var c = 0; c < groups.length; c++) {
+      var count = 0, first = null;
+      for (var k = start; k < start + index.c[c]; k++) {
+        if (visible[k]) { count++; if (first === null) first = rows[k]; }
+      }
+      start += index.c[c];
+      groups[c].hidden = ids !== null && count === 0;
+      // Reference card: keep the rowspan category cell on the first visible row
+      var head = groups[c].querySelector("[data-h]");
+      if (head && first) {
+        if (head.parentNode !== first) first.insertBefore(head, first.firstChild);
+        head.rowSpan = count;
+      }
+    }
+  }
+  input.addEventListener("input", function () { apply(search(input.value)); });
+})();"""
+
+# Hidden rows must win over display utilities such as .flex
+SEARCH_STYLES = "[data-k][hidden],[data-c][hidden]{display:none!important}"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search tokens.
+
+    Args:
+        text: Plain or HTML-escaped text
+
+    Returns:
+        Word tokens in order
+    """
+    return _TOKEN.findall(unescape(text).lower())
+
+
+def grams(token: str) -> Set[str]:
+    """
+    Get the index keys for a token.
+
+    Args:
+        token: Lowercase token
+
+    Returns:
+        Its one- and two-character prefixes and all of its trigrams
+    """
+    keys = {token[:length] for length in (1, 2) if len(token) >= length}
+    keys.update(token[i:i + 3] for i in range(len(token) - 2))
+    return keys
+
+
+def _delta_encode(ids: Iterable[int]) -> List[int]:
+    encoded = []
+    previous = 0
+    for row_id in ids:
+        encoded.append(row_id - previous)
+        previous = row_id
+    return encoded
+
+
+def build_search_index(document: Document) -> Dict[str, Any]:
+    """
+    Build the search index for a document.
+
+    Row ids number the keybinds in document order across all categories.
+
+    Args:
+        document: Parsed document
+
+    Returns:
+        Index with ``v`` (format version), ``n`` (row count), ``c`` (keybind
+        count per category) and ``g`` (index key to delta-encoded row ids)
+    """
+    postings: Dict[str, List[int]] = {}
+    row_id = 0
+    for category in document.categories:
+        for keybind in category.keybinds:
+            text = " ".join([keybind.action, keybind.description] + [key for chord in keybind.chords for key in chord])
+            keys: Set[str] = set()
+            for token in tokenize(text):
+                keys |= grams(token)
+            for key in keys:
+                postings.setdefault(key, []).append(row_id)
+            row_id += 1
+
+    return {
+        "v": INDEX_VERSION,
+        "n": row_id,
+        "c": [len(category.keybinds) for category in document.categories],
+        "g": {key: _delta_encode(ids) for key, ids in sorted(postings.items())},
+    }
+
+
+def render_search_assets(document: Document) -> str:
+    """
+    Render the embedded index, styles and script for a document.
+
+    Args:
+        document: Parsed document
+
+    Returns:
+        Markup to place at the end of ``<body>``
+    """
+    index_json = json.dumps(build_search_index(document), ensure_ascii=False, separators=(",", ":"))
+    # Keep "</script>" inside keys from closing the element early
+    index_json = index_json.replace("</", "<\\/")
+    return (
+        f'<style>{SEARCH_STYLES}</style>'
+        f'<script type="application/json" id="keystone-search-index">{index_json}</script>'
+        f'<script>{SEARCH_SCRIPT}</script>'
+    )
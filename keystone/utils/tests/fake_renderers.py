@@ -0,0 +1,59 @@
+"""
+Stand-ins for PdfRenderer used by supervised rendering tests.
+
+Supervised renders run in a worker process, which imports the renderer
+factory by name, so these live in an importable module rather than in the
+test modules themselves.
+"""
+import os
+import time
+
+
+class WritingRenderer:
+    """Writes the HTML to the output path."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        with open(output_path, "w") as f:
+            f.write(html_content)
+
+
+class PidRenderer:
+    """Writes the id of the process that rendered."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        with open(output_path, "w") as f:
+            f.write(str(os.getpid()))
+
+
+class BaseUrlRenderer:
+    """Writes the directory relative references would resolve against."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        with open(output_path, "w") as f:
+            f.write(os.path.abspath(base_url))
+
+
+class SleepingRenderer:
+    """Never finishes in time."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        time.sleep(30)
+
+
+class FailingRenderer:
+    """Fails like WeasyPrint rejecting a document."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        raise ValueError("bad stylesheet")
+
+
+class GreedyRenderer:
+    """Allocates far more memory than any limit allows."""
+
+    def render(self, html_content, output_path, base_url=None, **kwargs):
+        bytearray(16 << 30)
+
+
+def missing_renderer():
+    """Fails like get_renderer without WeasyPrint."""
+    raise ImportError("No module named 'weasyprint'")
@@ -0,0 +1,63 @@
+from keystone.core.document import build_document
+from keystone.utils.card_packing import column_capacity, estimate_card_height, pack_cards, pack_pages
+from keystone.utils.theme_loader import load_icons
+
+
+def build_categories(sizes):
+    data = {"title": "Packing", "categories": [
+        {"name": f"Group {index}", "keybinds": [{"action": f"Action {j}", "keys": "Ctrl+S"} for j in range(size)]}
+        for index, size in enumerate(sizes)
+    ]}
+    return build_document(data, load_icons()).categories
+
+
+def test_estimate_grows_with_rows_and_text():
+    """Test that more keybinds and longer descriptions make a card taller."""
+    short, long = build_categories([2, 10])
+    assert estimate_card_height(long) > estimate_card_height(short)
+
+    described = build_document({"categories": [{"name": "Described", "keybinds": [
+        {"action": "Save", "keys": "Ctrl+S", "description": "Save the current file to disk " * 6},
+        {"action": "Open", "keys": "Ctrl+O"},
+    ]}]}, load_icons()).categories[0]
+    assert estimate_card_height(described) > estimate_card_height(short)
+
+
+def test_packing_fills_columns():
+    """Test that packing keeps every card, respects column heights and beats layout order."""
+    categories = build_categories([30, 3, 30, 3, 30, 3, 30, 3, 12, 12])
+    columns = pack_cards(categories)
+
+    assert sorted(category.index for column in columns for category in column) == list(range(len(categories)))
+    for number, column in enumerate(columns):
+        assert sum(estimate_card_height(category) for category in column) <= column_capacity(number)
+        assert [category.index for category in column] == sorted(category.index for category in column)
+
+    # Layout order: each card goes to the current column or starts the next one
+    layout_columns, room = 0, 0.0
+    for category in categories:
+        height = estimate_card_height(category)
+        if height > room:
+            layout_columns += 1
+            room = column_capacity(layout_columns - 1)
+        room -= height
+    assert len(columns) <= layout_columns
+
+
+def test_oversized_card_gets_its_own_page():
+    """Test that a card taller than a column is capped at one column on a page of its own."""
+    categories = build_categories([3, 200, 30, 2])
+    assert estimate_card_height(categories[1]) > column_capacity(2)
+
+    pages = pack_pages(categories)
+    assert pages[-1] == [[categories[1]], []]
+    assert all(categories[1] not in column for page in pages[:-1] for column in page)
+    assert sorted(category.index for page in pages for column in page for category in column) == [0, 1, 2, 3]
+
+
+def test_pages_pair_columns():
+    """Test that columns are grouped two per page."""
+    categories = build_categories([30, 3, 30, 3, 30, 3, 30, 3, 12, 12])
+    pages = pack_pages(categories)
+    assert all(len(page) == 2 for page in pages)
+    assert [column for page in pages for column in page if column] == [column for column in pack_cards(categories) if column]
@@ -0,0 +1,101 @@
+import re
+
+from keystone.core.document import build_document
+from keystone.templates.skill_tree import generate_html
+from keystone.utils.class_dedup import dedupe_classes, referenced_classes
+from keystone.utils.css_compiler import compile_css
+from keystone.utils.theme_loader import load_icons, load_theme
+
+
+def _document(body: str, extra_style: str = "") -> str:
+    return (
+        '<html><head><style id="keystone-utilities"></style>'
+        f'<style>{extra_style}</style></head><body>{body}</body></html>'
+    )
+
+
+class TestDedupeClasses:
+
+    def test_repeated_strings_become_short_classes(self):
+        """Test that repeated class strings share one generated class and rule."""
+        chip = '<kbd class="px-2 py-1 rounded-md keybind-key">A</kbd>'
+        html = dedupe_classes(_document(chip * 3 + '<p class="text-sm">x</p>'))
+
+        assert html.count('class="k0 keybind-key"') == 3
+        assert '.k0{padding-left:0.5rem;padding-right:0.5rem;padding-top:0.25rem;padding-bottom:0.25rem;' in html
+        # Strings used once are left alone and still compiled
+        assert 'class="text-sm"' in html
+        assert ".text-sm{" in html
+        assert ".px-2{" not in html
+
+    def test_classes_used_by_other_styles_stay_literal(self):
+        """Test that classes referenced by print styles are not folded away."""
+        card = '<div class="bg-white rounded-lg shadow-md p-4">x</div>'
+        html = dedupe_classes(_document(card * 2, "@media print { .bg-white { background: white; } }"))
+
+        assert html.count('class="k0 bg-white"') == 2
+        assert ".bg-white{" in html
+
+    def test_variants_and_cascade_order(self):
+        """Test that variant utilities get their own short-class rules after the base ones."""
+        row = '<div class="py-2 border-b last:border-b-0 md:p-4">x</div>'
+        html = dedupe_classes(_document(row * 2))
+
+        base = html.index(".k0{")
+        assert base < html.index(".k0:last-child{border-bottom-width:0px}")
+        assert base < html.index("@media (min-width:768px){.k0{")
+
+    def test_scripts_and_processed_documents_are_untouched(self):
+        """Test that script contents are skipped and the pass is idempotent."""
+        body = '<i class="px-2 py-1">a</i><i class="px-2 py-1">b</i><script>x = \'<b class="px-2 py-1">\';</script>'
+        html = dedupe_classes(_document(body))
+
+        assert "<b class=\"px-2 py-1\">" in html
+        assert dedupe_classes(html) == html
+        assert dedupe_classes("<p class='x'></p>") == "<p class='x'></p>"
+
+    def test_template_output_shrinks(self):
+        """Test that a rendered template gets smaller and keeps every class styled."""
+        theme = load_theme("default")
+        icons = load_icons()
+        data = {
+            "title": "Test",
+            "categories": [
+                {"name": f"Category {i}", "keybinds": [{"action": f"Action {j}", "keys": "Ctrl+S"} for j in range(10)]}
+                for i in range(5)
+            ],
+        }
+        original = generate_html(build_document(data, icons), theme, icons)
+        deduped = dedupe_classes(original)
+
+        assert len(deduped) < len(original)
+        assert re.search(r'class="k\w+ [^"]*keybind-key"', deduped)
+        stylesheet = re.search(r'<style id="keystone-utilities"[^>]*>(.*?)</style>', deduped, re.S).group(1)
+        for short_class in set(re.findall(r'class="(k[0-9a-z]+)[ "]', deduped)):
+            assert f".{short_class}" in stylesheet
+
+    def test_conflicting_utilities_keep_computed_declarations(self):
+        """Test that a deduped class string computes the same declarations as its utilities."""
+        def computed(css: str, selectors) -> dict:
+            declarations: dict = {}
+            for selector, block in re.findall(r'\.([\w-]+)\{([^}]*)\}', css):
+                if selector in selectors:
+                    declarations.update(item.split(":", 1) for item in block.split(";"))
+            return declarations
+
+        # The stylesheet lists text-sm before text-xs, so text-xs wins as in the non-deduped page
+        stylesheet = compile_css(["text-sm", "text-xs", "font-mono"])
+        chip = '<kbd class="text-xs font-mono text-sm">A</kbd>'
+        original = _document(chip * 2).replace('<style id="keystone-utilities"></style>',
+                                               f'<style id="keystone-utilities">{stylesheet}</style>')
+        deduped = dedupe_classes(original)
+
+        assert deduped.count('class="k0"') == 2
+        expected = computed(stylesheet, {"text-xs", "font-mono", "text-sm"})
+        assert expected["font-size"] == "0.75rem"
+        assert computed(deduped, {"k0"}) == expected
+
+    def test_referenced_classes(self):
+        """Test extraction of class selectors from CSS."""
+        classes = referenced_classes(".card, .bg-gray-800 { margin: 0.5cm } .md\\:p-4 { }")
+        assert {"card", "bg-gray-800", "md:p-4"} <= classes
@@ -0,0 +1,122 @@
+import re
+
+import pytest
+
+from keystone.utils.css_compiler import (
+    STYLESHEET_CACHE_SIZE,
+    _cached_stylesheet,
+    build_stylesheet,
+    collect_classes,
+    compile_class,
+    compile_css,
+    escape_class,
+    theme_classes,
+)
+from keystone.utils.theme_loader import load_theme, load_icons
+
+
+class TestCSSCompiler:
+
+    def test_escape_class(self):
+        """Test that special characters in class names are escaped."""
+        assert escape_class("md:grid-cols-2") == "md\\:grid-cols-2"
+        assert escape_class("w-1/4") == "w-1\\/4"
+        assert escape_class("min-w-[280px]") == "min-w-\\[280px\\]"
+        assert escape_class("2xl:p-4").startswith("\\32 ")
+
+    def test_compile_basic_utilities(self):
+        """Test compilation of common spacing, color and layout utilities."""
+        css = compile_css(["p-4", "px-2", "text-gray-600", "bg-white", "flex", "w-1/4"])
+        assert ".p-4{padding:1rem}" in css
+        assert ".px-2{padding-left:0.5rem;padding-right:0.5rem}" in css
+        assert ".text-gray-600{color:#4b5563}" in css
+        assert ".bg-white{background-color:#fff}" in css
+        assert ".flex{display:flex}" in css
+        assert ".w-1\\/4{width:25%}" in css
+
+    def test_compile_variants(self):
+        """Test responsive and pseudo-class variants."""
+        _, rule = compile_class("md:grid-cols-2")
+        assert rule == "@media (min-width:768px){.md\\:grid-cols-2{grid-template-columns:repeat(2,minmax(0,1fr))}}"
+        _, rule = compile_class("last:border-b-0")
+        assert rule == ".last\\:border-b-0:last-child{border-bottom-width:0px}"
+        _, rule = compile_class("hover:shadow-lg")
+        assert ".hover\\:shadow-lg:hover{box-shadow:" in rule
+
+    def test_compile_arbitrary_values(self):
+        """Test arbitrary bracket values."""
+        css = compile_css(["min-w-[280px]", "grid-cols-[repeat(auto-fit,minmax(300px,1fr))]"])
+        assert "min-width:280px" in css
+        assert "grid-template-columns:repeat(auto-fit,minmax(300px,1fr))" in css
+
+    def test_unknown_classes_are_skipped(self):
+        """Test that unsupported classes do not produce rules."""
+        assert compile_class("keybind-key") is None
+        assert compile_class("dark:bg-black") is None
+        assert "keybind-key" not in compile_css(["keybind-key"])
+
+    def test_media_rules_follow_base_rules(self):
+        """Test that responsive rules are emitted after base rules, in breakpoint order."""
+        css = compile_css(["lg:p-8", "sm:p-6", "p-4"])
+        assert css.index(".p-4{") < css.index("sm\\:p-6") < css.index("lg\\:p-8")
+
+    def test_space_between_targets_children(self):
+        """Test that space-y utilities style siblings."""
+        css = compile_css(["space-y-1"])
+        assert ".space-y-1 > :not([hidden]) ~ :not([hidden]){margin-top:0.25rem}" in css
+
+    def test_collect_and_theme_classes(self):
+        """Test class collection from theme values."""
+        theme = {
+            "name": "Not A Class",
+            "base_styles": {"body": "bg-gray-50 text-gray-800"},
+            "color_variants": {"blue": {"header": "bg-blue-50 text-gray-800"}},
+            "print_styles": "@media print { .x { color: red } }",
+        }
+        assert theme_classes(theme) == ["bg-gray-50", "text-gray-800", "bg-blue-50"]
+        assert collect_classes("a b", "b c") == ["a", "b", "c"]
+
+    def test_build_stylesheet_cached_per_theme(self):
+        """Test that stylesheets are cached per theme hash."""
+        theme = load_theme("default")
+        first = build_stylesheet(theme, "mb-2")
+        assert build_stylesheet(theme, "mb-2") is first
+
+        changed = dict(theme, base_styles={"body": "bg-red-50", "container": "p-2"})
+        assert build_stylesheet(changed, "mb-2") is not first
+        assert ".bg-red-50{" in build_stylesheet(changed, "mb-2")
+
+    def test_build_stylesheet_cache_is_bounded(self):
+        """Test that the stylesheet cache keeps a bounded number of stylesheets."""
+        theme = load_theme("default")
+        for index in range(STYLESHEET_CACHE_SIZE + 10):
+            build_stylesheet(theme, f"mb-{index}")
+        assert _cached_stylesheet.cache_info().currsize == STYLESHEET_CACHE_SIZE
+
+    @pytest.mark.parametrize("template_name", ["skill_tree", "reference_card"])
+    @pytest.mark.parametrize("theme_name", ["default", "dark", "minimal", "dark_simple"])
+    def test_rendered_documents_are_fully_compiled(self, template_name, theme_name):
+        """Test that every utility class in a rendered document has a compiled rule."""
+        import importlib
+        template = importlib.import_module(f"keystone.templates.{template_name}")
+        data = {
+            "title": "Coverage",
+            "version": "1.0",
+            "categories": [
+                {"name": "One", "icon_name": "terminal", "keybinds": [
+                    {"action": "Save", "keys": "Ctrl+S", "description": "Save file"},
+                    {"action": "Both", "keys": ["Ctrl+K", "Ctrl+O"]},
+                ]},
+                {"name": "Empty", "keybinds": []},
+            ],
+        }
+        html = template.generate_html(data, load_theme(theme_name), load_icons())
+
+        assert "cdn.tailwindcss.com" not in html
+        stylesheet = re.search(r'<style id="keystone-utilities">(.*?)</style>', html, re.S).group(1)
+        used = collect_classes(*re.findall(r'class="([^"]*)"', html))
+        missing = [
+            name for name in used
+            if name not in ("keybind-key",) and f".{escape_class(name)}" not in stylesheet
+        ]
+        assert missing == []
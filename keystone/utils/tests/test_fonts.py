@@ -0,0 +1,107 @@
+import pytest
+
+from keystone.utils import fonts
+from keystone.utils.fonts import build_font_css, collect_document_text, find_font_files, subset_font
+
+
+def _build_test_font(path):
+    """Write a tiny TrueType font with glyphs for A, B and C."""
+    font_builder = pytest.importorskip("fontTools.fontBuilder")
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    glyph_order = [".notdef", "A", "B", "C"]
+    builder = font_builder.FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_order)
+    builder.setupCharacterMap({ord(name): name for name in glyph_order[1:]})
+
+    glyphs = {}
+    for name in glyph_order:
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 500))
+        pen.lineTo((500, 500))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (600, 0) for name in glyph_order})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Inter", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+class TestFontPipeline:
+
+    @pytest.fixture
+    def font_env(self, tmp_path, monkeypatch):
+        """Point the font search path and cache at temporary directories."""
+        font_dir = tmp_path / "fonts"
+        font_dir.mkdir()
+        monkeypatch.setenv("KEYSTONE_FONT_PATH", str(font_dir))
+        monkeypatch.setenv("KEYSTONE_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(fonts, "_SUBSET_MEMORY_CACHE", {})
+        return font_dir
+
+    def test_collect_document_text(self):
+        """Test that document text includes data characters and base glyphs."""
+        data = {
+            "title": "Café",
+            "categories": [{"name": "Ñav", "keybinds": [{"action": "Go", "keys": ["⌘+K"], "description": "→"}]}],
+        }
+        text = collect_document_text(data)
+        for char in "éÑ⌘→A+:":
+            assert char in text
+        assert len(text) == len(set(text))
+
+    def test_no_font_files_emits_nothing(self, font_env):
+        """Test the system font fallback when no font files are installed."""
+        assert find_font_files("Inter") == {}
+        assert build_font_css("abc") == ""
+
+    def test_embeds_subset_font_as_data_uri(self, font_env):
+        """Test that installed fonts are subset and embedded."""
+        _build_test_font(font_env / "Inter-Regular.ttf")
+
+        css = build_font_css("AB")
+        assert "@font-face" in css
+        assert "font-weight:400" in css
+        assert "src:url(data:font/woff" in css
+
+    def test_subset_is_cached_by_glyph_set(self, font_env, tmp_path):
+        """Test that subsets are cached on disk keyed by glyph set."""
+        font_path = font_env / "Inter-Regular.ttf"
+        _build_test_font(font_path)
+
+        first, extension = subset_font(font_path, "AB")
+        cached_files = list((tmp_path / "cache" / "fonts").iterdir())
+        assert len(cached_files) == 1
+
+        # Same glyph set in a different order hits the cache
+        fonts._SUBSET_MEMORY_CACHE.clear()
+        second, _ = subset_font(font_path, "BA")
+        assert second == first
+        assert len(list((tmp_path / "cache" / "fonts").iterdir())) == 1
+
+        subset_font(font_path, "ABC")
+        assert len(list((tmp_path / "cache" / "fonts").iterdir())) == 2
+
+    def test_sidecar_fonts(self, font_env, tmp_path):
+        """Test writing subset fonts as sidecar files."""
+        _build_test_font(font_env / "Inter-Regular.ttf")
+        output_dir = tmp_path / "site"
+
+        css = build_font_css("AB", asset_dir=output_dir)
+        written = list((output_dir / "fonts").iterdir())
+        assert len(written) == 1
+        assert f"url(fonts/{written[0].name})" in css
+
+    def test_templates_do_not_import_remote_fonts(self):
+        """Test that templates no longer reference Google Fonts."""
+        from keystone.templates import reference_card, skill_tree
+        from keystone.utils.theme_loader import load_icons, load_theme
+
+        data = {"title": "Fonts", "categories": []}
+        for template in (skill_tree, reference_card):
+            html = template.generate_html(data, load_theme("default"), load_icons())
+            assert "fonts.googleapis.com" not in html
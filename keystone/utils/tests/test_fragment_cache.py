@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from keystone.templates import reference_card, skill_tree
+from keystone.utils import fragment_cache as fragment_cache_module
+from keystone.utils.fragment_cache import FragmentCache
+from keystone.utils.theme_loader import load_icons, load_theme
+
+SAMPLE_DATA = {
+    "title": "Cache",
+    "categories": [
+        {"name": "Files", "icon_name": "terminal", "keybinds": [{"action": "Save", "keys": ["Ctrl+S"]}]},
+        {"name": "Edit", "keybinds": [{"action": "Undo", "keys": ["Ctrl+Z"]}]},
+    ],
+}
+
+
+class TestFragmentCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return FragmentCache(tmp_path / "fragments")
+
+    def test_renders_once_per_key(self, cache):
+        """Test that a fragment is rendered on the first lookup only."""
+        calls = []
+        theme = load_theme("default")
+
+        def render():
+            calls.append(1)
+            return "<div>fragment</div>"
+
+        category = {"name": "A"}
+        assert cache.get_or_render("skill_tree", category, theme, render) == "<div>fragment</div>"
+        assert cache.get_or_render("skill_tree", category, theme, render) == "<div>fragment</div>"
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_on_inputs(self, cache, monkeypatch):
+        """Test that category, theme, template, variant and version change the key."""
+        theme = load_theme("default")
+        base = cache.fragment_key("skill_tree", {"name": "A"}, theme, ("blue",))
+        assert base == cache.fragment_key("skill_tree", {"name": "A"}, theme, ("blue",))
+        assert base != cache.fragment_key("skill_tree", {"name": "B"}, theme, ("blue",))
+        assert base != cache.fragment_key("skill_tree", {"name": "A"}, load_theme("dark"), ("blue",))
+        assert base != cache.fragment_key("reference_card", {"name": "A"}, theme, ("blue",))
+        assert base != cache.fragment_key("skill_tree", {"name": "A"}, theme, ("green",))
+
+        monkeypatch.setattr(fragment_cache_module, "__version__", "999")
+        assert base != cache.fragment_key("skill_tree", {"name": "A"}, theme, ("blue",))
+
+    def test_fragments_persist_on_disk(self, tmp_path):
+        """Test that a new cache instance reuses fragments written by another."""
+        theme = load_theme("default")
+        FragmentCache(tmp_path).get_or_render("skill_tree", {"name": "A"}, theme, lambda: "<p>a</p>")
+
+        second = FragmentCache(tmp_path)
+        assert second.get_or_render("skill_tree", {"name": "A"}, theme, lambda: "<p>other</p>") == "<p>a</p>"
+        assert second.hits == 1
+
+    def test_memory_is_bounded(self, tmp_path):
+        """Test that only the most recently used fragments stay in memory."""
+        cache = FragmentCache(tmp_path, persist=False, maxsize=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, f"<p>{key}</p>")
+        assert cache.get("a") is None
+        assert cache.get("c") == "<p>c</p>"
+        assert cache.evictions == 1
+
+    def test_disk_is_trimmed_to_size(self, tmp_path):
+        """Test that the least recently used fragment files are deleted beyond the size cap."""
+        theme = load_theme("default")
+        writer = FragmentCache(tmp_path)
+        keys = [writer.fragment_key("skill_tree", {"name": name}, theme) for name in "abc"]
+        for age, key in enumerate(keys):
+            writer.put(key, "x" * 100)
+            os.utime(tmp_path / f"{key}.html", (1000 + age, 1000 + age))
+
+        assert FragmentCache(tmp_path, max_disk_bytes=250).trim_disk() == 1
+        assert sorted(path.stem for path in tmp_path.glob("*.html")) == sorted(keys[1:])
+
+    @pytest.mark.parametrize("template", [skill_tree, reference_card])
+    def test_cached_render_matches_uncached(self, cache, template):
+        """Test that splicing cached fragments reproduces the full render."""
+        theme, icons = load_theme("default"), load_icons()
+        expected = template.generate_html(SAMPLE_DATA, theme, icons)
+
+        assert template.generate_html(SAMPLE_DATA, theme, icons, fragment_cache=cache) == expected
+        assert cache.misses == 2
+        assert template.generate_html(SAMPLE_DATA, theme, icons, fragment_cache=cache) == expected
+        assert cache.hits == 2
+
+    def test_only_changed_category_is_rerendered(self, cache):
+        """Test that editing one category re-renders only that category."""
+        theme, icons = load_theme("default"), load_icons()
+        skill_tree.generate_html(SAMPLE_DATA, theme, icons, fragment_cache=cache)
+
+        changed = {"title": "Cache", "categories": [SAMPLE_DATA["categories"][0], {"name": "Edit", "keybinds": []}]}
+        skill_tree.generate_html(changed, theme, icons, fragment_cache=cache)
+        assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from keystone.core.validator import validate_references
+from keystone.templates import skill_tree
+from keystone.utils.icon_pack import IconPack, build_icon_pack, cached_icon_pack, write_icon_pack
+from keystone.utils.theme_loader import load_icons, load_theme
+
+ASSETS_DIR = Path(__file__).parent.parent.parent / "assets"
+
+SAMPLE_ICONS = {
+    "alpha": '<svg class="h-6 w-6" viewBox="0 0 24 24"><path d="M1 1"/></svg>',
+    "beta": '<svg class="h-6 w-6" viewBox="0 0 24 24"><path d="M2 2"/></svg>',
+    "gamma": '<svg class="h-4 w-4" viewBox="0 0 24 24"><path d="M3 3"/></svg>',
+}
+
+
+class TestIconPack:
+
+    @pytest.fixture
+    def pack(self, tmp_path):
+        return IconPack(write_icon_pack(SAMPLE_ICONS, tmp_path / "sample.iconpack"))
+
+    def test_round_trip(self, pack):
+        """Test that a written pack reads back the same icons."""
+        assert dict(pack) == SAMPLE_ICONS
+
+    def test_opening_reads_only_the_index(self, pack):
+        """Test that names are available without decoding any SVG body."""
+        assert sorted(pack) == ["alpha", "beta", "gamma"]
+        assert "beta" in pack
+        assert "missing" not in pack
+        assert len(pack) == 3
+        assert pack.decoded_count == 0
+
+        assert pack["beta"] == SAMPLE_ICONS["beta"]
+        assert pack.decoded_count == 1
+
+    def test_invalid_file(self, tmp_path):
+        """Test that non-pack files are rejected."""
+        bogus = tmp_path / "bogus.iconpack"
+        bogus.write_text("not a pack")
+        with pytest.raises(ValueError, match="Not a Keystone icon pack"):
+            IconPack(bogus)
+
+    def test_build_from_svg_directory(self, tmp_path):
+        """Test building a pack from a directory of SVG files."""
+        svg_dir = tmp_path / "svgs"
+        svg_dir.mkdir()
+        (svg_dir / "star.svg").write_text(SAMPLE_ICONS["alpha"] + "\n")
+        pack = IconPack(build_icon_pack(svg_dir, tmp_path / "out.iconpack"))
+        assert dict(pack) == {"star": SAMPLE_ICONS["alpha"]}
+
+    def test_bundled_pack_built_from_manifest(self, tmp_path, monkeypatch):
+        """Test that the bundled icons are packed from icons.json into the cache."""
+        monkeypatch.setenv("KEYSTONE_CACHE_DIR", str(tmp_path / "cache"))
+        with open(ASSETS_DIR / "icons.json", 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        icons = load_icons()
+        assert isinstance(icons, IconPack)
+        assert icons.path.parent == tmp_path / "cache" / "icons"
+        assert dict(icons) == manifest
+        assert not list(ASSETS_DIR.glob("*.iconpack"))
+
+    def test_cached_pack_follows_manifest(self, tmp_path, monkeypatch):
+        """Test that editing a manifest builds a new pack instead of reusing the stale one."""
+        monkeypatch.setenv("KEYSTONE_CACHE_DIR", str(tmp_path / "cache"))
+        manifest = tmp_path / "icons.json"
+        manifest.write_text(json.dumps({"alpha": SAMPLE_ICONS["alpha"]}))
+        first = cached_icon_pack(manifest)
+        assert cached_icon_pack(manifest) == first
+
+        manifest.write_text(json.dumps({"beta": SAMPLE_ICONS["beta"]}))
+        second = cached_icon_pack(manifest)
+        assert second != first
+        assert dict(IconPack(second)) == {"beta": SAMPLE_ICONS["beta"]}
+
+    def test_user_packs_take_precedence(self, tmp_path, monkeypatch):
+        """Test that packs on KEYSTONE_ICON_PATH override bundled icons."""
+        write_icon_pack({"grid": SAMPLE_ICONS["alpha"], "extra": SAMPLE_ICONS["beta"]}, tmp_path / "user.iconpack")
+        monkeypatch.setenv("KEYSTONE_ICON_PATH", str(tmp_path))
+        icons = load_icons()
+        assert icons["grid"] == SAMPLE_ICONS["alpha"]
+        assert icons["extra"] == SAMPLE_ICONS["beta"]
+        assert "terminal" in icons
+
+    def test_validate_references_does_not_decode(self, pack):
+        """Test that reference validation only consults the index."""
+        layout = {"categories": [{"name": "A", "icon_name": "alpha"}, {"name": "B", "icon_name": "missing"}]}
+        is_valid, error_message = validate_references(layout, load_theme("default"), pack)
+        assert not is_valid
+        assert '"missing"' in error_message
+        assert pack.decoded_count == 0
+
+    def test_render_decodes_only_used_icons(self, pack):
+        """Test that rendering decodes just the icons the layout references."""
+        data = {"title": "Icons", "categories": [{"name": "A", "icon_name": "alpha", "keybinds": []}]}
+        html = skill_tree.generate_html(data, load_theme("default"), pack)
+        assert 'href="#icon-alpha"' in html
+        assert pack.decoded_count == 1
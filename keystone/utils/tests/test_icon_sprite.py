@@ -0,0 +1,55 @@
+from keystone.utils.icon_sprite import (
+    build_sprite,
+    expand_icon_sprite,
+    icon_reference,
+    resolve_icon_name,
+    symbol_id,
+)
+
+
+ICONS = {
+    "grid": '<svg xmlns="http://www.w3.org/2000/svg" class="h-6 w-6" fill="none" viewBox="0 0 24 24"><path d="M4 6"/></svg>',
+    "terminal": '<svg xmlns="http://www.w3.org/2000/svg" class="h-6 w-6" viewBox="0 0 24 24" stroke="currentColor"><path d="M8 9"/></svg>',
+}
+
+
+class TestIconSprite:
+
+    def test_resolve_icon_name_fallback(self):
+        """Test that unknown or missing icon names fall back to grid."""
+        assert resolve_icon_name("terminal", ICONS) == "terminal"
+        assert resolve_icon_name("missing", ICONS) == "grid"
+        assert resolve_icon_name(None, ICONS) == "grid"
+        assert resolve_icon_name("missing", {}) is None
+
+    def test_symbol_id_is_sanitized(self):
+        """Test that symbol ids are safe fragment identifiers."""
+        assert symbol_id("arrow right/up") == "icon-arrow-right-up"
+
+    def test_build_sprite_deduplicates(self):
+        """Test that the sprite contains one symbol per distinct icon."""
+        sprite = build_sprite(ICONS, ["grid", "terminal", "grid", None])
+        assert sprite.count("<symbol") == 2
+        assert '<symbol id="icon-grid" fill="none" viewBox="0 0 24 24"><path d="M4 6"/></symbol>' in sprite
+        assert 'class="h-6 w-6"' not in sprite
+        assert build_sprite(ICONS, []) == ""
+
+    def test_icon_reference_keeps_outer_classes(self):
+        """Test that references keep sizing classes from the source SVG."""
+        reference = icon_reference("terminal", ICONS)
+        assert reference == '<svg class="h-6 w-6" aria-hidden="true"><use href="#icon-terminal"></use></svg>'
+        assert icon_reference(None, ICONS) == ""
+
+    def test_expand_icon_sprite_for_pdf(self):
+        """Test that sprite references are inlined for WeasyPrint."""
+        html = (
+            f"<body>{build_sprite(ICONS, ['terminal'])}"
+            f"<div>{icon_reference('terminal', ICONS)}</div><div>{icon_reference('terminal', ICONS)}</div></body>"
+        )
+
+        expanded = expand_icon_sprite(html)
+
+        assert "<symbol" not in expanded
+        assert "<use" not in expanded
+        assert expanded.count('viewBox="0 0 24 24" stroke="currentColor"><path d="M8 9"/></svg>') == 2
+        assert expand_icon_sprite("<p>no sprite</p>") == "<p>no sprite</p>"
@@ -0,0 +1,61 @@
+from keystone.utils.key_chips import EMPTY_KEYS, KeyChipCache, render_key_display
+
+
+class TestKeyChipCache:
+
+    def test_render_chord(self):
+        """Test that chords are rendered as kbd chips with separators."""
+        cache = KeyChipCache()
+        html = cache.render_chord(("Ctrl", "Shift", "P"), "key")
+        assert html == (
+            '<kbd class="key">Ctrl</kbd><span class="text-gray-500 mx-1">+</span>'
+            '<kbd class="key">Shift</kbd><span class="text-gray-500 mx-1">+</span>'
+            '<kbd class="key">P</kbd>'
+        )
+
+    def test_hits_and_misses(self):
+        """Test that repeated chords are served from the cache."""
+        cache = KeyChipCache()
+        for _ in range(3):
+            cache.render_chord(("Ctrl", "S"), "key")
+        cache.render_chord(("Ctrl", "S"), "other-key")
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["size"] == 2
+        assert stats["hit_rate"] == 0.5
+
+    def test_bounded_lru(self):
+        """Test that the least recently used chord is evicted first."""
+        cache = KeyChipCache(maxsize=2)
+        cache.render_chord(("A",), "key")
+        cache.render_chord(("B",), "key")
+        cache.render_chord(("A",), "key")
+        cache.render_chord(("C",), "key")
+
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["evictions"] == 1
+        cache.render_chord(("A",), "key")
+        assert cache.stats()["hits"] == 2
+        cache.render_chord(("B",), "key")
+        assert cache.stats()["misses"] == 4
+
+    def test_clear(self):
+        """Test that clearing drops entries and statistics."""
+        cache = KeyChipCache()
+        cache.render_chord(("A",), "key")
+        cache.clear()
+        assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "maxsize": 4096, "hit_rate": 0.0}
+
+
+class TestRenderKeyDisplay:
+
+    def test_empty_keys(self):
+        """Test the placeholder for keybinds without keys."""
+        assert render_key_display([], "key", "group", "|") == EMPTY_KEYS
+
+    def test_alternative_chords(self):
+        """Test that alternative chords are joined by the separator."""
+        html = render_key_display([("A",), ("B",)], "key", "group", "|", cache=KeyChipCache())
+        assert html == '<div class="group"><kbd class="key">A</kbd>|<kbd class="key">B</kbd></div>'
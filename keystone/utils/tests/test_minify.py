@@ -0,0 +1,58 @@
+from keystone.core.document import build_document
+from keystone.templates.reference_card import generate_html
+from keystone.utils.minify import minify_css, minify_html
+from keystone.utils.theme_loader import load_icons, load_theme
+
+
+class TestMinifyCss:
+
+    def test_removes_whitespace_and_comments(self):
+        """Test that insignificant whitespace and comments are removed."""
+        css = """
+        /* print */
+        @media print and (max-width: 8.5in) {
+            .grid , .card > p { margin: 0 !important; }
+        }
+        """
+        assert minify_css(css) == "@media print and (max-width:8.5in){.grid,.card>p{margin:0 !important}}"
+
+    def test_keeps_strings_and_descendant_combinators(self):
+        """Test that quoted strings and descendant selectors are preserved."""
+        css = "body  { font-family: 'Inter  Display', sans-serif; }  .a :hover { color: red }"
+        assert minify_css(css) == "body{font-family:'Inter  Display',sans-serif}.a :hover{color:red}"
+
+
+class TestMinifyHtml:
+
+    def test_collapses_indentation(self):
+        """Test that whitespace around block tags is removed and inline spacing kept."""
+        html = """
+        <div class="a">
+            <p>Hello   <b>bold</b> <i>world</i></p>
+            <!-- comment -->
+        </div>
+        """
+        assert minify_html(html) == '<div class="a"><p>Hello <b>bold</b> <i>world</i></p></div>'
+
+    def test_raw_elements_are_kept(self):
+        """Test that pre, textarea and script contents are untouched."""
+        html = "<div>\n  <pre>  a\n   b</pre>\n  <script>if (a  <  b) {\n  x();\n}</script>\n</div>"
+        assert minify_html(html) == "<div><pre>  a\n   b</pre><script>if (a  <  b) {\n  x();\n}</script></div>"
+
+    def test_minifies_inline_styles(self):
+        """Test that style element contents are minified."""
+        html = "<head>\n  <style>\n    body { margin: 0; }\n  </style>\n</head>"
+        assert minify_html(html) == "<head><style>body{margin:0}</style></head>"
+
+    def test_template_output(self):
+        """Test that a rendered template shrinks and keeps its text."""
+        icons = load_icons()
+        data = {"title": "Test", "categories": [{"name": "Files", "keybinds": [
+            {"action": "Save file", "keys": "Ctrl+S", "description": "Write to disk"}]}]}
+        original = generate_html(build_document(data, icons), load_theme("default"), icons)
+        minified = minify_html(original)
+
+        assert len(minified) < len(original)
+        assert "\n " not in minified
+        assert "Save file" in minified and "Write to disk" in minified
+        assert minify_html(minified) == minified
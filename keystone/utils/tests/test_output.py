@@ -0,0 +1,63 @@
+import gzip
+
+import pytest
+
+from keystone.utils.output import brotli_available, write_chunks, write_precompressed
+
+
+class TestWriteChunks:
+
+    def test_writes_chunks_in_order(self, tmp_path):
+        """Test that chunks are concatenated into the output file."""
+        output = tmp_path / "nested" / "out.html"
+        written = write_chunks(iter(["<html>", "é", "</html>"]), output)
+        assert output.read_text(encoding='utf-8') == "<html>é</html>"
+        assert written == len("<html>é</html>")
+
+    def test_failed_render_leaves_no_partial_file(self, tmp_path):
+        """Test that an error mid-stream keeps the previous output intact."""
+        output = tmp_path / "out.html"
+        output.write_text("previous")
+
+        def chunks():
+            yield "partial"
+            raise RuntimeError("render failed")
+
+        with pytest.raises(RuntimeError):
+            write_chunks(chunks(), output)
+        assert output.read_text() == "previous"
+        assert [path.name for path in tmp_path.iterdir()] == ["out.html"]
+
+
+class TestWritePrecompressed:
+
+    def test_writes_gzip_and_brotli(self, tmp_path):
+        """Test that compressed copies are written next to the output."""
+        output = tmp_path / "out.html"
+        output.write_text("<p>cheatsheet</p>" * 100)
+
+        written = write_precompressed(output)
+
+        assert tmp_path / "out.html.gz" in written
+        assert gzip.decompress((tmp_path / "out.html.gz").read_bytes()) == output.read_bytes()
+        if brotli_available():
+            import brotli
+            assert brotli.decompress((tmp_path / "out.html.br").read_bytes()) == output.read_bytes()
+        else:
+            assert not (tmp_path / "out.html.br").exists()
+
+    def test_deterministic_gzip(self, tmp_path):
+        """Test that unchanged output compresses to identical bytes."""
+        output = tmp_path / "out.html"
+        output.write_text("<p>same</p>")
+        write_precompressed(output, formats=("gz",))
+        first = (tmp_path / "out.html.gz").read_bytes()
+        write_precompressed(output, formats=("gz",))
+        assert (tmp_path / "out.html.gz").read_bytes() == first
+
+    def test_unknown_format(self, tmp_path):
+        """Test that an unknown format is rejected."""
+        output = tmp_path / "out.html"
+        output.write_text("x")
+        with pytest.raises(ValueError):
+            write_precompressed(output, formats=("zip",))
@@ -0,0 +1,44 @@
+import pytest
+
+from keystone.utils import pdf_manifest
+from keystone.utils.pdf_manifest import pdf_inputs_digest, pdf_is_current, record_pdf
+
+
+@pytest.fixture(autouse=True)
+def isolated_manifest(tmp_path, monkeypatch):
+    monkeypatch.setenv("KEYSTONE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pdf_manifest, "weasyprint_version", lambda: "65.1")
+
+
+def test_inputs_digest_covers_options():
+    """Test that the HTML, options and WeasyPrint version all change the digest."""
+    digest = pdf_inputs_digest("<p>a</p>")
+    assert digest == pdf_inputs_digest("<p>a</p>")
+    assert digest != pdf_inputs_digest("<p>b</p>")
+    assert digest != pdf_inputs_digest("<p>a</p>", offline=True)
+    assert digest != pdf_inputs_digest("<p>a</p>", stylesheets=["p { color: red }"])
+    assert pdf_inputs_digest(["<p>a</p>", "<p>b</p>"]) != pdf_inputs_digest(["<p>a</p><p>b</p>"])
+
+
+def test_unchanged_pdf_is_current(tmp_path):
+    """Test that a recorded PDF is current until its inputs or the file change."""
+    pdf_path = tmp_path / "out.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7")
+    inputs = pdf_inputs_digest("<p>a</p>")
+    assert not pdf_is_current(pdf_path, inputs)
+
+    record_pdf(pdf_path, inputs)
+    assert pdf_is_current(pdf_path, inputs)
+    assert not pdf_is_current(pdf_path, pdf_inputs_digest("<p>b</p>"))
+
+    pdf_path.write_bytes(b"%PDF-1.7 edited")
+    assert not pdf_is_current(pdf_path, inputs)
+
+
+def test_missing_weasyprint_is_never_current(tmp_path, monkeypatch):
+    """Test that nothing is skipped when WeasyPrint is not installed."""
+    monkeypatch.setattr(pdf_manifest, "weasyprint_version", lambda: None)
+    pdf_path = tmp_path / "out.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7")
+    record_pdf(pdf_path, pdf_inputs_digest("<p>a</p>"))
+    assert not pdf_is_current(pdf_path, pdf_inputs_digest("<p>a</p>"))
@@ -0,0 +1,54 @@
+import sys
+import types
+
+import pytest
+
+from keystone.utils.pdf_renderer import PdfRenderer, font_faces_digest
+
+
+def test_font_faces_digest():
+    """Test that only @font-face rules distinguish font configurations."""
+    faces = "<style>@font-face { font-family: 'Inter'; src: url(a.woff2); }</style>"
+    assert font_faces_digest(faces + "<p>one</p>") == font_faces_digest(faces + "<p>two</p>")
+    assert font_faces_digest(faces) != font_faces_digest(faces.replace("a.woff2", "b.woff2"))
+    assert font_faces_digest("<p>one</p>") == font_faces_digest("")
+
+
+def test_renderer_reuses_setup(tmp_path):
+    """Test that repeated renders share font configurations and parsed stylesheets."""
+    pytest.importorskip("weasyprint")
+    renderer = PdfRenderer(offline=True)
+    for name in ("a", "b"):
+        renderer.render(f"<p>{name}</p>", tmp_path / f"{name}.pdf", stylesheets=["p { color: red }"])
+        assert (tmp_path / f"{name}.pdf").read_bytes().startswith(b"%PDF")
+
+    digest = font_faces_digest("")
+    assert renderer.stylesheet("p { color: red }", digest) is renderer.stylesheet("p { color: red }", digest)
+    assert renderer.font_config(digest) is renderer.font_config(digest)
+
+
+def test_theme_stylesheet_parsed_once(monkeypatch, tmp_path):
+    """Test that documents with different fonts share the parse of a theme stylesheet."""
+    parsed = []
+
+    class CSS:
+        def __init__(self, string, **kwargs):
+            parsed.append(string)
+
+    class HTML:
+        def __init__(self, **kwargs):
+            pass
+
+        def write_pdf(self, target, **kwargs):
+            pass
+
+    weasyprint = types.SimpleNamespace(CSS=CSS, HTML=HTML)
+    fonts = types.SimpleNamespace(FontConfiguration=object)
+    monkeypatch.setitem(sys.modules, "weasyprint", weasyprint)
+    monkeypatch.setitem(sys.modules, "weasyprint.text.fonts", fonts)
+
+    renderer = PdfRenderer(offline=True)
+    for url in ("a.woff2", "b.woff2"):
+        html = f"<style>@font-face {{ font-family: 'Inter'; src: url({url}); }}</style><p>hi</p>"
+        renderer.render(html, tmp_path / "out.pdf", stylesheets=["@page { size: A4 }"])
+    assert parsed == ["@page { size: A4 }"]
@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import keystone
+
+from keystone.utils import pdf_supervisor
+from keystone.utils.pdf_server import (
+    PdfServer,
+    PdfServerError,
+    render_with_server,
+    server_running,
+)
+from keystone.utils.pdf_supervisor import PdfTimeoutError
+from keystone.utils.tests.fake_renderers import SleepingRenderer
+
+
+class RecordingServer(PdfServer):
+    """PdfServer that writes the received HTML instead of a PDF."""
+
+    def render(self, html_content, output_path, base_url, offline=False, stylesheets=(), options=None,
+               timeout=None, memory_limit_mb=None):
+        if "limited" in html_content:
+            return super().render(html_content, output_path, base_url, offline, stylesheets, options, timeout,
+                                  memory_limit_mb)
+        if "fail" in html_content:
+            raise ValueError("bad document")
+        output_path.write_text(f"{base_url}|{offline}|{','.join(stylesheets)}|{html_content}")
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = RecordingServer(tmp_path / "s.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestPdfServer:
+
+    def test_renders_through_socket(self, server, tmp_path):
+        """Test that a request is rendered by the server and acknowledged."""
+        output = tmp_path / "out.pdf"
+        assert render_with_server("<p>hi</p>", output, "file:///assets/", socket_path=server.socket_path,
+                                  offline=True, stylesheets=["p{margin:0}"])
+        assert output.read_text() == "file:///assets/|True|p{margin:0}|<p>hi</p>"
+
+    def test_render_errors_are_reported(self, server, tmp_path):
+        """Test that server-side failures raise PdfServerError in the client."""
+        with pytest.raises(PdfServerError, match="bad document"):
+            render_with_server("fail", tmp_path / "out.pdf", socket_path=server.socket_path)
+
+    def test_server_enforces_timeout(self, server, tmp_path, monkeypatch):
+        """Test that the server stops a render past its timeout and keeps serving."""
+        monkeypatch.setattr(pdf_supervisor, "get_renderer", SleepingRenderer)
+        with pytest.raises(PdfTimeoutError, match="timed out after 0.5s"):
+            render_with_server("limited", tmp_path / "out.pdf", socket_path=server.socket_path, timeout=0.5)
+        # The abandoned render did not keep the server busy
+        assert render_with_server("<p>next</p>", tmp_path / "next.pdf", socket_path=server.socket_path, timeout=5)
+        assert (tmp_path / "next.pdf").exists()
+
+    def test_relative_base_url_resolves_against_client(self, tmp_path, monkeypatch):
+        """Test that a relative base URL means the client's directory, wherever the server runs."""
+        server_dir, client_dir = tmp_path / "server", tmp_path / "client"
+        server_dir.mkdir()
+        client_dir.mkdir()
+        socket_path = tmp_path / "s.sock"
+        script = (
+            "import sys\n"
+            "from keystone.utils import pdf_supervisor\n"
+            "from keystone.utils.pdf_server import PdfServer\n"
+            "from keystone.utils.tests.fake_renderers import BaseUrlRenderer\n"
+            "pdf_supervisor.get_renderer = BaseUrlRenderer\n"
+            "with PdfServer(sys.argv[1]) as server:\n"
+            "    server.handle_request()\n"
+        )
+        environment = dict(os.environ, PYTHONPATH=str(Path(keystone.__file__).parent.parent))
+        process = subprocess.Popen([sys.executable, "-c", script, str(socket_path)], cwd=server_dir, env=environment)
+        try:
+            deadline = time.monotonic() + 10
+            while not socket_path.exists():
+                assert process.poll() is None and time.monotonic() < deadline
+                time.sleep(0.05)
+            monkeypatch.chdir(client_dir)
+            output = tmp_path / "out.pdf"
+            # A timeout makes the server render in a supervised child started from its own directory
+            assert render_with_server("<p>hi</p>", output, "assets", socket_path=socket_path, timeout=30)
+        finally:
+            process.wait(timeout=10)
+        assert output.read_text() == str(client_dir / "assets")
+
+    def test_second_server_refused(self, server):
+        """Test that a running server is not replaced."""
+        assert server_running(server.socket_path)
+        with pytest.raises(OSError, match="already listening"):
+            RecordingServer(server.socket_path)
+
+    def test_socket_removed_on_close(self, tmp_path):
+        """Test that closing the server removes its socket."""
+        server = RecordingServer(tmp_path / "s.sock")
+        server.server_close()
+        assert not (tmp_path / "s.sock").exists()
+
+
+class TestClientFallback:
+
+    def test_no_server(self, tmp_path):
+        """Test that a missing socket means in-process rendering."""
+        assert not render_with_server("<p></p>", tmp_path / "out.pdf", socket_path=tmp_path / "missing.sock")
+
+    def test_stale_socket(self, tmp_path):
+        """Test that a socket file without a listener is ignored and then reclaimed."""
+        stale = tmp_path / "s.sock"
+        RecordingServer(stale).socket.close()
+        assert stale.exists()
+        assert not render_with_server("<p></p>", tmp_path / "out.pdf", socket_path=stale)
+
+        server = RecordingServer(stale)
+        server.server_close()
+
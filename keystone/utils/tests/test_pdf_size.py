@@ -0,0 +1,47 @@
+from keystone.utils.pdf_size import PdfOptions, format_size_report, pdf_size_report, prune_unused_css
+
+
+def test_write_pdf_options():
+    """Test that size options map onto WeasyPrint's write_pdf options."""
+    assert PdfOptions().write_pdf_options() == {"full_fonts": False, "uncompressed_pdf": False}
+    options = PdfOptions(subset_fonts=False, compress=False, jpeg_quality=70, dpi=150).write_pdf_options()
+    assert options == {"full_fonts": True, "uncompressed_pdf": True, "optimize_images": True,
+                       "jpeg_quality": 70, "dpi": 150}
+
+
+def test_prune_unused_css():
+    """Test that rules for missing classes, ids and font families are dropped."""
+    html = (
+        "<style>@font-face{font-family:'Inter';src:url(a.woff2)}@font-face{font-family:'Mono';src:url(b.woff2)}"
+        "body{font-family:'Inter',sans-serif}.used{color:red}.unused{color:blue}h1,.gone{margin:0}"
+        "@media print{.gone{color:red}.used:hover{color:green}}@media (min-width:768px){.md\\:grid{display:grid}}"
+        "#main .used{padding:0}#missing{padding:0}.x[title]{color:red}@page{size:A4}</style>"
+        '<main id="main" class="used"><p class="used">hi</p></main>'
+    )
+    pruned = prune_unused_css(html)
+
+    for kept in ("'Inter'", "body{", ".used{color:red}", "h1,.gone{", "@media print{.used:hover", "#main .used",
+                 ".x[title]", "@page{size:A4}"):
+        assert kept in pruned
+    for dropped in ("'Mono'", ".unused", ".gone{color:red}", "min-width:768px", "#missing"):
+        assert dropped not in pruned
+    assert pruned.endswith('<main id="main" class="used"><p class="used">hi</p></main>')
+
+
+def test_pdf_size_report(tmp_path):
+    """Test that stream bytes are attributed to fonts, images and content."""
+    pdf = (
+        b"%PDF-1.7\n"
+        b"1 0 obj\n<< /Length 10 /Length1 20 >>\nstream\n0123456789\nendstream\nendobj\n"
+        b"2 0 obj\n<< /Type /XObject /Subtype /Image /Length 5 >>\nstream\nIMAGE\nendstream\nendobj\n"
+        b"3 0 obj\n<< /Filter /FlateDecode /Length 4 0 R >>\nstream\nBT ET\nendstream\nendobj\n"
+        b"%%EOF\n"
+    )
+    path = tmp_path / "out.pdf"
+    path.write_bytes(pdf)
+    report = pdf_size_report(path)
+
+    assert (report["fonts"], report["images"], report["content"]) == (10, 5, 6)
+    assert report["total"] == len(pdf)
+    assert sum(report[kind] for kind in ("fonts", "images", "content", "other")) == len(pdf)
+    assert format_size_report(report).startswith(f"PDF size: {len(pdf)} B (fonts 10 B")
@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+from keystone.utils import pdf_supervisor
+from keystone.utils.pdf_supervisor import (PdfDependencyError, PdfGenerationError, PdfMemoryError, PdfTimeoutError,
+                                           render_supervised)
+from keystone.utils.tests.fake_renderers import (FailingRenderer, GreedyRenderer, PidRenderer, SleepingRenderer,
+                                                 WritingRenderer, missing_renderer)
+
+
+def test_render_in_child(monkeypatch, tmp_path):
+    """Test that the child process writes the PDF."""
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", WritingRenderer)
+    output = tmp_path / "out.pdf"
+    render_supervised("<p>hi</p>", output, timeout=30)
+    assert output.read_text() == "<p>hi</p>"
+
+
+def test_children_are_not_forked_from_the_caller():
+    """Test that render processes never copy the (possibly multi-threaded) calling process."""
+    assert pdf_supervisor.process_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_workers_are_reused(monkeypatch, tmp_path):
+    """Test that renders share a warm worker until one hits a limit."""
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", PidRenderer)
+    output = tmp_path / "out.pdf"
+    render_supervised("<p>hi</p>", output, timeout=30)
+    first = output.read_text()
+    render_supervised("<p>hi</p>", output, timeout=30)
+    assert output.read_text() == first
+    assert first != str(os.getpid())
+
+    # A worker that died while idle is replaced
+    for worker in pdf_supervisor._idle_workers:
+        worker.process.kill()
+        worker.process.join()
+    render_supervised("<p>hi</p>", output, timeout=30)
+    assert output.read_text() != first
+
+
+def test_timeout_kills_render(monkeypatch, tmp_path):
+    """Test that a render running past its timeout is stopped."""
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", SleepingRenderer)
+    start = time.monotonic()
+    with pytest.raises(PdfTimeoutError, match="timed out after 0.5s"):
+        render_supervised("<p>hi</p>", tmp_path / "out.pdf", timeout=0.5)
+    assert time.monotonic() - start < 10
+
+
+def test_render_errors_are_typed(monkeypatch, tmp_path):
+    """Test that failures in the child surface as PdfGenerationError subclasses."""
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", FailingRenderer)
+    with pytest.raises(PdfGenerationError, match="bad stylesheet"):
+        render_supervised("<p>hi</p>", tmp_path / "out.pdf", timeout=30)
+
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", missing_renderer)
+    with pytest.raises(PdfDependencyError, match="keystone\\[pdf\\]"):
+        render_supervised("<p>hi</p>", tmp_path / "out.pdf", timeout=30)
+
+
+def test_memory_limit(monkeypatch, tmp_path):
+    """Test that a render allocating past its memory limit is stopped."""
+    pytest.importorskip("resource")
+    monkeypatch.setattr(pdf_supervisor, "get_renderer", GreedyRenderer)
+    with pytest.raises(PdfMemoryError, match="1024 MB"):
+        render_supervised("<p>hi</p>", tmp_path / "out.pdf", timeout=30, memory_limit_mb=1024)
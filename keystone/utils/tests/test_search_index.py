@@ -0,0 +1,53 @@
+import json
+import re
+
+from keystone.core.document import build_document
+from keystone.utils.search_index import build_search_index, grams, render_search_assets, tokenize
+
+SAMPLE_DATA = {
+    "title": "Search",
+    "categories": [
+        {"name": "Files", "keybinds": [
+            {"action": "Save file", "keys": "Ctrl+S"},
+            {"action": "Open file", "keys": "Ctrl+O", "description": "Open from disk"},
+        ]},
+        {"name": "Empty", "keybinds": []},
+        {"name": "Tabs", "keybinds": [{"action": "Close tab", "keys": ["Ctrl+W", "Ctrl+F4"]}]},
+    ],
+}
+
+
+def _decode(deltas):
+    ids, row_id = [], 0
+    for delta in deltas:
+        row_id += delta
+        ids.append(row_id)
+    return ids
+
+
+def test_tokenize_and_grams():
+    """Test tokenization of escaped text and the index keys of a token."""
+    assert tokenize("Go to &lt;Line&gt; (fast)") == ["go", "to", "line", "fast"]
+    assert grams("save") == {"s", "sa", "sav", "ave"}
+    assert grams("f4") == {"f", "f4"}
+
+
+def test_build_search_index():
+    """Test row numbering, category counts and posting lists."""
+    index = build_search_index(build_document(SAMPLE_DATA, {}))
+
+    assert index["n"] == 3
+    assert index["c"] == [2, 0, 1]
+    assert _decode(index["g"]["fil"]) == [0, 1]
+    assert _decode(index["g"]["ctr"]) == [0, 1, 2]
+    assert _decode(index["g"]["f4"]) == [2]
+    assert _decode(index["g"]["dis"]) == [1]
+
+
+def test_render_search_assets():
+    """Test that the index is embedded as JSON next to the script."""
+    html = render_search_assets(build_document(SAMPLE_DATA, {}))
+    match = re.search(r'<script type="application/json" id="keystone-search-index">(.*?)</script>', html)
+
+    assert json.loads(match.group(1))["n"] == 3
+    assert 'addEventListener("input"' in html
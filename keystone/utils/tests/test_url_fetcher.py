@@ -0,0 +1,39 @@
+import pytest
+
+from keystone.utils.url_fetcher import AssetFetcher
+
+
+class TestAssetFetcher:
+
+    def test_local_urls(self, tmp_path):
+        """Test that file: and data: URLs are read directly, even offline."""
+        stylesheet = tmp_path / "print.css"
+        stylesheet.write_text("body { color: red }")
+        fetcher = AssetFetcher(tmp_path / "cache", offline=True)
+        asset = fetcher.fetch(stylesheet.as_uri())
+        assert asset.body == b"body { color: red }"
+        assert asset.mime_type == "text/css"
+        assert fetcher.fetch("data:text/plain;base64,aGk=").body == b"hi"
+
+    def test_cached_remote_asset(self, tmp_path):
+        """Test that stored assets are served without network access."""
+        fetcher = AssetFetcher(tmp_path, offline=True)
+        fetcher.store("https://example.com/logo.svg", b"<svg/>", "image/svg+xml")
+        asset = AssetFetcher(tmp_path, offline=True).fetch("https://example.com/logo.svg")
+        assert (asset.body, asset.mime_type) == (b"<svg/>", "image/svg+xml")
+
+    def test_known_assets_are_stubbed(self, tmp_path):
+        """Test that CDN assets Keystone already inlines are served empty."""
+        fetcher = AssetFetcher(tmp_path, offline=True)
+        asset = fetcher.fetch("https://fonts.googleapis.com/css2?family=Inter:wght@400;700")
+        assert (asset.body, asset.mime_type) == (b"", "text/css")
+
+    def test_offline_refuses_uncached(self, tmp_path):
+        """Test that uncached remote URLs are refused immediately offline."""
+        with pytest.raises(ValueError, match="offline"):
+            AssetFetcher(tmp_path, offline=True).fetch("https://example.com/missing.png")
+
+    def test_time_budget(self, tmp_path):
+        """Test that no download is attempted once the time budget is used up."""
+        with pytest.raises(ValueError, match="budget"):
+            AssetFetcher(tmp_path, time_budget=0).fetch("https://example.com/missing.png")
@@ -1,7 +1,22 @@
+import hashlib
 import json
 import os
+from collections import ChainMap
 from pathlib import Path
 
+from .icon_pack import IconPack, cached_icon_pack, find_icon_packs
+
+def list_themes():
+    """
+    List the names of the available themes.
+    
+    Returns:
+        list: Theme names in alphabetical order
+    """
+    themes_dir = Path(__file__).parent.parent / "themes"
+    return sorted(theme_file.stem for theme_file in themes_dir.glob("*.json"))
+
+
 def load_theme(theme_name, _visited=None):
     """
     Load a theme configuration from a JSON file with inheritance support.
@@ -120,12 +135,33 @@ def _merge_color_variants(base_variants, custom_variants):
     
     return merged_variants
 
+def theme_fingerprint(theme):
+    """
+    Compute a stable content hash for a resolved theme.
+    
+    Args:
+        theme (dict): Theme configuration
+        
+    Returns:
+        str: Hex digest that changes whenever any theme value changes
+    """
+    serialized = json.dumps(theme, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
 def load_icons():
     """
-    Load the icon manifest from the assets directory.
+    Load the icons from the assets directory and any user icon packs.
+    
+    Icons are read from indexed icon packs (``*.iconpack``), which are opened
+    lazily: only their name index is read here and SVG bodies are decoded on
+    first lookup. The bundled ``icons.json`` is packed into Keystone's cache on
+    first use. Packs found in the directories listed in ``KEYSTONE_ICON_PATH``
+    take precedence over the bundled icons. Falls back to reading
+    ``icons.json`` directly when the cache cannot be written.
     
     Returns:
-        dict: Icon name to SVG string mapping
+        Mapping: Icon name to SVG string mapping
         
     Raises:
         FileNotFoundError: If the icons.json file doesn't exist
@@ -138,7 +174,15 @@ def load_icons():
     if not icons_path.exists():
         raise FileNotFoundError(f"Icons file not found at {icons_path}")
     
-    with open(icons_path, 'r', encoding='utf-8') as f:
-        icons_data = json.load(f)
+    user_dirs = [Path(entry) for entry in os.environ.get("KEYSTONE_ICON_PATH", "").split(os.pathsep) if entry]
+    icon_sources = [IconPack(path) for path in find_icon_packs(user_dirs)]
+    
+    try:
+        icon_sources.append(IconPack(cached_icon_pack(icons_path)))
+    except OSError:
+        with open(icons_path, 'r', encoding='utf-8') as f:
+            icon_sources.append(json.load(f))
     
-    return icons_data
+    if len(icon_sources) == 1:
+        return icon_sources[0]
+    return ChainMap(*icon_sources)
@@ -0,0 +1,174 @@
+"""
+Offline-first URL fetching for PDF rendering.
+
+WeasyPrint fetches every stylesheet, font and image a document references.
+Keystone's own output is self-contained, but custom templates and theme
+styles may still point at CDNs, and on machines without network access each
+of those requests waits for a timeout. AssetFetcher serves local (``file:``
+and ``data:``) URLs directly, remote URLs from a content cache or from stubs
+for assets Keystone already inlines, and only then from the network, within
+a fixed time budget per document (never, when offline). Anything else is
+refused immediately, which WeasyPrint reports as a warning and skips.
+"""
+import hashlib
+import json
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Tuple, Union
+
+from .cache import get_cache_dir
+
+# Total seconds of network access allowed while rendering one document
+FETCH_TIME_BUDGET = 5.0
+
+# Remote assets whose content Keystone documents already inline (compiled
+# utility CSS, local @font-face rules): served empty instead of downloaded
+ASSET_STUBS = {
+    "https://cdn.tailwindcss.com": "text/javascript",
+    "https://fonts.googleapis.com/": "text/css",
+    "https://fonts.gstatic.com/": "font/woff2",
+}
+
+LOCAL_SCHEMES = ("file:", "data:")
+
+
+class FetchedAsset(NamedTuple):
+    """Body and type of a fetched URL."""
+
+    url: str
+    body: bytes
+    mime_type: str
+
+
+class AssetFetcher:
+    """Resolve URLs from local files, the asset cache, stubs and (budgeted) network access."""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, offline: bool = False,
+                 time_budget: float = FETCH_TIME_BUDGET):
+        """
+        Create a fetcher for one document.
+
+        Args:
+            cache_dir: Directory of cached remote assets. Defaults to the
+                ``assets`` directory in Keystone's cache (see get_cache_dir).
+            offline: Never access the network; uncached remote URLs are refused
+            time_budget: Total seconds of network access allowed
+        """
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.offline = offline
+        self.remaining = time_budget
+
+    @property
+    def cache_dir(self) -> Path:
+        """Directory holding cached remote assets (created on first use)."""
+        if self._cache_dir is None:
+            self._cache_dir = get_cache_dir("assets")
+        else:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+        return self._cache_dir
+
+    def _cache_paths(self, url: str) -> Tuple[Path, Path]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.bin", self.cache_dir / f"{digest}.json"
+
+    def cached(self, url: str) -> Optional[FetchedAsset]:
+        """
+        Look up a remote URL in the asset cache.
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            The cached asset, or None
+        """
+        body_path, meta_path = self._cache_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return FetchedAsset(url, body_path.read_bytes(), meta["mime_type"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, url: str, body: bytes, mime_type: str) -> None:
+        """
+        Add a remote asset to the cache, e.g. to prepare a machine without network access.
+
+        Args:
+            url: Absolute URL
+            body: Response body
+            mime_type: Content type of the body
+        """
+        body_path, meta_path = self._cache_paths(url)
+        body_path.write_bytes(body)
+        meta_path.write_text(json.dumps({"url": url, "mime_type": mime_type}), encoding="utf-8")
+
+    def fetch(self, url: str) -> FetchedAsset:
+        """
+        Resolve a URL.
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            The asset
+
+        Raises:
+            ValueError: If the URL is refused (offline, or out of time budget)
+            OSError: If a local file or an allowed download fails
+        """
+        if url.startswith(LOCAL_SCHEMES):
+            with urllib.request.urlopen(url) as response:
+                return FetchedAsset(response.geturl(), response.read(), response.headers.get_content_type())
+
+        asset = self.cached(url)
+        if asset is not None:
+            return asset
+
+        for prefix, mime_type in ASSET_STUBS.items():
+            if url.startswith(prefix):
+                return FetchedAsset(url, b"", mime_type)
+
+        if self.offline:
+            raise ValueError(f"Not fetching {url} (offline)")
+        if self.remaining <= 0:
+            raise ValueError(f"Not fetching {url} (network time budget used up)")
+
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(url, timeout=self.remaining) as response:
+                asset = FetchedAsset(response.geturl(), response.read(), response.headers.get_content_type())
+        finally:
+            self.remaining -= time.monotonic() - started
+        try:
+            self.store(url, asset.body, asset.mime_type)
+        except OSError:
+            pass
+        return asset
+
+
+def weasyprint_url_fetcher(fetcher: AssetFetcher) -> Any:
+    """
+    Adapt an AssetFetcher to the ``url_fetcher`` argument of the installed WeasyPrint.
+
+    Args:
+        fetcher: Fetcher to use
+
+    Returns:
+        A ``weasyprint.urls.URLFetcher`` instance on WeasyPrint versions that
+        have the class, otherwise a fetcher function returning dictionaries
+    """
+    try:
+        from weasyprint.urls import URLFetcher, URLFetcherResponse
+    except ImportError:
+        # Older WeasyPrint: a function returning a dictionary
+        def fetch_url(url, timeout=None, ssl_context=None):
+            asset = fetcher.fetch(url)
+            return {"string": asset.body, "mime_type": asset.mime_type, "redirected_url": asset.url}
+        return fetch_url
+
+    class KeystoneURLFetcher(URLFetcher):
+        def fetch(self, url, headers=None):
+            asset = fetcher.fetch(url)
+            return URLFetcherResponse(asset.url, asset.body, {"Content-Type": asset.mime_type})
+
+    return KeystoneURLFetcher()